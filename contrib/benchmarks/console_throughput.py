@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Measure the console expect throughput using the FakeConsoleDriver."""
+import argparse
+import time
+
+from labgrid import Target
+from labgrid.driver.fake import FakeConsoleDriver
+
+
+def make_output(size):
+    lines = []
+    length = 0
+    while length < size:
+        line = "[{:12.6f}] boot message number {} with some padding text\n".format(
+            len(lines) * 0.001, len(lines))
+        lines.append(line)
+        length += len(line)
+    return "".join(lines).encode()
+
+
+def fill(console, data, chunk_size):
+    chunks = [data[i:i+chunk_size] for i in range(0, len(data), chunk_size)]
+    # the FakeConsoleDriver pops the chunks from the end
+    console.rxq = chunks[::-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-s', '--size', type=int, default=200*1024,
+                        help="amount of console output in bytes")
+    parser.add_argument('-c', '--chunk-size', type=int, action='append',
+                        help="bytes returned by each driver read (can be given multiple times)")
+    args = parser.parse_args()
+    chunk_sizes = args.chunk_size or [64, 4096]
+
+    target = Target('benchmark')
+    console = FakeConsoleDriver(target, 'console')
+    target.activate(console)
+
+    data = make_output(args.size) + b"login: "
+    lines = data.count(b"\n")
+    for chunk_size in chunk_sizes:
+        fill(console, data, chunk_size)
+        start = time.monotonic()
+        console.expect("login: ", timeout=60)
+        single = time.monotonic() - start
+
+        fill(console, data, chunk_size)
+        start = time.monotonic()
+        for _ in range(lines):
+            console.expect("\n", timeout=60)
+        console.expect("login: ", timeout=60)
+        per_line = time.monotonic() - start
+
+        print("chunk size {:5}: {:8.2f} MB/s single expect, {:8.2f} MB/s expect per line".format(
+            chunk_size, len(data) / single / 1e6, len(data) / per_line / 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Measure the time needed to import labgrid and to create a target.
+
+Each measurement runs in a new interpreter, so the results include the
+imports of the driver and resource modules used by the target.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+SNIPPETS = {
+    'import labgrid': 'import labgrid',
+    'import labgrid.remote.client': 'import labgrid.remote.client',
+    'make_target (shell/ssh)': """
+import labgrid
+labgrid.target_factory.make_target('main', {
+    'resources': {
+        'RawSerialPort': {'port': '/dev/null'},
+        'NetworkService': {'address': 'localhost', 'username': 'root'},
+    },
+    'drivers': {'SerialDriver': {}, 'ShellDriver': {
+        'prompt': 'root@', 'login_prompt': 'login:', 'username': 'root'
+    }},
+})
+""",
+}
+
+TIMER = """
+import time
+start = time.perf_counter()
+exec(compile({!r}, 'snippet', 'exec'))
+print(time.perf_counter() - start)
+"""
+
+
+def measure(snippet, runs):
+    results = []
+    for _ in range(runs):
+        output = subprocess.check_output([sys.executable, '-c', TIMER.format(snippet)])
+        results.append(float(output))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-n', '--runs', type=int, default=10,
+                        help="number of interpreter starts per measurement")
+    args = parser.parse_args()
+
+    for name, snippet in SNIPPETS.items():
+        results = measure(snippet, args.runs)
+        print("{:32} median {:7.1f} ms  min {:7.1f} ms".format(
+            name, statistics.median(results) * 1000, min(results) * 1000))
+
+
+if __name__ == '__main__':
+    main()
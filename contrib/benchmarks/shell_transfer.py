@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Measure the ShellDriver file transfer speed to and from a shell on a pty."""
+import argparse
+import os
+import time
+
+from labgrid import Target
+from labgrid.driver import ExternalConsoleDriver, ShellDriver
+
+PROMPT = 'BENCHMARK> '
+
+
+def make_shell(target):
+    # script runs the shell on a new pty, so stty works like on a serial console
+    console = ExternalConsoleDriver(
+        target, 'console',
+        cmd='script -qfc "env PS1=\'{}\' sh -i" /dev/null'.format(PROMPT),
+    )
+    shell = ShellDriver(target, 'shell', prompt=PROMPT, login_prompt='login: ',
+                        username='root')
+    target.activate(console)
+    console.sendline('')
+    console.expect(PROMPT, timeout=10)
+    target.activate(shell)
+    return shell
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-s', '--size', type=int, default=2*1024*1024,
+                        help="size of the transferred file in bytes")
+    parser.add_argument('--random', action='store_true',
+                        help="transfer incompressible random data instead of text")
+    args = parser.parse_args()
+
+    if args.random:
+        data = os.urandom(args.size)
+    else:
+        line = b"labgrid shell transfer benchmark data line\n"
+        data = (line * (args.size // len(line) + 1))[:args.size]
+
+    target = Target('benchmark')
+    shell = make_shell(target)
+    remote = shell.run_check('mktemp')[0]
+    try:
+        start = time.monotonic()
+        shell.put_bytes(data, remote)
+        put = time.monotonic() - start
+
+        start = time.monotonic()
+        received = shell.get_bytes(remote)
+        get = time.monotonic() - start
+    finally:
+        shell.run("rm -f '{}'".format(remote))
+        target.deactivate_all_drivers()
+
+    assert received == data, "received data differs"
+    print("put_bytes: {:10.0f} bytes/s".format(len(data) / put))
+    print("get_bytes: {:10.0f} bytes/s".format(len(data) / get))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Compare the SSHDriver command rate with one ssh process per command and
+with persistent sessions.
+
+Without --host, the ssh commands are replaced by a local sh, which measures
+the cost of starting a process and shell per command without the network.
+"""
+import argparse
+import time
+
+from labgrid import Target
+from labgrid.driver import SSHDriver
+from labgrid.resource import NetworkService
+
+
+def make_driver(args, **kwargs):
+    target = Target('benchmark')
+    if args.host:
+        user, _, host = args.host.rpartition('@')
+        NetworkService(target, 'service', host, user or 'root', port=args.port)
+    else:
+        NetworkService(target, 'service', 'localhost', 'root')
+    ssh = SSHDriver(target, 'ssh', **kwargs)
+    if not args.host:
+        # skip the control master and run everything locally
+        # pylint: disable=protected-access
+        ssh.on_activate = ssh._open_sessions if ssh.persistent else lambda: None
+        ssh.on_deactivate = ssh._close_sessions
+        ssh._get_ssh_command = lambda cmd: ['sh', '-c', cmd]
+    target.activate(ssh)
+    return ssh
+
+
+def measure(ssh, count):
+    start = time.monotonic()
+    for _ in range(count):
+        ssh.run_check('true')
+    sequential = (time.monotonic() - start) / count
+
+    start = time.monotonic()
+    ssh.run_many(['true'] * count)
+    many = (time.monotonic() - start) / count
+    return sequential, many
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-n', '--number', type=int, default=200,
+                        help="number of commands per measurement")
+    parser.add_argument('--slots', type=int, default=4,
+                        help="number of concurrent sessions for run_many()")
+    parser.add_argument('--host', help="run the commands on user@host via ssh")
+    parser.add_argument('--port', type=int, default=22, help="ssh port of the host")
+    args = parser.parse_args()
+
+    modes = [
+        ('spawn per command', {}),
+        ('persistent session', {'persistent': True}),
+        ('persistent, {} slots'.format(args.slots), {'persistent': True, 'slots': args.slots}),
+    ]
+    print("{:24} {:>12} {:>12}".format('', 'run()', 'run_many()'))
+    for name, kwargs in modes:
+        ssh = make_driver(args, **kwargs)
+        try:
+            sequential, many = measure(ssh, args.number)
+        finally:
+            ssh.target.deactivate_all_drivers()
+        print("{:24} {:9.2f} ms {:9.2f} ms".format(name, sequential * 1000, many * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Measure the per-call overhead of the @step decorator."""
+import argparse
+import timeit
+
+from labgrid.step import step, steps
+
+
+class Console:
+    def plain(self, size, timeout=0.0):
+        return size
+
+    @step(args=['size'])
+    def stepped(self, size, timeout=0.0):
+        return size
+
+    @step(args=['size'])
+    def stepped_with_step(self, size, timeout=0.0, *, step):  # pylint: disable=unused-argument
+        return size
+
+
+def measure(func, number):
+    return min(timeit.repeat(lambda: func(1), number=number, repeat=5)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-n', '--number', type=int, default=100000,
+                        help="number of calls per measurement")
+    args = parser.parse_args()
+
+    console = Console()
+    baseline = measure(console.plain, args.number)
+    results = [
+        ('no subscribers', console.stepped),
+        ('no subscribers, step argument', console.stepped_with_step),
+    ]
+    subscribed = [
+        ('one subscriber', console.stepped),
+    ]
+
+    print("{:32} {:8.3f} us".format('undecorated', baseline * 1e6))
+    for name, func in results:
+        print("{:32} {:8.3f} us overhead".format(
+            name, (measure(func, args.number) - baseline) * 1e6))
+
+    def subscriber(event):  # pylint: disable=unused-argument
+        pass
+
+    steps.subscribe(subscriber)
+    try:
+        for name, func in subscribed:
+            print("{:32} {:8.3f} us overhead".format(
+                name, (measure(func, args.number) - baseline) * 1e6))
+    finally:
+        steps.unsubscribe(subscriber)
+
+
+if __name__ == '__main__':
+    main()
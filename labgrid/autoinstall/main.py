@@ -25,6 +25,7 @@ class Handler(multiprocessing.Process):
             'env': self.env,
             'config': self.config,
         }
+        target_factory.load_all()
         self.context.update(target_factory.resources)
         self.context.update(target_factory.drivers)
 
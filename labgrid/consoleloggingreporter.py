@@ -1,13 +1,20 @@
 import os
 import sys
+import threading
 from datetime import datetime
 
+from .binding import StateError
 from .step import steps
 
 
 class ConsoleLoggingReporter:
     """ConsoleLoggingReporter - Reporter that writes console log files
 
+    The data of console reads is logged from their steps. While the console
+    multiplexer of a driver is enabled, the reporter reads the output through
+    its own cursor instead, so output which is not consumed by expect is
+    logged as well.
+
     Args:
         logpath (str): path to store the logfiles in
     """
@@ -23,16 +30,22 @@ class ConsoleLoggingReporter:
     def stop(cls):
         """stops the ConsoleLoggingReporter"""
         assert cls.instance is not None
-        cls.instance._stop()
         steps.unsubscribe(cls.instance.notify)
+        cls.instance._stop()
         cls.instance = None
 
     def __init__(self, logpath):
         self._logcache = {}
+        self._watchers = {}
+        self._stopping = threading.Event()
         self.logpath = logpath
         steps.subscribe(self.notify)
 
     def _stop(self):
+        self._stopping.set()
+        while self._watchers:
+            _, thread = self._watchers.popitem()
+            thread.join()
         while self._logcache:
             _, log = self._logcache.popitem()
             # ignore cache entries for errors
@@ -42,7 +55,9 @@ class ConsoleLoggingReporter:
 
     def get_logfile(self, event):
         """Returns the correct file handle from cache or creates a new file handle"""
-        source = event.step.source
+        return self._get_logfile(event.step.source)
+
+    def _get_logfile(self, source):
         try:
             log = self._logcache[source]
         except KeyError:
@@ -82,9 +97,47 @@ class ConsoleLoggingReporter:
         step = event.step
         if step.tag == 'console':
             if str(step) == 'read':
-                if event.data.get('state') == 'stop':
-                    if step.result and step.source:
-                        log = self.get_logfile(event)
-                        if not log:
-                            return
-                        log.write(step.result)
+                # reads are stream events, possibly merged from several steps
+                result = event.data.get('result')
+                if result and step.source and step.source not in self._watchers:
+                    log = self.get_logfile(event)
+                    if not log:
+                        return
+                    log.write(result)
+            elif str(step) == 'enable_multiplexer' and event.data.get('state') == 'stop':
+                self._start_watcher(step.source)
+            elif str(step) == 'disable_multiplexer' and event.data.get('state') == 'stop':
+                thread = self._watchers.pop(step.source, None)
+                if thread is not None:
+                    thread.join()
+
+    def _start_watcher(self, source):
+        """Log the output of the source's console multiplexer from a thread"""
+        if source in self._watchers:
+            return
+        try:
+            cursor = source.watch(backlog=True)
+        except StateError:
+            # enable_multiplexer() failed
+            return
+        log = self._get_logfile(source)
+        if not log:
+            return
+        thread = threading.Thread(
+            target=self._watch, args=(cursor, log),
+            name="ConsoleLoggingReporter({})".format(source), daemon=True
+        )
+        self._watchers[source] = thread
+        thread.start()
+
+    def _watch(self, cursor, log):
+        while not self._stopping.is_set():
+            try:
+                data = cursor.read(timeout=0.1)
+            except Exception:  # pylint: disable=broad-except
+                # the error which stopped the multiplexer, it was already logged
+                break
+            if data:
+                log.write(data)
+            elif cursor.ring.closed:
+                break
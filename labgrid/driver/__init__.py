@@ -1,26 +1,70 @@
-from .bareboxdriver import BareboxDriver
-from .ubootdriver import UBootDriver
-from .smallubootdriver import SmallUBootDriver
-from .serialdriver import SerialDriver
-from .shelldriver import ShellDriver
-from .sshdriver import SSHDriver
-from .externalconsoledriver import ExternalConsoleDriver
+from typing import TYPE_CHECKING
+
+from ..factory import target_factory
 from .exception import CleanUpError, ExecutionError
-from .fastbootdriver import AndroidFastbootDriver
-from .openocddriver import OpenOCDDriver
-from .quartushpsdriver import QuartusHPSDriver
-from .onewiredriver import OneWirePIODriver
-from .powerdriver import ManualPowerDriver, ExternalPowerDriver, \
-                         DigitalOutputPowerDriver, YKUSHPowerDriver, \
-                         USBPowerDriver
-from .usbloader import MXSUSBDriver, IMXUSBDriver
-from .usbstorage import USBStorageDriver
-from .usbsdmuxdriver import USBSDMuxDriver
 from .common import Driver
-from .qemudriver import QEMUDriver
-from .modbusdriver import ModbusCoilDriver
-from .sigrokdriver import SigrokDriver
-from .networkusbstoragedriver import NetworkUSBStorageDriver
-from .resetdriver import DigitalOutputResetDriver
-from .serialdigitaloutput import SerialPortDigitalOutputDriver
-from .xenadriver import XenaDriver
+
+# the driver modules are only imported when they are used
+target_factory.reg_lazy(globals(), {
+    'BareboxDriver': '.bareboxdriver',
+    'UBootDriver': '.ubootdriver',
+    'SmallUBootDriver': '.smallubootdriver',
+    'SerialDriver': '.serialdriver',
+    'ShellDriver': '.shelldriver',
+    'SSHDriver': '.sshdriver',
+    'ExternalConsoleDriver': '.externalconsoledriver',
+    'AndroidFastbootDriver': '.fastbootdriver',
+    'OpenOCDDriver': '.openocddriver',
+    'QuartusHPSDriver': '.quartushpsdriver',
+    'OneWirePIODriver': '.onewiredriver',
+    'ManualPowerDriver': '.powerdriver',
+    'ExternalPowerDriver': '.powerdriver',
+    'NetworkPowerDriver': '.powerdriver',
+    'DigitalOutputPowerDriver': '.powerdriver',
+    'YKUSHPowerDriver': '.powerdriver',
+    'USBPowerDriver': '.powerdriver',
+    'MXSUSBDriver': '.usbloader',
+    'IMXUSBDriver': '.usbloader',
+    'USBStorageDriver': '.usbstorage',
+    'USBSDMuxDriver': '.usbsdmuxdriver',
+    'QEMUDriver': '.qemudriver',
+    'ModbusCoilDriver': '.modbusdriver',
+    'SigrokDriver': '.sigrokdriver',
+    'NetworkUSBStorageDriver': '.networkusbstoragedriver',
+    'DigitalOutputResetDriver': '.resetdriver',
+    'SerialPortDigitalOutputDriver': '.serialdigitaloutput',
+    'XenaDriver': '.xenadriver',
+    'USBVideoDriver': '.usbvideodriver',
+    'USBTMCDriver': '.usbtmcdriver',
+})
+
+# explicit imports for static analysis, which does not know about the lazy
+# imports
+if TYPE_CHECKING:
+    from .bareboxdriver import BareboxDriver
+    from .ubootdriver import UBootDriver
+    from .smallubootdriver import SmallUBootDriver
+    from .serialdriver import SerialDriver
+    from .shelldriver import ShellDriver
+    from .sshdriver import SSHDriver
+    from .externalconsoledriver import ExternalConsoleDriver
+    from .fastbootdriver import AndroidFastbootDriver
+    from .openocddriver import OpenOCDDriver
+    from .quartushpsdriver import QuartusHPSDriver
+    from .onewiredriver import OneWirePIODriver
+    from .powerdriver import (
+        ManualPowerDriver, ExternalPowerDriver, NetworkPowerDriver,
+        DigitalOutputPowerDriver, YKUSHPowerDriver, USBPowerDriver
+    )
+    from .usbloader import MXSUSBDriver, IMXUSBDriver
+    from .usbstorage import USBStorageDriver
+    from .usbsdmuxdriver import USBSDMuxDriver
+    from .qemudriver import QEMUDriver
+    from .modbusdriver import ModbusCoilDriver
+    from .sigrokdriver import SigrokDriver
+    from .networkusbstoragedriver import NetworkUSBStorageDriver
+    from .resetdriver import DigitalOutputResetDriver
+    from .serialdigitaloutput import SerialPortDigitalOutputDriver
+    from .xenadriver import XenaDriver
+    from .usbvideodriver import USBVideoDriver
+    from .usbtmcdriver import USBTMCDriver
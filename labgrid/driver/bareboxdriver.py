@@ -84,18 +84,59 @@ class BareboxDriver(CommandMixin, Driver, CommandProtocol, LinuxBootProtocol):
         )
         if self._status == 1:
             self.console.sendline(cmp_command)
-            _, _, match, _ = self.console.expect(r'{}(.*){}\s+(\d+)\s+.*{}'.format(
-                marker, marker, self.prompt
-            ), timeout=timeout)
+            timeout = Timeout(float(timeout))
+            # match the output's start and end separately, so that expect
+            # only needs to search the latest data for each marker
+            self.console.expect(marker, timeout=timeout.remaining)
+            _, before, match, _ = self.console.expect(r'{}\s+(\d+)\s+.*{}'.format(
+                marker, self.prompt
+            ), timeout=timeout.remaining)
             # Remove VT100 Codes and split by newline
-            data = self.re_vt100.sub('', match.group(1).decode('utf-8')).split('\r\n')[1:-1]
+            data = self.re_vt100.sub('', before.decode('utf-8')).split('\r\n')[1:-1]
             self.logger.debug("Received Data: %s", data)
             # Get exit code
-            exitcode = int(match.group(2))
+            exitcode = int(match.group(1))
             return (data, [], exitcode)
 
         return None
 
+    def _run_iter(self, cmd: str, *, timeout=30.0, codec="utf-8", decodeerrors="strict"):
+        """
+        Runs the specified command on the shell and yields the output lines
+        as they arrive. Not all barebox commands can be interrupted, so if the
+        iteration is stopped early, the remaining output is discarded until
+        the command has finished.
+
+        Args:
+            cmd (str): command to run on the shell
+            timeout (float): maximum time to wait for each line
+
+        Returns:
+            int: the exit code of the command, None if the driver is not ready
+        """
+        if self._status != 1:
+            return None
+        marker = gen_marker()
+        # hide marker from expect
+        hidden_marker = '"{}""{}"'.format(marker[:4], marker[4:])
+        cmp_command = '''echo -o /cmd {}; echo {}; sh /cmd; echo {} $?;'''.format(
+            shlex.quote(cmd), hidden_marker, hidden_marker,
+        )
+        self.console.sendline(cmp_command)
+        self.console.expect(r'{}\r?\n'.format(marker), timeout=timeout)
+        end = re.compile(r'{}\s+(\d+)'.format(marker))
+        match = None
+        try:
+            while match is None:
+                line, match = self._read_console_line(end, timeout, codec, decodeerrors)
+                if line or match is None:
+                    yield line
+        except GeneratorExit:
+            while match is None:
+                _, match = self._read_console_line(end, timeout, codec, decodeerrors)
+        self.console.expect(self.prompt, timeout=timeout)
+        return int(match.group(1))
+
     @Driver.check_active
     @step()
     def reset(self):
@@ -1,11 +1,82 @@
 from time import sleep
 
+from pexpect import TIMEOUT
+
 from ..util import Timeout
 from ..step import step
 from .common import Driver
 from .exception import ExecutionError
 
 
+class CommandIterator:
+    """
+    Iterator over the output lines of a command started by run_iter().
+
+    The lines are read from the target while they are consumed, so only the
+    current line is kept in memory. Once the iteration has finished, the exit
+    code of the command is available in the exitcode attribute.
+
+    If the stop predicate returns True for a line, that line is still
+    returned, but the command is stopped and the iteration ends. close()
+    stops the command as well. A stopped command's exitcode is None if the
+    driver can't determine it.
+
+    If no line is received within the timeout, ExecutionError is raised for
+    all drivers.
+    """
+    def __init__(self, lines, stop=None):
+        self._lines = lines
+        self._stop = stop
+        self.exitcode = None
+        self.stopped = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._lines is None:
+            raise StopIteration
+        try:
+            line = next(self._lines)
+        except StopIteration as e:
+            self.exitcode = e.value
+            self._lines = None
+            raise
+        except TIMEOUT as e:
+            self._lines = None
+            raise ExecutionError("timeout waiting for the command output: {}".format(e)) from e
+        except Exception:
+            self._lines = None
+            raise
+        if self._stop is not None and self._stop(line):
+            self.close()
+        return line
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Stop the command if it is still running"""
+        if self._lines is None:
+            return
+        lines, self._lines = self._lines, None
+        self.stopped = True
+        try:
+            # the drivers stop the command on GeneratorExit and return the
+            # exit code, if they know it
+            lines.throw(GeneratorExit)
+        except StopIteration as e:
+            self.exitcode = e.value
+        except GeneratorExit:
+            # the command had not been started yet
+            pass
+        except TIMEOUT as e:
+            raise ExecutionError("timeout waiting for the command to stop: {}".format(e)) from e
+
+
 class CommandMixin:
     """
     CommandMixin implementing common functions for drivers which support the CommandProtocol
@@ -63,6 +134,51 @@ class CommandMixin:
                     break
         return False
 
+    def _read_console_line(self, end, timeout, codec, decodeerrors):
+        """
+        Internal function for console based drivers, which reads the next
+        line of a command's output from the console.
+
+        Args:
+            end (Pattern): compiled regex marking the end of the output
+            timeout (float): maximum time to wait for the line
+
+        Returns:
+            Tuple[str, Match]: the decoded line and the match of the end
+            pattern or None. If the end pattern matched, the line only
+            contains the output before it.
+        """
+        _, before, _, _ = self.console.expect('\n', timeout=timeout)
+        line = self.re_vt100.sub('', before.decode(codec, decodeerrors)).rstrip('\r')
+        match = end.search(line)
+        if match is not None:
+            line = line[:match.start()]
+        return line, match
+
+    @Driver.check_active
+    def run_iter(self, cmd: str, *, timeout=30.0, stop=None, codec="utf-8",
+                 decodeerrors="strict"):
+        """
+        Runs the supplied command and returns an iterator over its output
+        lines, which yields each line as soon as it was received. The command
+        is started when the first line is requested.
+
+        Args:
+            cmd (str): command to run on the shell
+            timeout (float): maximum time to wait for the next line, raises
+                ExecutionError when it expires
+            stop (callable): optional predicate called with each line, the
+                command is stopped after the first line it returns True for
+
+        Returns:
+            CommandIterator: iterator over the lines, which provides the exit
+            code in its exitcode attribute after the iteration has finished
+        """
+        return CommandIterator(
+            self._run_iter(cmd, timeout=timeout, codec=codec, decodeerrors=decodeerrors),
+            stop=stop,
+        )
+
     def _run_check(self, cmd: str, *, timeout=30, codec: str = "utf-8",
                    decodeerrors: str = "strict"):
         """
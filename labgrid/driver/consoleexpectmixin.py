@@ -1,8 +1,12 @@
 from time import sleep
 
+from pexpect import TIMEOUT
+
+from ..binding import StateError
 from ..util import PtxExpect
 from ..step import step
 from .common import Driver
+from .consolemultiplexer import ConsoleMultiplexer
 
 
 class ConsoleExpectMixin:
@@ -11,22 +15,86 @@ class ConsoleExpectMixin:
     the internal _read and _write methods.
 
     The class using the ConsoleExpectMixin must provide a logger and a txdelay attribute.
+    The _read method should return all data which is already available instead of
+    only the requested size, so that expect can process the output in large chunks.
+
+    With enable_multiplexer(), a background thread reads the console into a ring
+    buffer. read and expect then consume the output through their own cursor,
+    while watch() returns further cursors for log writers or live monitors.
+    The ConsoleLoggingReporter uses such a cursor to log all console output,
+    including output which is never consumed by expect.
     """
 
     def __attrs_post_init__(self):
         super().__attrs_post_init__()
         self._expect = PtxExpect(self)
+        self._multiplexer = None
+        self._cursor = None
+
+    @Driver.check_active
+    @step(args=['size'], tag='console')
+    def enable_multiplexer(self, size=64*1024):
+        """
+        Start reading the console in a background thread, keeping the latest
+        size bytes for the consumers.
+        """
+        if self._multiplexer is not None:
+            return
+        self._multiplexer = ConsoleMultiplexer(self, size=size)
+        # the reader thread may already have received data
+        self._cursor = self._multiplexer.cursor(backlog=True)
+
+    @step(tag='console')
+    def disable_multiplexer(self):
+        """Stop the background reader, does nothing if it is not running"""
+        if self._multiplexer is None:
+            return
+        self._multiplexer.stop()
+        # keep the data which was received but not yet consumed by expect,
+        # reading only the available data doesn't raise the error which
+        # stopped the reader thread (it was already logged by the multiplexer)
+        if self._cursor.available:
+            self._expect.append(self._read_multiplexed(1, 0.0))
+        self._multiplexer = None
+        self._cursor = None
+
+    @Driver.check_active
+    def watch(self, backlog=True):
+        """
+        Return a new RingBufferCursor for the console output, which can be
+        read independently from expect.
+
+        Args:
+            backlog (bool): start at the oldest buffered data instead of the
+                data received from now on
+        """
+        if self._multiplexer is None:
+            raise StateError("the console multiplexer of {} is not enabled".format(self))
+        return self._multiplexer.cursor(backlog=backlog)
+
+    def _read_multiplexed(self, size, timeout):
+        lost = self._cursor.lost
+        res = self._cursor.read(min_size=size, timeout=timeout)
+        if self._cursor.lost != lost:
+            self.logger.warning("Lost %i bytes of console output, the multiplexer buffer is full",
+                                self._cursor.lost - lost)
+        if not res:
+            raise TIMEOUT("Timeout of %.2f seconds exceeded" % timeout)
+        return res
 
     @Driver.check_active
-    @step(result=True, tag='console')
+    @step(result=True, tag='console', stream=True)
     def read(self, size=1, timeout=0.0):
-        res = self._read(size=size, timeout=timeout)
+        if self._cursor is not None:
+            res = self._read_multiplexed(size, timeout)
+        else:
+            res = self._read(size=size, timeout=timeout)
         self.logger.debug("Read %i bytes: %s, timeout %.2f, requested size %i",
                           len(res), res, timeout, size)
         return res
 
     @Driver.check_active
-    @step(args=['data'], tag='console')
+    @step(args=['data'], tag='console', stream=True)
     def write(self, data):
         if self.txdelay:
             self.logger.debug("Write %i bytes: %s (with %fs txdelay)",
@@ -50,8 +118,20 @@ class ConsoleExpectMixin:
 
     @Driver.check_active
     @step(args=['pattern'], result=True)
-    def expect(self, pattern, timeout=-1):
-        index = self._expect.expect(pattern, timeout=timeout)
+    def expect(self, pattern, timeout=-1, lookbehind=-1):
+        """
+        Wait until one of the patterns matches the console output.
+
+        Only the newly read data and the preceding lookbehind bytes are
+        searched after each read. The default lookbehind of 4096 bytes can be
+        changed for a single call, None searches all output since the last
+        match.
+
+        Returns:
+            Tuple[int, bytes, Match, bytes]: index of the matching pattern,
+            the output before the match, the match object and the matched data
+        """
+        index = self._expect.expect(pattern, timeout=timeout, searchwindowsize=lookbehind)
         return index, self._expect.before, self._expect.match, self._expect.after
 
     def resolve_conflicts(self, client):
@@ -0,0 +1,60 @@
+import logging
+import threading
+
+from pexpect import TIMEOUT
+
+from ..util.ringbuffer import RingBuffer
+
+
+class ConsoleMultiplexer:
+    """
+    Reads a console driver from a background thread into a RingBuffer.
+
+    The expect engine, log writers and live watchers each get their own
+    RingBufferCursor, so they can consume the console output independently
+    without stealing data from each other.
+
+    The driver's internal _read method is called from the reader thread, the
+    driver must support writing to the console concurrently.
+    """
+    # timeout for each read, limits the time needed to stop the thread
+    poll_interval = 0.1
+
+    def __init__(self, driver, size=64*1024):
+        self.driver = driver
+        self.logger = logging.getLogger("{}({})".format(self.__class__.__name__, driver))
+        self.ring = RingBuffer(size)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="ConsoleMultiplexer({})".format(driver.name), daemon=True
+        )
+        self._thread.start()
+
+    def _run(self):
+        error = None
+        while not self._stop.is_set():
+            try:
+                data = self.driver._read(size=1, timeout=self.poll_interval)  # pylint: disable=protected-access
+            except TIMEOUT:
+                continue
+            except Exception as e:  # pylint: disable=broad-except
+                if not self._stop.is_set():
+                    self.logger.warning("reading from %s failed: %s", self.driver, e)
+                    error = e
+                break
+            if not data:
+                # some drivers return immediately if nothing was received
+                self._stop.wait(0.01)
+                continue
+            self.ring.write(data)
+        self.ring.close(error)
+
+    def cursor(self, backlog=False):
+        """Return a new cursor for the console output, see RingBuffer.cursor"""
+        return self.ring.cursor(backlog=backlog)
+
+    def stop(self):
+        """Stop the reader thread and close the ring buffer"""
+        self._stop.set()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
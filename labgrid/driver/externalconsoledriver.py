@@ -22,6 +22,7 @@ class ExternalConsoleDriver(ConsoleExpectMixin, Driver, ConsoleProtocol):
     """
     cmd = attr.ib(validator=attr.validators.instance_of(str))
     txdelay = attr.ib(default=0.0, validator=attr.validators.instance_of(float))
+    chunk_size = 4096
 
     def __attrs_post_init__(self):
         super().__attrs_post_init__()
@@ -69,7 +70,8 @@ class ExternalConsoleDriver(ConsoleExpectMixin, Driver, ConsoleProtocol):
 
     def _read(self, size: int = 1024, timeout: int = 0):
         """
-        Reads 'size' bytes from the serialport
+        Reads the bytes already available from the subprocess, up to
+        max(size, chunk_size) bytes
 
         Keyword Arguments:
         size -- amount of bytes to read, defaults to 1024
@@ -77,7 +79,9 @@ class ExternalConsoleDriver(ConsoleExpectMixin, Driver, ConsoleProtocol):
         if self._child.poll() is not None:
             raise ExecutionError("child has vanished")
         if self._poll.poll(timeout):
-            return self._child.stdout.read(size)
+            # read from the file descriptor directly, data hidden in the
+            # buffer of the stdout file object would not be seen by poll()
+            return os.read(self._child.stdout.fileno(), max(size, self.chunk_size))
 
         return b''
 
@@ -95,4 +99,5 @@ class ExternalConsoleDriver(ConsoleExpectMixin, Driver, ConsoleProtocol):
         return result
 
     def on_deactivate(self):
+        self.disable_multiplexer()
         self.close()
@@ -46,6 +46,10 @@ class FakeCommandDriver(CommandMixin, Driver, CommandProtocol):
     def run(self, *args, timeout=None): # pylint: disable=unused-argument
         pass
 
+    def _run_iter(self, *args, **kwargs): # pylint: disable=unused-argument
+        yield from ()
+        return 0
+
     @Driver.check_active
     def run_check(self, *args):
         pass
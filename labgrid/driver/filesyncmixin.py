@@ -0,0 +1,125 @@
+import hashlib
+import os
+import re
+import shlex
+import weakref
+
+# (path, size, mtime, algorithm) -> hex digest of the local file
+_local_hashes = {}
+# target -> {absolute remote path: (stat, algorithm, hex digest)}
+_remote_hashes = weakref.WeakKeyDictionary()
+# target -> checksum algorithm supported by the target or None
+_remote_algorithms = weakref.WeakKeyDictionary()
+
+
+def get_local_hash(filename, algorithm='sha256'):
+    """Return the hex digest of a local file, cached until the file changes"""
+    stat = os.stat(filename)
+    key = (os.path.abspath(filename), stat.st_size, stat.st_mtime_ns, algorithm)
+    digest = _local_hashes.get(key)
+    if digest is None:
+        h = hashlib.new(algorithm)
+        with open(filename, 'rb') as fh:
+            for chunk in iter(lambda: fh.read(1024*1024), b''):
+                h.update(chunk)
+        digest = _local_hashes[key] = h.hexdigest()
+    return digest
+
+
+def invalidate_remote_hashes(target):
+    """Forget the known hashes of the files on the target"""
+    _remote_hashes.pop(target, None)
+    _remote_algorithms.pop(target, None)
+
+
+class FileSyncMixin:
+    """
+    FileSyncMixin implements the sync mode of put() for drivers which provide
+    both the FileTransferProtocol and the CommandProtocol.
+
+    The hash of an uploaded file is remembered together with the remote
+    file's size, modification time and inode under its absolute path, so a
+    later sync only needs to stat the file. The remote file is only hashed if
+    it was changed or is unknown. The known hashes are kept per target and
+    are dropped when the driver is deactivated, which the strategies do
+    before power cycling or resetting the target.
+
+    If the target can't resolve the path or only reports modification times
+    in whole seconds, changes can't be detected reliably and the remote file
+    is always hashed.
+    """
+    # checksum tools to try on the target, in order of preference
+    sync_algorithms = ('sha256', 'md5')
+    # hashing a large image on a slow target can take a while
+    sync_timeout = 300.0
+
+    def _get_sync_path(self, filename, remotepath):
+        """Return a shell snippet setting $f to the remote file name, resolving
+        uploads into a directory like cp and scp do"""
+        return 'f={}; [ -d "$f" ] && f="$f"/{}; '.format(
+            shlex.quote(remotepath or '.'), shlex.quote(os.path.basename(filename))
+        )
+
+    def _get_sync_stat(self, filename, remotepath):
+        """Return (absolute path, stat) of the remote file or None if it does
+        not exist or can't be checked for changes without hashing it"""
+        out, _, code = self._run(
+            self._get_sync_path(filename, remotepath) +
+            'readlink -f "$f" && stat -L -c "%s %y %i" "$f"'
+        )
+        if code != 0 or len(out) < 2:
+            return None
+        path, stat = out[0].strip(), out[1].strip()
+        # %y includes the fractional seconds if the target supports them
+        if not re.search(r'\.\d*[1-9]', stat):
+            return None
+        return path, stat
+
+    def _get_remote_hash(self, filename, remotepath):
+        """Return (algorithm, digest) of the remote file, the digest is None
+        if the file does not exist and algorithm is None if the target has
+        no checksum tool"""
+        algorithms = self.sync_algorithms
+        if self.target in _remote_algorithms:
+            algorithm = _remote_algorithms[self.target]
+            algorithms = (algorithm,) if algorithm else ()
+        for algorithm in algorithms:
+            out, _, code = self._run(
+                self._get_sync_path(filename, remotepath) + '{}sum "$f"'.format(algorithm),
+                timeout=self.sync_timeout
+            )
+            if code == 127:
+                # command not found
+                continue
+            _remote_algorithms[self.target] = algorithm
+            if code != 0 or not out:
+                return algorithm, None
+            return algorithm, out[0].split()[0]
+        _remote_algorithms[self.target] = None
+        return None, None
+
+    def _check_synced(self, filename, remotepath):
+        """Return True if the remote file has the same contents as filename"""
+        known = _remote_hashes.setdefault(self.target, {})
+        stat = self._get_sync_stat(filename, remotepath)
+        entry = known.get(stat[0]) if stat is not None else None
+        if entry is not None and entry[0] == stat[1]:
+            _, algorithm, digest = entry
+        else:
+            algorithm, digest = self._get_remote_hash(filename, remotepath)
+            if digest is None:
+                return False
+            if stat is not None:
+                known[stat[0]] = (stat[1], algorithm, digest)
+        return get_local_hash(filename, algorithm) == digest
+
+    def _record_synced(self, filename, remotepath):
+        """Remember the hash of filename after it was uploaded to remotepath"""
+        algorithm = _remote_algorithms.get(self.target)
+        if not algorithm:
+            # unknown until a remote file was hashed
+            return
+        stat = self._get_sync_stat(filename, remotepath)
+        if stat is not None:
+            known = _remote_hashes.setdefault(self.target, {})
+            known[stat[0]] = (stat[1], algorithm, get_local_hash(filename, algorithm))
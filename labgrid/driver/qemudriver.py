@@ -190,6 +190,7 @@ class QEMUDriver(ConsoleExpectMixin, Driver, PowerProtocol, ConsoleProtocol):
         """Stop the emulator using a monitor command and await the exitcode"""
         if not self.status:
             return
+        self.disable_multiplexer()
         self.monitor_command('quit')
         if self._child.wait() != 0:
             raise IOError
@@ -65,17 +65,21 @@ class SerialDriver(ConsoleExpectMixin, Driver, ConsoleProtocol):
         self.open()
 
     def on_deactivate(self):
+        self.disable_multiplexer()
         self.close()
 
     def _read(self, size: int = 1, timeout: float = 0.0):
         """
-        Reads 'size' or more bytes from the serialport
+        Reads 'size' or more bytes from the serialport, all bytes which are
+        already waiting are returned as well
 
         Keyword Arguments:
         size -- amount of bytes to read, defaults to 1
         """
         reading = max(size, self.serial.in_waiting)
-        self.serial.timeout = timeout
+        # changing the timeout reconfigures the port, so only do it when needed
+        if self.serial.timeout != timeout:
+            self.serial.timeout = timeout
         res = self.serial.read(reading)
         if not res:
             raise TIMEOUT("Timeout of %.2f seconds exceeded or connection closed by peer" % timeout)
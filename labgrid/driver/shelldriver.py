@@ -1,6 +1,8 @@
 # pylint: disable=no-member,missing-kwoa,unused-argument
 """The ShellDriver provides the CommandProtocol, ConsoleProtocol and
  InfoProtocol on top of a SerialPort."""
+import base64
+import gzip
 import io
 import logging
 import re
@@ -13,15 +15,26 @@ import xmodem
 from ..factory import target_factory
 from ..protocol import CommandProtocol, ConsoleProtocol, FileTransferProtocol
 from ..step import step
-from ..util import gen_marker
+from ..util import gen_marker, Timeout
+from ..util.cksum import posix_cksum
 from .commandmixin import CommandMixin
 from .common import Driver
 from .exception import ExecutionError
+from .filesyncmixin import FileSyncMixin, invalidate_remote_hashes
+
+
+def _get_zstandard():
+    """Return the optional zstandard module or None if it is not installed"""
+    try:
+        import zstandard  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return None
+    return zstandard
 
 
 @target_factory.reg_driver
 @attr.s(cmp=False)
-class ShellDriver(CommandMixin, Driver, CommandProtocol, FileTransferProtocol):
+class ShellDriver(CommandMixin, FileSyncMixin, Driver, CommandProtocol, FileTransferProtocol):
     """ShellDriver - Driver to execute commands on the shell
     ShellDriver binds on top of a ConsoleProtocol.
 
@@ -32,6 +45,10 @@ class ShellDriver(CommandMixin, Driver, CommandProtocol, FileTransferProtocol):
         password (str): password to login with
         keyfile (str): keyfile to bind mount over users authorized keys
         login_timeout (int): optional, timeout for login prompt detection
+
+    Files are transferred in blocks of stream_block_size bytes, which are
+    compressed if possible, sent as base64 and checked with cksum on the
+    target. XMODEM is used if the target lacks the necessary tools.
     """
     bindings = {"console": ConsoleProtocol, }
     prompt = attr.ib(validator=attr.validators.instance_of(str))
@@ -43,6 +60,13 @@ class ShellDriver(CommandMixin, Driver, CommandProtocol, FileTransferProtocol):
     console_ready = attr.ib(default="", validator=attr.validators.instance_of(str))
     await_login_timeout = attr.ib(default=2, validator=attr.validators.instance_of(int))
 
+    # raw data per block of the streaming file transfer
+    stream_block_size = 64*1024
+    # attempts to transfer a block before giving up
+    stream_retries = 3
+    # time to wait for a block in addition to the time needed for its data
+    stream_timeout = 30.0
+
 
     def __attrs_post_init__(self):
         super().__attrs_post_init__()
@@ -51,9 +75,13 @@ class ShellDriver(CommandMixin, Driver, CommandProtocol, FileTransferProtocol):
         )  # pylint: disable=attribute-defined-outside-init,anomalous-backslash-in-string
         self.logger = logging.getLogger("{}:{}".format(self, self.target))
         self._status = 0  # pylint: disable=attribute-defined-outside-init
+        # True if the last command ended at the prompt and the prompt check
+        # can be skipped for the next command
+        self._at_prompt = False
 
         self._xmodem_cached_rx_cmd = ""
         self._xmodem_cached_sx_cmd = ""
+        self._stream_tools = None
 
     def on_activate(self):
         if self._status == 0:
@@ -66,39 +94,166 @@ class ShellDriver(CommandMixin, Driver, CommandProtocol, FileTransferProtocol):
 
     def on_deactivate(self):
         self._status = 0
+        self._at_prompt = False
+        invalidate_remote_hashes(self.target)
 
-    def _run(self, cmd, *, timeout=30.0, codec="utf-8", decodeerrors="strict"):
+    def _send_commands(self, cmds):
         """
-        Runs the specified cmd on the shell and returns the output.
+        Sends the commands in a single line, each wrapped in its own marker.
+        The prompt is checked first, unless the last command ended cleanly at
+        the prompt.
 
-        Arguments:
-        cmd - cmd to run on the shell
+        Returns:
+            List[str]: the markers of the commands
         """
         # FIXME: Handle pexpect Timeout
-        self._check_prompt()
-        marker = gen_marker()
-        # hide marker from expect
-        cmp_command = '''MARKER='{}''{}' run {}'''.format(
-            marker[:4], marker[4:], shlex.quote(cmd)
+        if not self._at_prompt:
+            self._check_prompt()
+        self._at_prompt = False
+        markers = [gen_marker() for _ in cmds]
+        # hide markers from expect
+        cmp_command = '; '.join(
+            '''MARKER='{}''{}' run {}'''.format(marker[:4], marker[4:], shlex.quote(cmd))
+            for marker, cmd in zip(markers, cmds)
         )
         self.console.sendline(cmp_command)
-        _, _, match, _ = self.console.expect(r'{}(.*){}\s+(\d+)\s+{}'.format(
-            marker, marker, self.prompt
-        ), timeout=timeout)
-        # Remove VT100 Codes, split by newline and remove surrounding newline
-        data = self.re_vt100.sub('', match.group(1).decode(codec, decodeerrors)).split('\r\n')
+        return markers
+
+    def _await_commands(self, markers, timeout, started=False):
+        """
+        Waits until the commands sent by _send_commands() have finished. If
+        started is True, the output up to the first marker was already
+        consumed by the caller.
+
+        Returns:
+            Tuple[bytes, str]: the output starting after the first marker
+            and the exit code of the last command
+        """
+        timeout = Timeout(float(timeout))
+        # match the output's start and end separately, so that expect only
+        # needs to search the latest data for each marker
+        if not started:
+            self.console.expect(markers[0], timeout=timeout.remaining)
+        _, before, match, _ = self.console.expect(r'{}\s+(\d+)\s+{}'.format(
+            markers[-1], self.prompt
+        ), timeout=timeout.remaining)
+        self._at_prompt = True
+        return before, match.group(1)
+
+    def _parse_output(self, data):
+        """Removes VT100 codes, splits by newline and removes the surrounding newline"""
+        data = self.re_vt100.sub('', data).split('\r\n')
         if data and not data[-1]:
             del data[-1]
         self.logger.debug("Received Data: %s", data)
-        # Get exit code
-        exitcode = int(match.group(2))
-        return (data, [], exitcode)
+        return data
+
+    def _run(self, cmd, *, timeout=30.0, codec="utf-8", decodeerrors="strict"):
+        """
+        Runs the specified cmd on the shell and returns the output.
+
+        Arguments:
+        cmd - cmd to run on the shell
+        """
+        markers = self._send_commands([cmd])
+        before, exitcode = self._await_commands(markers, timeout)
+        data = self._parse_output(before.decode(codec, decodeerrors))
+        return (data, [], int(exitcode))
 
     @Driver.check_active
     @step(args=['cmd'], result=True)
     def run(self, cmd, timeout=30.0, codec="utf-8", decodeerrors="strict"):
         return self._run(cmd, timeout=timeout, codec=codec, decodeerrors=decodeerrors)
 
+    def _run_iter(self, cmd, *, timeout=30.0, codec="utf-8", decodeerrors="strict"):
+        """
+        Runs the specified cmd on the shell and yields the output lines as
+        they arrive. The command is interrupted with Ctrl-C if the iteration
+        is stopped early.
+
+        Arguments:
+        cmd - cmd to run on the shell
+        """
+        markers = self._send_commands([cmd])
+        end = re.compile(r'{}\s+(\d+)'.format(markers[0]))
+        try:
+            self.console.expect(markers[0], timeout=timeout)
+            match = None
+            while match is None:
+                line, match = self._read_console_line(end, timeout, codec, decodeerrors)
+                # the last line may not be terminated before the marker
+                if line or match is None:
+                    yield line
+        except GeneratorExit:
+            return self._interrupt_command(markers[0], timeout)
+        except TIMEOUT:
+            self._interrupt_command(markers[0], timeout)
+            raise
+        self.console.expect(self.prompt, timeout=timeout)
+        self._at_prompt = True
+        return int(match.group(1))
+
+    def _interrupt_command(self, marker, timeout):
+        """
+        Interrupts the running command and waits for the prompt.
+
+        Returns:
+            int: the exit code if the command finished before it was
+            interrupted, None otherwise
+        """
+        self.console.sendcontrol('c')
+        index, _, match, _ = self.console.expect(
+            [r'{}\s+(\d+)\s+{}'.format(marker, self.prompt), self.prompt], timeout=timeout
+        )
+        # the output may have contained the prompt, so check it before the
+        # next command
+        self._at_prompt = False
+        return int(match.group(1)) if index == 0 else None
+
+    def _run_many(self, cmds, *, timeout=30.0, codec="utf-8", decodeerrors="strict"):
+        """
+        Runs the specified cmds on the shell with a single console write and
+        returns their results.
+
+        Arguments:
+        cmds - list of cmds to run on the shell
+        """
+        if not cmds:
+            return []
+        markers = self._send_commands(cmds)
+        before, last_exitcode = self._await_commands(markers, timeout)
+        data = before.decode(codec, decodeerrors)
+        results = []
+        for marker, next_marker in zip(markers, markers[1:]):
+            # each command's output is followed by "<marker> <exitcode>" and
+            # the next command's marker
+            end = data.index(next_marker)
+            output, _, exitcode = data[:end].rpartition(marker)
+            results.append((self._parse_output(output), [], int(exitcode)))
+            data = data[end+len(next_marker):]
+        results.append((self._parse_output(data), [], int(last_exitcode)))
+        return results
+
+    @Driver.check_active
+    @step(args=['cmds'], result=True)
+    def run_many(self, cmds, timeout=30.0, codec="utf-8", decodeerrors="strict"):
+        """
+        Run several commands with a single console write and a single wait for
+        the prompt, which saves the round trips of the individual run() calls.
+        All commands are sent on one line, so the batch has to fit into the
+        line length limit of the target's terminal.
+
+        Args:
+            cmds (List[str]): commands to run in order, regardless of the
+                exit codes of the previous commands
+            timeout (float): timeout for the whole batch
+
+        Returns:
+            List[Tuple[List[str], List[str], int]]: the (stdout, stderr,
+            exitcode) tuple of each command
+        """
+        return self._run_many(cmds, timeout=timeout, codec=codec, decodeerrors=decodeerrors)
+
     @step()
     def _await_login(self):
         """Awaits the login prompt and logs the user in"""
@@ -179,8 +334,10 @@ class ShellDriver(CommandMixin, Driver, CommandProtocol, FileTransferProtocol):
             self.console.expect("{}".format(marker), timeout=2)
             self.console.expect(self.prompt, timeout=1)
             self._status = 1
+            self._at_prompt = True
         except TIMEOUT:
             self._status = 0
+            self._at_prompt = False
             raise
 
     def _inject_run(self):
@@ -288,6 +445,7 @@ class ShellDriver(CommandMixin, Driver, CommandProtocol, FileTransferProtocol):
         read from the console directly into our XMODEM instance instead.
         """
 
+        self._at_prompt = False
         marker = gen_marker()
         marked_cmd = "echo '{}''{}'; {}".format(marker[:4], marker[4:], cmd)
         self.console.sendline(marked_cmd)
@@ -322,8 +480,152 @@ class ShellDriver(CommandMixin, Driver, CommandProtocol, FileTransferProtocol):
         # use the cached string template to make the full command with parameters
         return self._xmodem_cached_sx_cmd.format(filename=filename)
 
+    def _get_stream_tools(self):
+        """ Detect which tools for the streaming transfer are available on the target, and cache
+        the result. """
+        if self._stream_tools is None:
+            names = ['base64', 'head', 'stty', 'cksum', 'gzip', 'gunzip', 'zstd']
+            results = self._run_many(['which {}'.format(name) for name in names])
+            self._stream_tools = {name for name, (out, _, _) in zip(names, results) if out}
+            self.logger.debug('streaming transfer tools on target: %s', self._stream_tools)
+        return self._stream_tools
+
+    def _get_stream_codec(self, target_tool):
+        """ Select the compression for the streaming transfer, which needs target_tool ('zstd',
+        'gzip' or 'gunzip') on the target. zstd also needs the zstandard module. """
+        tools = self._get_stream_tools()
+        if 'zstd' in tools and _get_zstandard() is not None:
+            return 'zstd'
+        if target_tool in tools:
+            return 'gzip'
+        return None
+
+    def _stream_compress(self, codec, data):
+        if codec == 'zstd':
+            return _get_zstandard().ZstdCompressor().compress(data)
+        if codec == 'gzip':
+            return gzip.compress(data)
+        return data
+
+    def _stream_decompress(self, codec, data):
+        if codec == 'zstd':
+            return _get_zstandard().ZstdDecompressor().decompressobj().decompress(data)
+        if codec == 'gzip':
+            return gzip.decompress(data)
+        return data
+
+    def _abort_stream(self):
+        """ Interrupt a stalled block transfer and restore the terminal settings. """
+        self.console.sendcontrol('c')
+        self.console.sendline('stty echo icanon')
+        self._at_prompt = False
+
+    def _put_stream_block(self, block: bytes, blockfile: str, codec):
+        """ Send one block to blockfile on the target, returns None if it was received intact or
+        the reason of the failure. A lost byte stalls the transfer until the timeout, then the
+        block is aborted and can be retried. """
+        data = base64.b64encode(self._stream_compress(codec, block))
+        decoder = {'zstd': '| zstd -dc ', 'gzip': '| gunzip -c ', None: ''}[codec]
+        sync = gen_marker()
+        # the terminal must not echo the data or wait for a newline, so switch to
+        # non-canonical mode and only send the data after the sync marker
+        cmd = ("stty -echo -icanon min 1 time 0; echo '{}''{}'; head -c {} | base64 -d {}> '{}';"
+               " ret=$?; stty echo icanon; [ $ret -eq 0 ] && cksum < '{}'").format(
+                   sync[:4], sync[4:], len(data), decoder, blockfile, blockfile)
+        markers = self._send_commands([cmd])
+        try:
+            self.console.expect(sync, timeout=10)
+            self.console.write(data)
+            before, exitcode = self._await_commands(markers,
+                                                    self.stream_timeout + len(data) / 1000,
+                                                    started=True)
+        except TIMEOUT:
+            # the next command checks for the prompt again
+            self._abort_stream()
+            return "timeout"
+        result = self._parse_output(before.decode('utf-8', 'replace'))
+        if int(exitcode) != 0:
+            # decoding or writing the block failed, the output contains the error
+            return "decoding failed ({})".format(' '.join(result).strip() or exitcode)
+        expected = '{} {}'.format(posix_cksum(block), len(block))
+        if not result or result[-1].strip() != expected:
+            return "CRC mismatch"
+        return None
+
+    def _put_bytes_stream(self, buf: bytes, remotefile: str):
+        codec = self._get_stream_codec('gunzip')
+        self.logger.debug('streaming transfer with compression %s', codec)
+        blockfile = self._run_check('mktemp')
+        if not blockfile:
+            raise ExecutionError('Could not make temporary file on target')
+        blockfile = blockfile[0]
+        # the verified blocks are collected next to the destination, which is
+        # only replaced once all blocks were transferred
+        tmpfile = '{}.tmp'.format(remotefile)
+        try:
+            self._run_check(": > '{}'".format(tmpfile))
+            for start in range(0, len(buf), self.stream_block_size):
+                block = buf[start:start+self.stream_block_size]
+                for _ in range(self.stream_retries):
+                    error = self._put_stream_block(block, blockfile, codec)
+                    if error is None:
+                        break
+                    self.logger.debug('%s for block at offset %d, retrying', error, start)
+                else:
+                    raise ExecutionError('Could not transfer block at offset {} to target: {}'.
+                                         format(start, error))
+                self._run_check("cat '{}' >> '{}'".format(blockfile, tmpfile))
+            self._run_check("mv '{}' '{}'".format(tmpfile, remotefile))
+        finally:
+            self._run("rm -f '{}' '{}'".format(blockfile, tmpfile))
+
+    def _get_stream_block(self, remotefile: str, blockfile: str, index: int, codec):
+        """ Read the block with the given index of remotefile and check its CRC. """
+        encoder = {'zstd': 'zstd -c', 'gzip': 'gzip -c', None: 'cat'}[codec]
+        cmd = ("dd if='{}' of='{}' bs={} skip={} count=1 2>/dev/null && cksum < '{}' &&"
+               " {} '{}' | base64").format(
+                   remotefile, blockfile, self.stream_block_size, index, blockfile, encoder,
+                   blockfile)
+        for _ in range(self.stream_retries):
+            out, _, ret = self._run(cmd, timeout=30.0 + self.stream_block_size / 500)
+            if ret != 0 or not out:
+                raise ExecutionError("Could not read '{}' on target".format(remotefile))
+            crc, length = out[0].split()[:2]
+            try:
+                block = self._stream_decompress(codec, base64.b64decode(''.join(out[1:])))
+            except (ValueError, OSError, EOFError):
+                block = None
+            if block is not None and len(block) == int(length) and \
+                    posix_cksum(block) == int(crc):
+                return block
+            self.logger.debug('CRC mismatch for block %d, retrying', index)
+        raise ExecutionError('Could not transfer block {} from target'.format(index))
+
+    def _get_bytes_stream(self, remotefile: str):
+        codec = self._get_stream_codec('gzip')
+        self.logger.debug('streaming transfer with compression %s', codec)
+        blockfile = self._run_check('mktemp')
+        if not blockfile:
+            raise ExecutionError('Could not make temporary file on target')
+        blockfile = blockfile[0]
+        blocks = []
+        try:
+            while True:
+                block = self._get_stream_block(remotefile, blockfile, len(blocks), codec)
+                blocks.append(block)
+                if len(block) < self.stream_block_size:
+                    break
+        finally:
+            self._run("rm -f '{}'".format(blockfile))
+        return b''.join(blocks)
+
     @step(title='put_bytes', args=['remotefile'])
     def _put_bytes(self, buf: bytes, remotefile: str):
+        if {'base64', 'head', 'stty', 'cksum'} <= self._get_stream_tools():
+            return self._put_bytes_stream(buf, remotefile)
+        return self._put_bytes_xmodem(buf, remotefile)
+
+    def _put_bytes_xmodem(self, buf: bytes, remotefile: str):
         # OK, a little explanation on what we're doing here:
         # XMODEM is a fairly simple, but also a fairly historic protocol. For example, all packets
         # carry exactly 128 bytes of payload, and if the file being sent is not a multiple of 128
@@ -357,8 +659,12 @@ class ShellDriver(CommandMixin, Driver, CommandProtocol, FileTransferProtocol):
 
         self.console.expect(self.prompt, timeout=30)
 
-        # truncate the file to get rid of CPMEOF padding
-        dd_cmd = "dd if='{}' of='{}' bs=1 count={}".format(tmpfile, remotefile, len(buf))
+        # truncate the file to get rid of CPMEOF padding, copying the whole
+        # blocks first and only the remainder byte by byte
+        blocks, rest = divmod(len(buf), 4096)
+        dd_cmd = "dd if='{0}' of='{1}' bs=4096 count={2} && " \
+                 "dd if='{0}' of='{1}' bs=1 skip={3} seek={3} count={4} conv=notrunc".format(
+                     tmpfile, remotefile, blocks, blocks*4096, rest)
         self.logger.debug('dd command: %s', dd_cmd)
         out, _, ret = self._run(dd_cmd)
 
@@ -389,22 +695,34 @@ class ShellDriver(CommandMixin, Driver, CommandProtocol, FileTransferProtocol):
             self._put_bytes(buf, remotefile)
 
     @Driver.check_active
-    def put(self, localfile: str, remotefile: str):
+    def put(self, localfile: str, remotefile: str, sync: bool = False):
         """ Upload a file to the target.
         Will silently overwrite the remote file if it already exists.
 
         Args:
             localfile (str): source filename on the local machine
             remotefile (str): destination filename on the target
+            sync (bool): skip the transfer if the remote file already has the
+                same checksum
 
         Raises:
             IOError: if the provided localfile could not be found
             ExecutionError: if something else went wrong
         """
+        if sync and self._check_synced(localfile, remotefile):
+            self.logger.info("%s is up to date on the target, skipping upload", localfile)
+            return
         self._put(localfile, remotefile)
+        if sync:
+            self._record_synced(localfile, remotefile)
 
     @step(title='get_bytes', args=['remotefile'])
     def _get_bytes(self, remotefile: str):
+        if {'base64', 'cksum'} <= self._get_stream_tools():
+            return self._get_bytes_stream(remotefile)
+        return self._get_bytes_xmodem(remotefile)
+
+    def _get_bytes_xmodem(self, remotefile: str):
         buf = io.BytesIO()
 
         cmd = self._get_xmodem_sx_cmd(remotefile)
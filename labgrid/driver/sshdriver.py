@@ -2,9 +2,13 @@
 """The SSHDriver uses SSH as a transport to implement CommandProtocol and FileTransferProtocol"""
 import logging
 import os
+import queue
+import selectors
 import shutil
 import subprocess
 import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 import attr
 
@@ -15,20 +19,35 @@ from .commandmixin import CommandMixin
 from .common import Driver
 from ..step import step
 from .exception import ExecutionError
+from .filesyncmixin import FileSyncMixin, invalidate_remote_hashes
+from .sshsession import SSHSession
 
 
 @target_factory.reg_driver
 @attr.s(cmp=False)
-class SSHDriver(CommandMixin, Driver, CommandProtocol, FileTransferProtocol):
-    """SSHDriver - Driver to execute commands via SSH"""
+class SSHDriver(CommandMixin, FileSyncMixin, Driver, CommandProtocol, FileTransferProtocol):
+    """SSHDriver - Driver to execute commands via SSH
+
+    With persistent set, the commands are run in long-lived remote shells
+    instead of a new ssh process for each command. slots is the number of
+    these sessions, which allows running as many commands concurrently.
+    run_iter() and the file transfers always start their own ssh process.
+    Like with separate ssh processes, the timeout of run() is ignored.
+    """
     bindings = {"networkservice": NetworkService, }
     priorities = {CommandProtocol: 10, FileTransferProtocol: 10}
     keyfile = attr.ib(default="", validator=attr.validators.instance_of(str))
     stderr_merge = attr.ib(default=False, validator=attr.validators.instance_of(bool))
+    persistent = attr.ib(default=False, validator=attr.validators.instance_of(bool))
+    slots = attr.ib(default=1, validator=attr.validators.instance_of(int))
 
     def __attrs_post_init__(self):
         super().__attrs_post_init__()
         self.logger = logging.getLogger("{}({})".format(self, self.target))
+        if self.slots < 1:
+            raise ValueError("slots must be at least 1")
+        self._sessions = None
+        self._sessions_lock = threading.Lock()
 
     def on_activate(self):
         self.ssh_prefix = "-o LogLevel=ERROR"
@@ -41,9 +60,13 @@ class SSHDriver(CommandMixin, Driver, CommandProtocol, FileTransferProtocol):
         self.ssh_prefix += " -o ControlPath={}".format(
             self.control
         ) if self.control else ""
+        if self.persistent:
+            self._open_sessions()
 
     def on_deactivate(self):
+        self._close_sessions()
         self._cleanup_own_master()
+        invalidate_remote_hashes(self.target)
 
     def _start_own_master(self):
         """Starts a controlmaster connection in a temporary directory."""
@@ -102,10 +125,19 @@ class SSHDriver(CommandMixin, Driver, CommandProtocol, FileTransferProtocol):
 
     @Driver.check_active
     @step(args=['cmd'], result=True)
-    def run(self, cmd, codec="utf-8", decodeerrors="strict", timeout=None): # pylint: disable=unused-argument
-        return self._run(cmd, codec=codec, decodeerrors=decodeerrors)
+    def run(self, cmd, codec="utf-8", decodeerrors="strict", timeout=None):
+        return self._run(cmd, codec=codec, decodeerrors=decodeerrors, timeout=timeout)
 
-    def _run(self, cmd, codec="utf-8", decodeerrors="strict", timeout=None): # pylint: disable=unused-argument
+    def _get_ssh_command(self, cmd):
+        return "ssh -x {prefix} -p {port} {user}@{host} {cmd}".format(
+            user=self.networkservice.username,
+            host=self.networkservice.address,
+            cmd=cmd,
+            prefix=self.ssh_prefix,
+            port=self.networkservice.port
+        ).split(' ')
+
+    def _run(self, cmd, codec="utf-8", decodeerrors="strict", timeout=None):
         """Execute `cmd` on the target.
 
         This method runs the specified `cmd` as a command on its target.
@@ -115,13 +147,10 @@ class SSHDriver(CommandMixin, Driver, CommandProtocol, FileTransferProtocol):
         returns:
         (stdout, stderr, returncode)
         """
-        complete_cmd = "ssh -x {prefix} -p {port} {user}@{host} {cmd}".format(
-            user=self.networkservice.username,
-            host=self.networkservice.address,
-            cmd=cmd,
-            prefix=self.ssh_prefix,
-            port=self.networkservice.port
-        ).split(' ')
+        sessions = self._sessions
+        if sessions is not None:
+            return self._run_persistent(sessions, cmd, codec=codec, decodeerrors=decodeerrors)
+        complete_cmd = self._get_ssh_command(cmd)
         self.logger.debug("Sending command: %s", complete_cmd)
         if self.stderr_merge:
             stderr_pipe = subprocess.STDOUT
@@ -146,13 +175,153 @@ class SSHDriver(CommandMixin, Driver, CommandProtocol, FileTransferProtocol):
             stderr.pop()
         return (stdout, stderr, sub.returncode)
 
+    def _run_persistent(self, sessions, cmd, *, codec, decodeerrors):
+        """Execute `cmd` in a free session from the sessions queue, starting
+        it if necessary.
+
+        The session is closed if the command fails, a new one is started for
+        the next command.
+        """
+        session = sessions.get()
+        try:
+            if session is None or not session.alive:
+                self.logger.debug("Starting session")
+                session = SSHSession(self._get_ssh_command('sh'), stderr_merge=self.stderr_merge)
+            self.logger.debug("Sending command: %s", cmd)
+            stdout, stderr, exitcode = session.run(cmd)
+        except Exception:
+            if session is not None:
+                session.close()
+                session = None
+            raise
+        finally:
+            self._release_session(sessions, session)
+        stdout = stdout.decode(codec, decodeerrors).split('\n')
+        stdout.pop()
+        if self.stderr_merge:
+            stderr = []
+        else:
+            stderr = stderr.decode(codec, decodeerrors).split('\n')
+            stderr.pop()
+        return (stdout, stderr, exitcode)
+
+    def _open_sessions(self):
+        # the sessions are started when they are needed, None is a free slot
+        sessions = queue.Queue()
+        for _ in range(self.slots):
+            sessions.put(None)
+        self._sessions = sessions
+
+    def _release_session(self, sessions, session):
+        """Return session to its queue or close it if the sessions were
+        closed while it was in use"""
+        with self._sessions_lock:
+            if sessions is self._sessions:
+                sessions.put(session)
+                return
+        if session is not None:
+            session.close()
+
+    def _close_sessions(self):
+        # sessions which are in use are closed when they are released
+        with self._sessions_lock:
+            sessions, self._sessions = self._sessions, None
+        if sessions is None:
+            return
+        while not sessions.empty():
+            session = sessions.get()
+            if session is not None:
+                session.close()
+
+    @Driver.check_active
+    @step(args=['cmds'], result=True)
+    def run_many(self, cmds, codec="utf-8", decodeerrors="strict", timeout=None):
+        """
+        Run several commands and return their results. With persistent
+        sessions, the commands are run concurrently in all slots, otherwise
+        one after the other.
+
+        Args:
+            cmds (List[str]): commands to run, regardless of the exit codes of
+                the other commands
+            timeout (float): ignored, like the timeout of run()
+
+        Returns:
+            List[Tuple[List[str], List[str], int]]: the (stdout, stderr,
+            exitcode) tuple of each command
+        """
+        def run(cmd):
+            return self._run(cmd, codec=codec, decodeerrors=decodeerrors, timeout=timeout)
+
+        if self._sessions is None or self.slots == 1 or len(cmds) < 2:
+            return [run(cmd) for cmd in cmds]
+        with ThreadPoolExecutor(max_workers=min(self.slots, len(cmds))) as executor:
+            return list(executor.map(run, cmds))
+
+    def _run_iter(self, cmd, *, timeout=30.0, codec="utf-8", decodeerrors="strict"):
+        """Execute `cmd` on the target and yield the lines of its stdout as they
+        arrive, the exitcode is returned at the end.
+
+        stderr is merged into stdout if stderr_merge is set, otherwise it is
+        passed through to labgrid's stderr. If the iteration is stopped early,
+        the ssh process is terminated.
+        """
+        complete_cmd = self._get_ssh_command(cmd)
+        self.logger.debug("Sending command: %s", complete_cmd)
+        try:
+            sub = subprocess.Popen(
+                complete_cmd, stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT if self.stderr_merge else None
+            )
+        except:
+            raise ExecutionError(
+                "error executing command: {}".format(complete_cmd)
+            )
+
+        try:
+            with selectors.DefaultSelector() as selector:
+                selector.register(sub.stdout, selectors.EVENT_READ)
+                rest = b''
+                while True:
+                    if not selector.select(timeout):
+                        raise ExecutionError(
+                            "no output from command for {} seconds: {}".format(timeout, cmd)
+                        )
+                    data = os.read(sub.stdout.fileno(), 4096)
+                    if not data:
+                        break
+                    *lines, rest = (rest + data).split(b'\n')
+                    for line in lines:
+                        yield line.decode(codec, decodeerrors)
+                if rest:
+                    yield rest.decode(codec, decodeerrors)
+        except GeneratorExit:
+            sub.terminate()
+        except ExecutionError:
+            sub.terminate()
+            raise
+        finally:
+            sub.stdout.close()
+            sub.wait()
+        return sub.returncode
+
     def get_status(self):
         """The SSHDriver is always connected, return 1"""
         return 1
 
     @Driver.check_active
-    @step(args=['filename', 'remotepath'])
-    def put(self, filename, remotepath=''):
+    @step(args=['filename', 'remotepath', 'sync'])
+    def put(self, filename, remotepath='', sync=False):
+        """Upload filename to remotepath on the target, with sync=True the
+        transfer is skipped if the remote file already has the same checksum"""
+        if sync and self._check_synced(filename, remotepath):
+            self.logger.info("%s is up to date on the target, skipping upload", filename)
+            return
+        self._put(filename, remotepath)
+        if sync:
+            self._record_synced(filename, remotepath)
+
+    def _put(self, filename, remotepath):
         transfer_cmd = "scp {prefix} -P {port} {filename} {user}@{host}:{remotepath}".format(
             filename=filename,
             user=self.networkservice.username,
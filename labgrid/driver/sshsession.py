@@ -0,0 +1,146 @@
+import os
+import re
+import selectors
+import shlex
+import subprocess
+
+from ..util import gen_marker, Timeout
+from .exception import ExecutionError
+
+
+class SSHSession:
+    """
+    Long-lived remote shell which runs commands without starting a new ssh
+    process, channel and shell for each of them.
+
+    Each command is evaluated in a subshell with stdin from /dev/null, so it
+    can neither change the state of the session nor consume the following
+    commands. The end of its stdout is marked by a random marker and the exit
+    code, the end of its stderr by the marker alone.
+
+    args is the command starting the shell, usually ssh with sh as the
+    remote command.
+    """
+    # timeout for the shell to start
+    start_timeout = 30.0
+    # longer than the end of stdout ("\n<marker> <exitcode>\n")
+    marker_overlap = 64
+
+    def __init__(self, args, stderr_merge=False):
+        self.args = args
+        self.stderr_merge = stderr_merge
+        self._process = subprocess.Popen(
+            args, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+        self._selector = selectors.DefaultSelector()
+        self._buffers = {}
+        for pipe in (self._process.stdout, self._process.stderr):
+            self._selector.register(pipe, selectors.EVENT_READ)
+            self._buffers[pipe] = bytearray()
+        # wait until the shell is ready, discarding anything it printed before
+        marker = gen_marker()
+        try:
+            self._send("printf '%s\\n' {}\n".format(marker))
+            matches = self._read_until(
+                {self._process.stdout: re.compile(marker.encode() + rb'\n')},
+                Timeout(self.start_timeout),
+            )
+        except ExecutionError:
+            self.close()
+            raise
+        self._take(self._process.stdout, matches[self._process.stdout])
+        self._buffers[self._process.stderr].clear()
+
+    @property
+    def alive(self):
+        return self._process.poll() is None
+
+    def _send(self, data):
+        try:
+            self._process.stdin.write(data.encode())
+            self._process.stdin.flush()
+        except OSError as e:
+            raise ExecutionError("session {} closed: {}".format(self.args, e))
+
+    def _read_until(self, patterns, timeout):
+        """Read stdout and stderr until each of the patterns matches the
+        buffer of its pipe, returns the matches"""
+        matches = {}
+        # only search the new data and enough of the old data for a marker
+        # split between reads
+        searched = dict.fromkeys(patterns, 0)
+        while True:
+            for pipe, pattern in patterns.items():
+                if pipe not in matches:
+                    buf = self._buffers[pipe]
+                    match = pattern.search(buf, searched[pipe])
+                    if match is not None:
+                        matches[pipe] = match
+                    searched[pipe] = max(0, len(buf) - self.marker_overlap)
+            if len(matches) == len(patterns):
+                return matches
+            if timeout is not None and timeout.expired:
+                raise ExecutionError("timeout waiting for session {}".format(self.args))
+            events = self._selector.select(None if timeout is None else timeout.remaining)
+            for key, _ in events:
+                data = os.read(key.fd, 65536)
+                if not data:
+                    raise ExecutionError("session {} closed".format(self.args))
+                self._buffers[key.fileobj] += data
+
+    def _take(self, pipe, match):
+        """Remove the output up to the end of match from the buffer of pipe and
+        return the output before the match"""
+        buf = self._buffers[pipe]
+        data = bytes(buf[:match.start()])
+        del buf[:match.end()]
+        return data
+
+    def run(self, cmd, timeout=None):
+        """
+        Run cmd in the session.
+
+        Args:
+            cmd (str): command to run in the remote shell
+            timeout (float): maximum time to wait for the command, the
+                session is unusable after a timeout and needs to be closed
+
+        Returns:
+            Tuple[bytes, bytes, int]: stdout, stderr and the exit code
+        """
+        marker = gen_marker()
+        redirect = "2>&1" if self.stderr_merge else ""
+        # the newlines before the markers end output which lacks a final
+        # newline, they are removed together with the markers
+        self._send(
+            "( eval {cmd} ) </dev/null {redirect}; "
+            "printf '\\n%s %d\\n' {marker} $?; printf '\\n%s\\n' {marker} >&2\n".format(
+                cmd=shlex.quote(cmd), redirect=redirect, marker=marker
+            )
+        )
+        patterns = {
+            self._process.stdout: re.compile(rb'\n' + marker.encode() + rb' (\d+)\n'),
+            self._process.stderr: re.compile(rb'\n' + marker.encode() + rb'\n'),
+        }
+        matches = self._read_until(
+            patterns, None if timeout is None else Timeout(float(timeout))
+        )
+        exitcode = int(matches[self._process.stdout].group(1))
+        stdout = self._take(self._process.stdout, matches[self._process.stdout])
+        stderr = self._take(self._process.stderr, matches[self._process.stderr])
+        return stdout, stderr, exitcode
+
+    def close(self):
+        """Stop the remote shell"""
+        self._selector.close()
+        try:
+            self._process.stdin.close()
+        except OSError:
+            pass
+        try:
+            self._process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+            self._process.wait()
+        self._process.stdout.close()
+        self._process.stderr.close()
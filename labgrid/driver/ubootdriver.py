@@ -92,6 +92,52 @@ class UBootDriver(CommandMixin, Driver, CommandProtocol, LinuxBootProtocol):
 
         return None
 
+    def _run_iter(self, cmd: str, *, timeout=30.0, codec="utf-8", decodeerrors="strict"):
+        """
+        Runs the specified command on the shell and yields the output lines
+        as they arrive. Most U-Boot commands can't be interrupted, so if the
+        iteration is stopped early, the remaining output is discarded until
+        the command has finished.
+
+        Args:
+            cmd (str): command to run on the shell
+            timeout (float): maximum time to wait for each line
+
+        Returns:
+            int: the exit code of the command, None if the driver is not ready
+        """
+        if self._status != 1:
+            return None
+        marker = gen_marker()
+        cmp_command = """echo '{}''{}'; {}; echo "$?"; echo '{}''{}';""".format(
+            marker[:4],
+            marker[4:],
+            cmd,
+            marker[:4],
+            marker[4:],
+        )
+        self.console.sendline(cmp_command)
+        self.console.expect(r'{}\r?\n'.format(marker), timeout=timeout)
+        end = re.compile(marker)
+        # the exit code is printed on the line before the end marker, so
+        # each line is only yielded once the next one has been received
+        last = None
+        match = None
+        try:
+            while match is None:
+                line, match = self._read_console_line(end, timeout, codec, decodeerrors)
+                if match is None:
+                    if last is not None:
+                        yield last
+                    last = line
+        except GeneratorExit:
+            while match is None:
+                line, match = self._read_console_line(end, timeout, codec, decodeerrors)
+                if match is None:
+                    last = line
+        self.console.expect(self.prompt, timeout=timeout)
+        return int(last)
+
     @Driver.check_active
     @step(args=['cmd'], result=True)
     def run(self, cmd, timeout=None): # pylint: disable=unused-argument
@@ -46,6 +46,8 @@ class Environment:
             if not config:
                 return None
             target = target_factory.make_target(role, config, env=self)
+            parallel = self.config.get_option('parallel_activation', 'false')
+            target.parallel_activation = parallel.lower() in ('1', 'true', 'yes')
             self.targets[role] = target
 
         return self.targets[role]
@@ -117,15 +117,19 @@ class USBStick:
         self.command.run_check("umount /mnt/")
         self.command.run_check("losetup -D")
 
-    @step(args=['image'])
-    def upload_image(self, image):
+    @step(args=['image', 'sync'])
+    def upload_image(self, image, sync=False):
         """Upload a complete image as a new USB Stick
 
         This replaces the current USB Stick image, storing it permanently on
-        the RiotBoard."""
+        the RiotBoard. With sync=True, the upload is skipped if the RiotBoard
+        already has an identical image."""
         if self.status != USBStatus.unplugged:
             raise StateError("Device still plugged in, can't insert new image")
-        self.fileservice.put(image, self.image_dir)
+        if sync:
+            self.fileservice.put(image, self.image_dir, sync=True)
+        else:
+            self.fileservice.put(image, self.image_dir)
         self._images.append(os.path.basename(image))
 
     @step(args=['image_name'])
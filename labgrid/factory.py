@@ -1,3 +1,6 @@
+import importlib
+import sys
+
 from .exceptions import InvalidConfigError
 from .util.dict import filter_dict
 
@@ -5,6 +8,49 @@ class TargetFactory:
     def __init__(self):
         self.resources = {}
         self.drivers = {}
+        self.lazy_classes = {}
+
+    def reg_lazy(self, namespace, classes):
+        """Register the classes of a package which are imported from their
+        modules only when they are first used.
+
+        namespace is the globals() dict of the package and classes maps the
+        class names to the modules defining them (relative to the package).
+        Accessing a class as an attribute of the package or creating it via
+        make_resource/make_driver imports the module, which then registers
+        the class as usual. Python versions without support for module
+        __getattr__ (PEP 562) import all modules immediately.
+        """
+        package = namespace['__name__']
+        for name, module in classes.items():
+            self.lazy_classes[name] = (module, package)
+
+        def __getattr__(name):
+            if name not in classes:
+                raise AttributeError("module '{}' has no attribute '{}'".format(package, name))
+            value = getattr(importlib.import_module(classes[name], package), name)
+            namespace[name] = value
+            return value
+
+        def __dir__():
+            return sorted(set(namespace) | set(classes))
+
+        namespace['__getattr__'] = __getattr__
+        namespace['__dir__'] = __dir__
+        if sys.version_info < (3, 7):
+            for name in classes:
+                __getattr__(name)
+
+    def _load(self, name):
+        """Import the module of a lazily registered class"""
+        if name in self.lazy_classes:
+            importlib.import_module(*self.lazy_classes[name])
+
+    def load_all(self):
+        """Import all lazily registered classes, so that the resources and
+        drivers dicts are complete"""
+        for name in list(self.lazy_classes):
+            self._load(name)
 
     def reg_resource(self, cls):
         """Register a resource with the factory.
@@ -103,6 +149,8 @@ class TargetFactory:
 
     def make_resource(self, target, resource, name, args):
         assert isinstance(args, dict)
+        if not resource in self.resources:
+            self._load(resource)
         if not resource in self.resources:
             raise InvalidConfigError("unknown resource class {}".format(resource))
         try:
@@ -117,6 +165,8 @@ class TargetFactory:
 
     def make_driver(self, target, driver, name, args):
         assert isinstance(args, dict)
+        if not driver in self.drivers:
+            self._load(driver)
         if not driver in self.drivers:
             raise InvalidConfigError("unknown driver class {}".format(driver))
         try:
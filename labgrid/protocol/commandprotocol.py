@@ -11,6 +11,15 @@ class CommandProtocol(abc.ABC):
         """
         raise NotImplementedError
 
+    def run_iter(self, command: str):
+        """
+        Run a command, return an iterator over the output lines
+
+        Drivers which can't stream the output use this default, which
+        returns the lines once the command has finished.
+        """
+        return iter(self.run(command)[0])
+
     @abc.abstractmethod
     def run_check(self, command: str):
         """
@@ -1,2 +1,2 @@
 from .fixtures import pytest_addoption, env, target
-from .hooks import pytest_configure, pytest_collection_modifyitems
+from .hooks import pytest_configure, pytest_unconfigure, pytest_collection_modifyitems
@@ -36,6 +36,25 @@ def pytest_addoption(parser):
         nargs='?',
         const=".",
         help='path to store logfiles')
+    group.addoption(
+        '--lg-trace',
+        action='store',
+        dest='lg_trace',
+        metavar='path to trace file',
+        nargs='?',
+        const="labgrid-trace.json",
+        help='write the steps to a trace file (for Perfetto)')
+    group.addoption(
+        '--lg-step-stats',
+        action='store_true',
+        dest='lg_step_stats',
+        help='show the steps with the highest total duration at the end')
+    group.addoption(
+        '--lg-step-stats-json',
+        action='store',
+        dest='lg_step_stats_json',
+        metavar='path to JSON file',
+        help='write the step duration statistics to a JSON file')
     group.addoption(
         '--lg-colored-steps',
         action='store_true',
@@ -4,7 +4,9 @@ import pytest
 
 from .. import Environment
 from ..consoleloggingreporter import ConsoleLoggingReporter
+from ..tracereporter import TraceReporter
 from .reporter import StepReporter, ColoredStepReporter
+from .statsreporter import StepStatsReporter
 
 @pytest.hookimpl(trylast=True)
 def pytest_configure(config):
@@ -23,6 +25,12 @@ def pytest_configure(config):
         logging.getLogger().setLevel(logging.DEBUG)
     if lg_log:
         ConsoleLoggingReporter(lg_log)
+    if config.option.lg_trace:
+        TraceReporter.start(config.option.lg_trace)
+    if config.option.lg_step_stats or config.option.lg_step_stats_json:
+        config.pluginmanager.register(
+            StepStatsReporter(show=config.option.lg_step_stats,
+                              json_path=config.option.lg_step_stats_json))
     env_config = config.option.env_config
     lg_env = config.option.lg_env
     lg_coordinator = config.option.lg_coordinator
@@ -44,6 +52,11 @@ def pytest_configure(config):
             env.config.set_option('crossbar_url', lg_coordinator)
     config._labgrid_env = env
 
+@pytest.hookimpl()
+def pytest_unconfigure(config):  # pylint: disable=unused-argument
+    if TraceReporter.instance is not None:
+        TraceReporter.stop()
+
 @pytest.hookimpl()
 def pytest_collection_modifyitems(config, items):
     """This function matches function feature flags with those found in the
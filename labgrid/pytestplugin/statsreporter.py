@@ -0,0 +1,77 @@
+import json
+
+import pytest
+
+from ..step import steps
+from ..util.sketch import DurationSketch
+
+
+class StepStatsReporter:
+    """
+    Collects the durations of the steps per title, source class and target
+    and shows the steps with the highest total duration at the end of the
+    session. The statistics can also be written to a JSON file.
+    """
+    QUANTILES = (0.5, 0.9, 0.99)
+
+    def __init__(self, *, show=True, top=20, json_path=None):
+        self.show = show
+        self.top = top
+        self.json_path = json_path
+        self.sketches = {}
+        steps.subscribe(self.notify)
+
+    def notify(self, event):
+        if event.stream or event.data.get('state') != 'stop':
+            return
+        step = event.step
+        source = step.source
+        target = getattr(source, 'target', None)
+        key = (
+            step.title,
+            source.__class__.__name__ if source is not None else '',
+            target.name if target is not None else '',
+        )
+        sketch = self.sketches.get(key)
+        if sketch is None:
+            sketch = self.sketches[key] = DurationSketch()
+        sketch.add(step.duration)
+
+    def get_stats(self):
+        """Returns a list of dicts with the statistics of each step, sorted
+        by the total duration"""
+        stats = []
+        for (title, source, target), sketch in self.sketches.items():
+            entry = {
+                'title': title,
+                'source': source,
+                'target': target,
+                'count': sketch.count,
+                'total': sketch.total,
+                'min': sketch.min,
+                'max': sketch.max,
+            }
+            for q in self.QUANTILES:
+                entry['p{}'.format(int(q * 100))] = sketch.quantile(q)
+            stats.append(entry)
+        stats.sort(key=lambda entry: entry['total'], reverse=True)
+        return stats
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_terminal_summary(self, terminalreporter):
+        stats = self.get_stats()
+        if self.json_path:
+            with open(self.json_path, 'w') as f:
+                json.dump({'steps': stats}, f, indent=2)
+        if not self.show or not stats:
+            return
+        tw = terminalreporter._tw
+        tw.sep('=', 'labgrid step durations (top {})'.format(self.top))
+        tw.line("{:>9} {:>6} {:>8} {:>8} {:>8} {:>8}  {}".format(
+            'total', 'count', 'p50', 'p90', 'p99', 'max', 'step'))
+        for entry in stats[:self.top]:
+            tw.line("{total:9.3f} {count:6} {p50:8.3f} {p90:8.3f} {p99:8.3f} {max:8.3f}  "
+                    "{target}/{source}.{title}".format(**entry))
+
+    def pytest_unconfigure(self):
+        steps.unsubscribe(self.notify)
@@ -2,11 +2,15 @@
 coordinator, acquire a place and interact with the connected resources"""
 import argparse
 import asyncio
+import atexit
+import hashlib
+import json
 import os
 import subprocess
 import traceback
 import logging
 import sys
+import tempfile
 from textwrap import indent
 from socket import gethostname
 from getpass import getuser
@@ -16,8 +20,10 @@ from datetime import datetime
 from pprint import pformat
 import txaio
 from autobahn.asyncio.wamp import ApplicationSession
+from autobahn.wamp.exception import ApplicationError
 
-from .common import ResourceEntry, ResourceMatch, Place, enable_tcp_nodelay
+from .common import ResourceEntry, ResourceMatch, Place, PlaceIndex, enable_tcp_nodelay, \
+    get_place_topic
 from ..environment import Environment
 from ..exceptions import NoDriverFoundError, NoResourceFoundError, InvalidConfigError
 from ..resource.remote import RemotePlaceManager, RemotePlace
@@ -27,7 +33,9 @@ from .. import Target, target_factory
 from ..util.proxy import proxymanager
 
 txaio.use_asyncio()
-txaio.config.loop = asyncio.get_event_loop()
+# don't pin txaio to the loop of the importing thread, it then uses the loop
+# running in the calling thread, so sessions can run in their own loops
+txaio.config.loop = None
 
 
 class Error(Exception):
@@ -55,6 +63,7 @@ class ClientSession(ApplicationSession):
         self.role = self.config.extra.get('role', None)
         self.prog = self.config.extra.get('prog', os.path.basename(sys.argv[0]))
         self.monitor = self.config.extra.get('monitor', False)
+        self.listeners = []
         enable_tcp_nodelay(self)
         self.join(
             self.config.realm, ["ticket"],
@@ -65,33 +74,204 @@ class ClientSession(ApplicationSession):
         return "dummy-ticket"
 
     async def onJoin(self, details):
-        # FIXME race condition?
-        resources = await self.call(
-            'org.labgrid.coordinator.get_resources'
-        )
         self.resources = {}
-        for exporter, groups in resources.items():
-            for group_name, group in sorted(groups.items()):
-                for resource_name, resource in sorted(group.items()):
-                    await self.on_resource_changed(
-                        exporter, group_name, resource_name, resource
-                    )
-
-        places = await self.call('org.labgrid.coordinator.get_places')
         self.places = {}
-        for placename, config in places.items():
-            await self.on_place_changed(placename, config)
+        self.place_index = PlaceIndex()
+        self.state_id = None
+        self.state_version = None
+        self.watched_places = set()
+        self.subscribed_all = False
+        # FIXME race condition?
+        await self.sync_state()
+
+        # filtered sessions only subscribe to the places passed to watch_place()
+        if not self.config.extra.get('filtered'):
+            await self.subscribe_all()
+        await self.connected(self)
 
+    async def subscribe_all(self):
+        """Subscribe to the changes of all resources and places"""
+        if self.subscribed_all:
+            return
+        self.subscribed_all = True
         await self.subscribe(
-            self.on_resource_changed,
-            'org.labgrid.coordinator.resource_changed'
+            self.on_resources_changed,
+            'org.labgrid.coordinator.resources_changed'
         )
+        # older coordinators only publish the changes per resource, newer ones
+        # publish them on both topics
+        if self.state_id is None:
+            await self.subscribe(
+                self.on_resource_changed,
+                'org.labgrid.coordinator.resource_changed'
+            )
         await self.subscribe(
             self.on_place_changed, 'org.labgrid.coordinator.place_changed'
         )
-        await self.connected(self)
+
+    async def watch_place(self, name):
+        """Subscribe to the changes of the given place and of the resources
+        matched by it while it is acquired.
+
+        Changes published before the subscription was active are fetched from
+        the coordinator afterwards. If the coordinator does not support
+        per-place topics, this falls back to subscribe_all().
+        """
+        if self.subscribed_all or name in self.watched_places:
+            return
+        topic = get_place_topic(name, 'changed')
+        if topic is None or self.state_id is None:
+            await self.subscribe_all()
+            return
+        self.watched_places.add(name)
+
+        async def on_changed(config):
+            await self.on_place_changed(name, config)
+
+        await self.subscribe(on_changed, topic)
+        await self.subscribe(
+            self.on_resources_changed, get_place_topic(name, 'resources_changed')
+        )
+        changes = await self.call(
+            'org.labgrid.coordinator.get_changes', self.state_id, self.state_version
+        )
+        if changes is None:
+            await self.sync_state()
+        else:
+            await self._apply_changes(changes)
+
+    def _get_state_cache_path(self):
+        cache_dir = os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache'))
+        key = "{} {}".format(self.config.extra.get('url'), self.config.realm)
+        return os.path.join(
+            cache_dir, 'labgrid',
+            'coordinator-{}.json'.format(hashlib.sha1(key.encode()).hexdigest())
+        )
+
+    def _load_state_cache(self):
+        """Return the cached state or None if there is no usable cache"""
+        try:
+            with open(self._get_state_cache_path(), 'r') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # ignore caches written by other versions
+        expected = {'state_id': str, 'version': int, 'resources': dict, 'places': dict}
+        if not isinstance(cache, dict) or \
+                not all(isinstance(cache.get(k), t) for k, t in expected.items()):
+            return None
+        return cache
+
+    def _save_state_cache(self, state_id, version):
+        resources = {}
+        for exporter, groups in self.resources.items():
+            for group_name, group in groups.items():
+                for resource_name, resource in group.items():
+                    if 'cls' not in resource.data:
+                        continue  # deleted
+                    resources.setdefault(exporter, {}).setdefault(
+                        group_name, {})[resource_name] = resource.data
+        state = {
+            'state_id': state_id,
+            'version': version,
+            'resources': resources,
+            'places': {name: place.asdict() for name, place in self.places.items()},
+        }
+        path = self._get_state_cache_path()
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # use a unique temporary file, concurrent clients may save the
+            # cache at the same time
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            try:
+                with open(fd, 'w') as f:
+                    json.dump(state, f)
+                os.replace(tmp, path)
+            except:
+                os.unlink(tmp)
+                raise
+        except OSError as e:
+            logging.debug("could not write coordinator state cache: %s", e)
+
+    async def _call_optional(self, procedure, *args):
+        """Call procedure, return None if the coordinator does not support it"""
+        try:
+            return await self.call(procedure, *args)
+        except ApplicationError as e:
+            if e.error == "wamp.error.no_such_procedure":
+                return None # old coordinator
+            raise
+
+    async def sync_state(self):
+        """Fetch the resources and places from the coordinator.
+
+        If the state from the last invocation is cached, only the changes
+        since then are fetched. Otherwise or if the coordinator no longer has
+        these changes, the complete state is fetched.
+        """
+        cache = self._load_state_cache()
+        changes = None
+        if cache:
+            changes = await self._call_optional(
+                'org.labgrid.coordinator.get_changes', cache['state_id'], cache['version']
+            )
+        if changes is not None:
+            state = cache
+        else:
+            state = await self._call_optional('org.labgrid.coordinator.get_state')
+        if state is None:
+            state = {
+                'state_id': None,
+                'version': None,
+                'resources': await self.call('org.labgrid.coordinator.get_resources'),
+                'places': await self.call('org.labgrid.coordinator.get_places'),
+            }
+
+        for exporter, groups in state['resources'].items():
+            for group_name, group in sorted(groups.items()):
+                for resource_name, resource in sorted(group.items()):
+                    self._update_resource(
+                        exporter, group_name, resource_name, resource
+                    )
+        for placename, config in state['places'].items():
+            await self.on_place_changed(placename, config)
+
+        if changes is not None:
+            await self._apply_changes(changes)
+            state = changes
+
+        self.state_id = state['state_id']
+        self.state_version = state['version']
+        if state['state_id'] is None:
+            return
+        if cache and (cache['state_id'], cache['version']) == (state['state_id'], state['version']):
+            return
+        self._save_state_cache(state['state_id'], state['version'])
+
+    async def _apply_changes(self, changes):
+        """Apply the changes returned by the coordinator's get_changes"""
+        entries = []
+        for kind, key, data in changes['changes']:
+            if kind == 'resource':
+                entries.append(self._update_resource(*key, data))
+            elif kind == 'place':
+                await self.on_place_changed(key, data)
+        if entries:
+            self._notify_listeners(entries)
+        self.state_version = changes['version']
 
     async def on_resource_changed(self, exporter, group_name, resource_name, resource):
+        entry = self._update_resource(exporter, group_name, resource_name, resource)
+        self._notify_listeners([entry])
+
+    async def on_resources_changed(self, changes):
+        """Apply a group of [exporter, group_name, resource_name, resource]
+        changes published by the coordinator"""
+        entries = [self._update_resource(*change) for change in changes]
+        self._notify_listeners(entries)
+
+    def _update_resource(self, exporter, group_name, resource_name, resource):
+        """Update the ResourceEntry for the given resource and return it"""
         group = self.resources.setdefault(exporter,
                                           {}).setdefault(group_name, {})
         # Do not replace the ResourceEntry object, as other components may keep
@@ -116,12 +296,16 @@ class ClientSession(ApplicationSession):
             else:
                 print("Resource {}/{}/{} deleted".format(
                     exporter, group_name, resource_name))
+        return group[resource_name]
 
     async def on_place_changed(self, name, config):
         if not config:
-            del self.places[name]
+            if self.places.pop(name, None) is None:
+                return
+            self.place_index.remove(name)
             if self.monitor:
                 print("Place {} deleted".format(name))
+            self._notify_listeners()
             return
         config = config.copy()
         config['name'] = name
@@ -140,6 +324,15 @@ class ClientSession(ApplicationSession):
                         flat_dict(place.asdict())):
                     print("  {}: {} -> {}".format(k, v_old, v_new))
         self.places[name] = place
+        self.place_index.update(place)
+        self._notify_listeners()
+
+    def _notify_listeners(self, entries=()):
+        """Call the registered listeners after the resources or places have
+        changed, passing the changed ResourceEntries for resource changes.
+        Listeners may be called from the session's event loop thread."""
+        for listener in self.listeners:
+            listener(entries)
 
     async def do_monitor(self):
         self.monitor = True
@@ -158,10 +351,8 @@ class ClientSession(ApplicationSession):
 
     def _get_places_by_resource(self, resource_path):
         """Yield Place objects that match the given resource path"""
-        for place in self.places.values():
-            match = place.getmatch(resource_path)
-            if match:
-                yield place
+        for place, _ in self.place_index.get_matches(resource_path):
+            yield place
 
     async def print_resources(self):
         """Print out the resources"""
@@ -596,6 +787,8 @@ class ClientSession(ApplicationSession):
         manager = RemotePlaceManager.get()
         manager.session = self
         manager.loop = self.loop
+        if manager._on_session_changed not in self.listeners:
+            self.listeners.append(manager._on_session_changed)
 
     def _get_target(self, place):
         self._prepare_manager()
@@ -980,13 +1173,14 @@ class ClientSession(ApplicationSession):
         except FileNotFoundError as e:
             raise UserError(e)
 
-def start_session(url, realm, extra):
+def start_session(url, realm, extra, loop=None):
     from autobahn.wamp.types import ComponentConfig
     from autobahn.websocket.util import parse_url
     from autobahn.asyncio.websocket import WampWebSocketClientFactory
 
-    loop = asyncio.get_event_loop()
-    ready = asyncio.Event()
+    if loop is None:
+        loop = asyncio.get_event_loop()
+    ready = None
 
     async def connected(session):  # pylint: disable=unused-argument
         ready.set()
@@ -994,6 +1188,7 @@ def start_session(url, realm, extra):
     if not extra:
         extra = {}
     extra['loop'] = loop
+    extra['url'] = url
     extra['connected'] = connected
 
     session = [None]
@@ -1007,9 +1202,15 @@ def start_session(url, realm, extra):
     transport_factory = WampWebSocketClientFactory(create, url=url)
     _, host, port, _, _, _ = parse_url(url)
 
-    coro = loop.create_connection(transport_factory, host, port)
-    loop.run_until_complete(coro)
-    loop.run_until_complete(ready.wait())
+    async def connect():
+        nonlocal ready
+        # created in the running loop, as the event is bound to the loop of
+        # the current thread on older Python versions
+        ready = asyncio.Event()
+        await loop.create_connection(transport_factory, host, port)
+        await ready.wait()
+
+    loop.run_until_complete(connect())
     return session[0]
 
 def find_role_by_place(config, place):
@@ -1082,6 +1283,12 @@ def main():
         action='count',
         default=0
     )
+    parser.add_argument(
+        '--trace',
+        metavar='FILE',
+        type=str,
+        help="write the steps to a trace file (for Perfetto)"
+    )
     parser.add_argument(
         '-P',
         '--proxy',
@@ -1287,6 +1494,11 @@ def main():
     if args.debug:
         logging.getLogger().setLevel(logging.DEBUG)
 
+    if args.trace:
+        from ..tracereporter import TraceReporter
+        TraceReporter.start(args.trace)
+        atexit.register(TraceReporter.stop)
+
     if not args.config and args.state:
         print("Setting the state requires a configuration file")
         exit(1)
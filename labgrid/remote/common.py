@@ -1,12 +1,36 @@
 # pylint: disable=unsubscriptable-object
+import re
 import socket
 import time
 from datetime import datetime
-from fnmatch import fnmatchcase
+from fnmatch import translate
+from functools import lru_cache
 
 import attr
 
 
+def is_pattern(pattern):
+    """Return True if pattern contains shell-style wildcards"""
+    return any(c in pattern for c in '*?[')
+
+
+@lru_cache(maxsize=None)
+def compile_pattern(pattern):
+    """Return a function which checks a string against the shell-style pattern
+    (like fnmatchcase)"""
+    if not is_pattern(pattern):
+        return pattern.__eq__
+    return re.compile(translate(pattern)).match
+
+
+def get_place_topic(name, event):
+    """Return the coordinator topic for the given event of a single place or
+    None if the place name can't be used in a topic"""
+    if not re.match(r'^[^\s.#]+$', name):
+        return None
+    return 'org.labgrid.coordinator.place.{}.{}'.format(name, event)
+
+
 @attr.s(cmp=False)
 class ResourceEntry:
     data = attr.ib()  # cls, params
@@ -83,17 +107,26 @@ class ResourceMatch:
     def ismatch(self, resource_path):
         """Return True if this matches the given resource"""
         exporter, group, cls, name = resource_path
-        if not fnmatchcase(exporter, self.exporter):
+        if not compile_pattern(self.exporter)(exporter):
             return False
-        if not fnmatchcase(group, self.group):
+        if not compile_pattern(self.group)(group):
             return False
-        if not fnmatchcase(cls, self.cls):
+        if not compile_pattern(self.cls)(cls):
             return False
-        if self.name and not fnmatchcase(name, self.name):
+        if self.name and not compile_pattern(self.name)(name):
             return False
 
         return True
 
+    def get_index_key(self):
+        """Return the first literal component of this match as a
+        (component, value) tuple or None if all components are patterns"""
+        for component in ('exporter', 'group', 'cls'):
+            value = getattr(self, component)
+            if not is_pattern(value):
+                return (component, value)
+        return None
+
 
 @attr.s(cmp=False)
 class Place:
@@ -154,6 +187,63 @@ class Place:
     def touch(self):
         self.changed = time.time()
 
+
+class PlaceIndex:
+    """
+    Index of the ResourceMatches of all places, used to find the places
+    matching a resource path without checking every match of every place.
+
+    Each match is stored in a bucket for its first literal exporter, group or
+    class component. Only the matches in the buckets for the resource path's
+    components and those without any literal components are checked.
+    """
+    def __init__(self):
+        self._places = {}
+        self._matches = {}
+        self._keys = {}
+        self._buckets = {}
+
+    def update(self, place):
+        """Add the place or update it after its matches have changed"""
+        self.remove(place.name)
+        self._places[place.name] = place
+        matches = self._matches[place.name] = list(place.matches)
+        keys = self._keys[place.name] = []
+        for pos, match in enumerate(matches):
+            key = match.get_index_key()
+            self._buckets.setdefault(key, set()).add((place.name, pos))
+            keys.append(key)
+
+    def remove(self, name):
+        """Remove the place with the given name from the index"""
+        self._places.pop(name, None)
+        self._matches.pop(name, None)
+        for pos, key in enumerate(self._keys.pop(name, [])):
+            bucket = self._buckets[key]
+            bucket.discard((name, pos))
+            if not bucket:
+                del self._buckets[key]
+
+    def get_matches(self, resource_path):
+        """Return a list of (Place, ResourceMatch) tuples with the first match
+        of each place matching the given resource path.
+
+        A resource_path has the structure (exporter, group, cls, name).
+        """
+        exporter, group, cls, _ = resource_path
+        found = {}
+        for key in (('exporter', exporter), ('group', group), ('cls', cls), None):
+            for name, pos in self._buckets.get(key, ()):
+                if name in found and found[name] < pos:
+                    continue
+                if self._matches[name][pos].ismatch(resource_path):
+                    found[name] = pos
+        return [
+            (self._places[name], self._matches[name][pos])
+            for name, pos in found.items()
+        ]
+
+
 def enable_tcp_nodelay(session):
     """
     asyncio/autobahn does not set TCP_NODELAY by default, so we need to do it
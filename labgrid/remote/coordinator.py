@@ -1,8 +1,14 @@
 """The coordinator module coordinates exported resources and clients accessing them."""
 # pylint: disable=no-member,unused-argument
 import asyncio
+import json
+import os
+import queue
+import threading
+import time
 import traceback
-from collections import defaultdict
+import uuid
+from collections import defaultdict, deque, OrderedDict
 from os import environ
 from pprint import pprint
 from enum import Enum
@@ -13,7 +19,25 @@ from autobahn import wamp
 from autobahn.asyncio.wamp import ApplicationRunner, ApplicationSession
 from autobahn.wamp.types import RegisterOptions
 
-from .common import ResourceEntry, ResourceMatch, Place, enable_tcp_nodelay
+from .common import ResourceEntry, ResourceMatch, Place, PlaceIndex, enable_tcp_nodelay, \
+    get_place_topic
+
+
+# maximum number of concurrent exporter liveness checks
+POLL_CONCURRENCY = 16
+
+# time to collect resource changes before publishing them as one event
+COALESCE_WINDOW = 0.1
+
+# per-resource topic of clients from before the grouped resources_changed topic
+RESOURCE_CHANGED_TOPIC = 'org.labgrid.coordinator.resource_changed'
+
+# number of changes kept for clients fetching changes since their last sync
+CHANGE_LOG_SIZE = 4096
+
+# compact the journal after this many entries or seconds
+COMPACT_ENTRIES = 1000
+COMPACT_INTERVAL = 300.0
 
 
 class Action(Enum):
@@ -22,6 +46,142 @@ class Action(Enum):
     UPD = 2
 
 
+@attr.s(cmp=False)
+class StateJournal:
+    """The StateJournal persists the coordinator state from a background
+    thread.
+
+    Place changes are appended to a journal file, which is compacted into the
+    places snapshot by snapshot(). On startup, the snapshot and the journal are
+    replayed by load(). Resources are announced again by the exporters after a
+    restart, so they are only written with the snapshots.
+    """
+    places_path = attr.ib(default='places.yaml')
+    resources_path = attr.ib(default='resources.yaml')
+    journal_path = attr.ib(default='places.journal')
+
+    def __attrs_post_init__(self):
+        self._queue = queue.Queue()
+        self._thread = None
+        self._journal = None
+        self.entries = 0
+        self.last_snapshot = time.monotonic()
+        self.save_latency = None
+        self.journal_size = 0
+
+    def load(self):
+        """Return the place configurations from the snapshot and the journal"""
+        places = {}
+        try:
+            with open(self.places_path, 'r') as f:
+                places = yaml.safe_load(f.read()) or {}
+        except FileNotFoundError:
+            pass
+        try:
+            with open(self.journal_path, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break  # incomplete last entry
+                    if entry['config']:
+                        places[entry['name']] = entry['config']
+                    else:
+                        places.pop(entry['name'], None)
+                    self.entries += 1
+                self.journal_size = f.tell()
+        except FileNotFoundError:
+            pass
+        return places
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="StateJournal", daemon=True
+        )
+        self._thread.start()
+
+    def append(self, name, config):
+        """Record the new configuration of a place, an empty config records
+        the deletion of the place"""
+        self.entries += 1
+        self._queue.put(('append', (name, config)))
+
+    def snapshot(self, resources, places):
+        """Write snapshots of the given state and truncate the journal"""
+        self.entries = 0
+        self.last_snapshot = time.monotonic()
+        self._queue.put(('snapshot', (resources, places)))
+
+    def needs_compaction(self):
+        if not self.entries:
+            return False
+        return self.entries >= COMPACT_ENTRIES or \
+            time.monotonic() - self.last_snapshot >= COMPACT_INTERVAL
+
+    def sync(self):
+        """Wait until all queued changes have been written"""
+        if self._thread is not None:
+            self._queue.join()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._queue.put(('stop', None))
+        self._thread.join()
+        self._thread = None
+
+    def get_stats(self):
+        return {
+            'save_latency': self.save_latency,
+            'journal_size': self.journal_size,
+            'journal_entries': self.entries,
+        }
+
+    def _run(self):
+        while True:
+            action, args = self._queue.get()
+            try:
+                if action == 'append':
+                    self._write_entry(*args)
+                elif action == 'snapshot':
+                    self._write_snapshot(*args)
+                elif action == 'stop':
+                    break
+                if self._journal and self._queue.empty():
+                    self._journal.flush()
+            except Exception:  # pylint: disable=broad-except
+                traceback.print_exc()
+            finally:
+                self._queue.task_done()
+        if self._journal:
+            self._journal.close()
+            self._journal = None
+
+    def _write_entry(self, name, config):
+        if self._journal is None:
+            self._journal = open(self.journal_path, 'a')
+        self._journal.write(json.dumps({'name': name, 'config': config}) + '\n')
+        self.journal_size = self._journal.tell()
+
+    @staticmethod
+    def _write_file(path, data):
+        with open(path + '.tmp', 'w') as f:
+            f.write(yaml.dump(data, default_flow_style=False))
+        os.replace(path + '.tmp', path)
+
+    def _write_snapshot(self, resources, places):
+        start = time.monotonic()
+        self._write_file(self.resources_path, resources)
+        self._write_file(self.places_path, places)
+        if self._journal:
+            self._journal.close()
+        self._journal = open(self.journal_path, 'w')
+        self.journal_size = 0
+        self.save_latency = time.monotonic() - start
+
+
 @attr.s(init=False, cmp=False)
 class RemoteSession:
     """class encapsulating a session, used by ExporterSession and ClientSession"""
@@ -46,6 +206,8 @@ class ExporterSession(RemoteSession):
     """An ExporterSession is opened for each Exporter connecting to the
     coordinator, allowing the Exporter to get and set resources"""
     groups = attr.ib(default=attr.Factory(dict), init=False)
+    rtt = attr.ib(default=None, init=False)
+    last_seen = attr.ib(default=None, init=False)
 
     def set_resource(self, groupname, resourcename, resource):
         group = self.groups.setdefault(groupname, {})
@@ -61,9 +223,8 @@ class ExporterSession(RemoteSession):
             new = None
             cls = None
 
-        self.coordinator.publish(
-            'org.labgrid.coordinator.resource_changed', self.name,
-            groupname, resourcename, new.asdict() if new else {}
+        self.coordinator.queue_resource_change(
+            self.name, groupname, cls, resourcename, new.asdict() if new else {}
         )
 
         resource_path = (self.name, groupname, cls, resourcename)
@@ -87,6 +248,14 @@ class ExporterSession(RemoteSession):
                 result_group[resourcename] = resource.asdict()
         return result
 
+    def get_stats(self):
+        """Return the results of the last liveness check"""
+        return {
+            'version': self.version,
+            'rtt': self.rtt,
+            'last_seen': self.last_seen,
+        }
+
 
 @attr.s(cmp=False)
 class ClientSession(RemoteSession):
@@ -97,10 +266,21 @@ class CoordinatorComponent(ApplicationSession):
     async def onConnect(self):
         self.sessions = {}
         self.places = {}
+        self.place_index = PlaceIndex()
         self.poll_task = None
         self.save_scheduled = False
+        self.journal = StateJournal()
+        self.resource_changes = OrderedDict()
+        self.resource_changes_handle = None
+        # router subscription of older clients to RESOURCE_CHANGED_TOPIC
+        self.legacy_subscription = None
+        # identifies this coordinator run for clients caching the state
+        self.state_id = str(uuid.uuid4())
+        self.state_version = 0
+        self.change_log = deque(maxlen=CHANGE_LOG_SIZE)
 
         self.load()
+        self.journal.start()
         self.save_later()
 
         enable_tcp_nodelay(self)
@@ -114,6 +294,15 @@ class CoordinatorComponent(ApplicationSession):
         await self.subscribe(
             self.on_session_leave, 'wamp.session.on_leave'
         )
+        await self.subscribe(
+            self.on_subscription_create, 'wamp.subscription.on_create'
+        )
+        await self.subscribe(
+            self.on_subscription_delete, 'wamp.subscription.on_delete'
+        )
+        self.legacy_subscription = await self.call(
+            'wamp.subscription.lookup', RESOURCE_CHANGED_TOPIC
+        )
         await self.register(
             self.attach,
             'org.labgrid.coordinator.attach',
@@ -126,10 +315,31 @@ class CoordinatorComponent(ApplicationSession):
             'org.labgrid.coordinator.set_resource',
             options=RegisterOptions(details_arg='details')
         )
+        await self.register(
+            self.set_resources,
+            'org.labgrid.coordinator.set_resources',
+            options=RegisterOptions(details_arg='details')
+        )
         await self.register(
             self.get_resources,
             'org.labgrid.coordinator.get_resources'
         )
+        await self.register(
+            self.get_state,
+            'org.labgrid.coordinator.get_state'
+        )
+        await self.register(
+            self.get_changes,
+            'org.labgrid.coordinator.get_changes'
+        )
+        await self.register(
+            self.get_exporter_stats,
+            'org.labgrid.coordinator.get_exporter_stats'
+        )
+        await self.register(
+            self.get_journal_stats,
+            'org.labgrid.coordinator.get_journal_stats'
+        )
 
         # places
         await self.register(
@@ -178,6 +388,7 @@ class CoordinatorComponent(ApplicationSession):
 
     async def onLeave(self, details):
         self.save()
+        self.journal.sync()
         if self.poll_task:
             self.poll_task.cancel()
             await asyncio.wait([self.poll_task])
@@ -185,35 +396,49 @@ class CoordinatorComponent(ApplicationSession):
 
     async def onDisconnect(self):
         self.save()
+        self.journal.stop()
+        if self.resource_changes_handle is not None:
+            self.resource_changes_handle.cancel()
+            self.resource_changes_handle = None
         if self.poll_task:
             self.poll_task.cancel()
             await asyncio.wait([self.poll_task])
             await asyncio.sleep(0.5) # give others a chance to clean up
 
+    async def _poll_exporter(self, session, semaphore):
+        async with semaphore:
+            start = time.monotonic()
+            fut = self.call(
+                'org.labgrid.exporter.{}.version'.format(session.name)
+            )
+            done, _ = await asyncio.wait([fut], timeout=5)
+            if not done:
+                print('kicking exporter ({}/{})'.format(session.key, session.name))
+                await self.on_session_leave(session.key)
+                return
+            try:
+                session.version = done.pop().result()
+            except wamp.exception.ApplicationError as e:
+                if e.error == "wamp.error.no_such_procedure":
+                    pass # old client
+                elif e.error == "wamp.error.canceled":
+                    return # disconnected
+                else:
+                    raise
+            session.rtt = time.monotonic() - start
+            session.last_seen = time.time()
+
     async def _poll_step(self):
         # save changes
-        if self.save_scheduled:
+        if self.save_scheduled or self.journal.needs_compaction():
             self.save()
         # poll exporters
-        for session in list(self.sessions.values()):
-            if isinstance(session, ExporterSession):
-                fut = self.call(
-                    'org.labgrid.exporter.{}.version'.format(session.name)
-                )
-                done, _ = await asyncio.wait([fut], timeout=5)
-                if not done:
-                    print('kicking exporter ({}/{})'.format(session.key, session.name))
-                    await self.on_session_leave(session.key)
-                    continue
-                try:
-                    session.version = done.pop().result()
-                except wamp.exception.ApplicationError as e:
-                    if e.error == "wamp.error.no_such_procedure":
-                        pass # old client
-                    elif e.error == "wamp.error.canceled":
-                        pass # disconnected
-                    else:
-                        raise
+        semaphore = asyncio.Semaphore(POLL_CONCURRENCY)
+        await asyncio.gather(*[
+            self._poll_exporter(session, semaphore)
+            for session in list(self.sessions.values())
+            if isinstance(session, ExporterSession)
+        ])
 
     async def poll(self):
         loop = asyncio.get_event_loop()
@@ -227,36 +452,45 @@ class CoordinatorComponent(ApplicationSession):
                 traceback.print_exc()
 
     def save_later(self):
+        """Schedule a snapshot with the next poll step"""
         self.save_scheduled = True
 
     def save(self):
+        """Hand a snapshot of the current state to the journal writer"""
         self.save_scheduled = False
-        with open('resources.yaml', 'w') as f:
-            resources = self._get_resources()
-            f.write(yaml.dump(resources, default_flow_style=False))
-        with open('places.yaml', 'w') as f:
-            places = self._get_places()
-            f.write(yaml.dump(places, default_flow_style=False))
+        self.journal.snapshot(self._get_resources(), self._get_places())
+
+    def _log_change(self, kind, key, data):
+        """Record a change for get_changes and increment the state version"""
+        self.state_version += 1
+        self.change_log.append((self.state_version, kind, key, data))
+
+    def _place_changed(self, name):
+        """Publish, journal and log the current state of the place"""
+        place = self.places.get(name)
+        config = place.asdict() if place else {}
+        self.publish('org.labgrid.coordinator.place_changed', name, config)
+        topic = get_place_topic(name, 'changed')
+        if topic:
+            self.publish(topic, config)
+        self.journal.append(name, config)
+        self._log_change('place', name, config)
 
     def load(self):
-        try:
-            self.place = {}
-            with open('places.yaml', 'r') as f:
-                self.places = yaml.load(f.read())
-            for placename, config in self.places.items():
-                config['name'] = placename
-                # FIXME maybe recover previously acquired places here?
-                if 'acquired' in config:
-                    del config['acquired']
-                if 'acquired_resources' in config:
-                    del config['acquired_resources']
-                if 'allowed' in config:
-                    del config['allowed']
-                config['matches'] = [ResourceMatch(**match) for match in config['matches']]
-                place = Place(**config)
-                self.places[placename] = place
-        except FileNotFoundError:
-            pass
+        self.places = {}
+        for placename, config in self.journal.load().items():
+            config['name'] = placename
+            # FIXME maybe recover previously acquired places here?
+            if 'acquired' in config:
+                del config['acquired']
+            if 'acquired_resources' in config:
+                del config['acquired_resources']
+            if 'allowed' in config:
+                del config['allowed']
+            config['matches'] = [ResourceMatch(**match) for match in config['matches']]
+            place = Place(**config)
+            self.places[placename] = place
+            self.place_index.update(place)
 
     def _add_default_place(self, name):
         if name in self.places:
@@ -267,23 +501,72 @@ class CoordinatorComponent(ApplicationSession):
         print(place)
         place.matches.append(ResourceMatch(exporter="*", group=name, cls="*"))
         self.places[name] = place
+        self.place_index.update(place)
+        self._place_changed(name)
+
+    def queue_resource_change(self, exporter, groupname, cls, resourcename, resource):
+        """Queue a resource change, changes are published together after
+        COALESCE_WINDOW"""
+        key = (exporter, groupname, resourcename)
+        self._log_change('resource', list(key), resource)
+        # move updated resources to the end to keep the order of changes
+        self.resource_changes.pop(key, None)
+        self.resource_changes[key] = (cls, resource)
+        if self.resource_changes_handle is None:
+            self.resource_changes_handle = asyncio.get_event_loop().call_later(
+                COALESCE_WINDOW, self.publish_resource_changes
+            )
+
+    def publish_resource_changes(self):
+        """Publish all queued resource changes as one event. While older
+        clients are subscribed, each change is also published on the
+        per-resource topic.
+
+        The changes of resources matching an acquired place are also published
+        on the place's topic, so clients using this place only need to
+        subscribe to the place's topics.
+        """
+        if self.resource_changes_handle is not None:
+            self.resource_changes_handle.cancel()
+            self.resource_changes_handle = None
+        if not self.resource_changes:
+            return
+        changes = []
+        place_changes = defaultdict(list)
+        for (exporter, groupname, resourcename), (cls, resource) in self.resource_changes.items():
+            change = [exporter, groupname, resourcename, resource]
+            changes.append(change)
+            if cls is None:
+                continue
+            resource_path = (exporter, groupname, cls, resourcename)
+            for place, _ in self.place_index.get_matches(resource_path):
+                if place.acquired:
+                    place_changes[place.name].append(change)
+        self.resource_changes.clear()
+        self.publish('org.labgrid.coordinator.resources_changed', changes)
+        if self.legacy_subscription is not None:
+            for change in changes:
+                self.publish(RESOURCE_CHANGED_TOPIC, *change)
+        for placename, changes in place_changes.items():
+            topic = get_place_topic(placename, 'resources_changed')
+            if topic:
+                self.publish(topic, changes)
 
     async def _update_acquired_places(self, action, resource_path):
         """Update acquired places when resources are added or removed."""
         if action not in [Action.ADD, Action.DEL]:
             return  # currently nothing needed for Action.UPD
-        for placename, place in self.places.items():
+        for place, _ in self.place_index.get_matches(resource_path):
             if not place.acquired:
                 continue
-            if not place.hasmatch(resource_path):
-                continue
+            placename = place.name
+            # clients need to know the resources before they show up in a place
+            self.publish_resource_changes()
             if action is Action.ADD:
                 place.acquired_resources.append(resource_path)
             else:
                 place.acquired_resources.remove(resource_path)
-            self.publish(
-                'org.labgrid.coordinator.place_changed', placename, place.asdict()
-            )
+            self._place_changed(placename)
 
     async def on_session_join(self, session_details):
         print('join')
@@ -298,6 +581,15 @@ class CoordinatorComponent(ApplicationSession):
             return
         self.sessions[session.key] = session
 
+    async def on_subscription_create(self, session_id, subscription):  # pylint: disable=unused-argument
+        if subscription['uri'] == RESOURCE_CHANGED_TOPIC:
+            self.legacy_subscription = subscription['id']
+
+    async def on_subscription_delete(self, session_id, subscription_id):  # pylint: disable=unused-argument
+        # the router deletes the subscription when the last subscriber left
+        if subscription_id == self.legacy_subscription:
+            self.legacy_subscription = None
+
     async def on_session_leave(self, session_id):
         print('leave ({})'.format(session_id))
         try:
@@ -318,21 +610,36 @@ class CoordinatorComponent(ApplicationSession):
         session_details['name'] = name
         self.exporters[name] = defaultdict(dict)
 
-    async def set_resource(self, groupname, resourcename, resource, details=None):
-        session = self.sessions.get(details.caller)
-        if session is None:
-            return
-        assert isinstance(session, ExporterSession)
-
+    async def _set_resource(self, session, groupname, resourcename, resource):
         groupname = str(groupname)
         resourcename = str(resourcename)
         # TODO check if acquired
-        print(details)
         pprint(resource)
         action, resource_path = session.set_resource(groupname, resourcename, resource)
         if action is Action.ADD:
             self._add_default_place(groupname)
         await self._update_acquired_places(action, resource_path)  # pylint: disable=not-an-iterable
+
+    async def set_resource(self, groupname, resourcename, resource, details=None):
+        session = self.sessions.get(details.caller)
+        if session is None:
+            return
+        assert isinstance(session, ExporterSession)
+
+        print(details)
+        await self._set_resource(session, groupname, resourcename, resource)
+        self.save_later()
+
+    async def set_resources(self, changes, details=None):
+        """Apply a list of [groupname, resourcename, resource] changes"""
+        session = self.sessions.get(details.caller)
+        if session is None:
+            return
+        assert isinstance(session, ExporterSession)
+
+        print(details)
+        for groupname, resourcename, resource in changes:
+            await self._set_resource(session, groupname, resourcename, resource)
         self.save_later()
 
     def _get_resources(self):
@@ -345,6 +652,43 @@ class CoordinatorComponent(ApplicationSession):
     async def get_resources(self, details=None):
         return self._get_resources()
 
+    async def get_state(self, details=None):
+        """Return all resources and places with the current state version"""
+        return {
+            'state_id': self.state_id,
+            'version': self.state_version,
+            'resources': self._get_resources(),
+            'places': self._get_places(),
+        }
+
+    async def get_changes(self, state_id, version, details=None):
+        """Return the changes after the given state version as a list of
+        [kind, key, data] entries, or None if they are no longer available and
+        the client needs to fetch the complete state"""
+        if state_id != self.state_id or version > self.state_version:
+            return None
+        if version < self.state_version - len(self.change_log):
+            return None
+        return {
+            'state_id': self.state_id,
+            'version': self.state_version,
+            'changes': [
+                [kind, key, data]
+                for change_version, kind, key, data in self.change_log
+                if change_version > version
+            ],
+        }
+
+    async def get_exporter_stats(self, details=None):
+        return {
+            session.name: session.get_stats()
+            for session in self.sessions.values()
+            if isinstance(session, ExporterSession)
+        }
+
+    async def get_journal_stats(self, details=None):
+        return self.journal.get_stats()
+
     async def add_place(self, name, details=None):
         if not name or not isinstance(name, str):
             return False
@@ -352,10 +696,8 @@ class CoordinatorComponent(ApplicationSession):
             return False
         place = Place(name)
         self.places[name] = place
-        self.publish(
-            'org.labgrid.coordinator.place_changed', name, place.asdict()
-        )
-        self.save_later()
+        self.place_index.update(place)
+        self._place_changed(name)
         return True
 
     async def del_place(self, name, details=None):
@@ -364,10 +706,8 @@ class CoordinatorComponent(ApplicationSession):
         if name not in self.places:
             return False
         del self.places[name]
-        self.publish(
-            'org.labgrid.coordinator.place_changed', name, {}
-        )
-        self.save_later()
+        self.place_index.remove(name)
+        self._place_changed(name)
         return True
 
     async def add_place_alias(self, placename, alias, details=None):
@@ -377,10 +717,7 @@ class CoordinatorComponent(ApplicationSession):
             return False
         place.aliases.add(alias)
         place.touch()
-        self.publish(
-            'org.labgrid.coordinator.place_changed', placename, place.asdict()
-        )
-        self.save_later()
+        self._place_changed(placename)
         return True
 
     async def del_place_alias(self, placename, alias, details=None):
@@ -393,10 +730,7 @@ class CoordinatorComponent(ApplicationSession):
         except ValueError:
             return False
         place.touch()
-        self.publish(
-            'org.labgrid.coordinator.place_changed', placename, place.asdict()
-        )
-        self.save_later()
+        self._place_changed(placename)
         return True
 
     async def set_place_comment(self, placename, comment, details=None):
@@ -406,10 +740,7 @@ class CoordinatorComponent(ApplicationSession):
             return False
         place.comment = comment
         place.touch()
-        self.publish(
-            'org.labgrid.coordinator.place_changed', placename, place.asdict()
-        )
-        self.save_later()
+        self._place_changed(placename)
         return True
 
     async def add_place_match(self, placename, pattern, rename=None, details=None):
@@ -421,11 +752,9 @@ class CoordinatorComponent(ApplicationSession):
         if match in place.matches:
             return False
         place.matches.append(match)
+        self.place_index.update(place)
         place.touch()
-        self.publish(
-            'org.labgrid.coordinator.place_changed', placename, place.asdict()
-        )
-        self.save_later()
+        self._place_changed(placename)
         return True
 
     async def del_place_match(self, placename, pattern, rename=None, details=None):
@@ -438,11 +767,9 @@ class CoordinatorComponent(ApplicationSession):
             place.matches.remove(match)
         except ValueError:
             return False
+        self.place_index.update(place)
         place.touch()
-        self.publish(
-            'org.labgrid.coordinator.place_changed', placename, place.asdict()
-        )
-        self.save_later()
+        self._place_changed(placename)
         return True
 
     async def acquire_place(self, name, details=None):
@@ -456,6 +783,8 @@ class CoordinatorComponent(ApplicationSession):
         # FIXME use the session object instead? or something else which
         # survives disconnecting clients?
         place.acquired = self.sessions[details.caller].name
+        # clients need to know the resources before they show up in a place
+        self.publish_resource_changes()
         for exporter, groups in self._get_resources().items():
             for group_name, group in sorted(groups.items()):
                 for resource_name, resource in sorted(group.items()):
@@ -464,10 +793,7 @@ class CoordinatorComponent(ApplicationSession):
                         continue
                     place.acquired_resources.append(resource_path)
         place.touch()
-        self.publish(
-            'org.labgrid.coordinator.place_changed', name, place.asdict()
-        )
-        self.save_later()
+        self._place_changed(name)
         return True
 
     async def release_place(self, name, details=None):
@@ -482,10 +808,7 @@ class CoordinatorComponent(ApplicationSession):
         place.acquired_resources = []
         place.allowed = set()
         place.touch()
-        self.publish(
-            'org.labgrid.coordinator.place_changed', name, place.asdict()
-        )
-        self.save_later()
+        self._place_changed(name)
         return True
 
     async def allow_place(self, name, user, details=None):
@@ -499,10 +822,7 @@ class CoordinatorComponent(ApplicationSession):
             return False
         place.allowed.add(user)
         place.touch()
-        self.publish(
-            'org.labgrid.coordinator.place_changed', name, place.asdict()
-        )
-        self.save_later()
+        self._place_changed(name)
         return True
 
     def _get_places(self):
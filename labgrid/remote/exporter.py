@@ -11,6 +11,7 @@ import subprocess
 from socket import gethostname, getfqdn
 import attr
 from autobahn.asyncio.wamp import ApplicationRunner, ApplicationSession
+from autobahn.wamp.exception import ApplicationError
 
 from .config import ResourceConfig
 from .common import ResourceEntry, enable_tcp_nodelay
@@ -340,6 +341,7 @@ class ExporterSession(ApplicationSession):
         print(details)
         try:
             resource_config = ResourceConfig(self.config.extra['resources'])
+            added = []
             for group_name, group in resource_config.data.items():
                 for resource_name, params in group.items():
                     if resource_name == 'location':
@@ -348,9 +350,9 @@ class ExporterSession(ApplicationSession):
                         continue
                     cls = params.pop('cls', resource_name)
 
-                    await self.add_resource(
-                        group_name, resource_name, cls, params
-                    )
+                    self._add_resource(group_name, resource_name, cls, params)
+                    added.append((group_name, resource_name))
+            await self.update_resources(added)
 
         except Exception:  # pylint: disable=broad-except
             traceback.print_exc()
@@ -397,6 +399,7 @@ class ExporterSession(ApplicationSession):
         return __version__
 
     async def _poll_step(self):
+        changed_resources = []
         for group_name, group in self.groups.items():
             for resource_name, resource in group.items():
                 if not isinstance(resource, ResourceExport):
@@ -409,12 +412,9 @@ class ExporterSession(ApplicationSession):
                     continue
                 if changed:
                     # resource has changed
-                    data = resource.asdict()
-                    print(data)
-                    await self.call(
-                        'org.labgrid.coordinator.set_resource', group_name,
-                        resource_name, data
-                    )
+                    changed_resources.append((group_name, resource_name))
+        if changed_resources:
+            await self.update_resources(changed_resources)
 
     async def poll(self):
         while True:
@@ -428,6 +428,11 @@ class ExporterSession(ApplicationSession):
 
     async def add_resource(self, group_name, resource_name, cls, params):
         """Add a resource to the exporter and update status on the coordinator"""
+        self._add_resource(group_name, resource_name, cls, params)
+        await self.update_resource(group_name, resource_name)
+
+    def _add_resource(self, group_name, resource_name, cls, params):
+        """Add a resource to the exporter"""
         print(
             "add resource {}/{}: {}/{}".
             format(group_name, resource_name, cls, params)
@@ -446,7 +451,6 @@ class ExporterSession(ApplicationSession):
                                               proxy_required=proxy_req)
         else:
             group[resource_name] = export_cls(config)
-        await self.update_resource(group_name, resource_name)
 
     async def update_resource(self, group_name, resource_name):
         """Update status on the coordinator"""
@@ -458,6 +462,30 @@ class ExporterSession(ApplicationSession):
             data
         )
 
+    async def update_resources(self, resources):
+        """Update the status of multiple resources on the coordinator with one
+        call
+
+        Args:
+            resources (list): (group_name, resource_name) tuples
+        """
+        changes = []
+        for group_name, resource_name in resources:
+            data = self.groups[group_name][resource_name].asdict()
+            print(data)
+            changes.append([group_name, resource_name, data])
+        try:
+            await self.call('org.labgrid.coordinator.set_resources', changes)
+        except ApplicationError as e:
+            if e.error != "wamp.error.no_such_procedure":
+                raise
+            # old coordinator
+            for group_name, resource_name, data in changes:
+                await self.call(
+                    'org.labgrid.coordinator.set_resource', group_name, resource_name,
+                    data
+                )
+
 
 def main():
     parser = argparse.ArgumentParser()
@@ -1,14 +1,68 @@
-from .base import SerialPort, EthernetInterface, EthernetPort
-from .ethernetport import SNMPEthernetPort
-from .serialport import RawSerialPort, NetworkSerialPort
-from .modbus import ModbusTCPCoil
-from .networkservice import NetworkService
-from .onewireport import OneWirePIO
-from .power import NetworkPowerPort
-from .remote import RemotePlace
-from .udev import USBSerialPort
-from .udev import USBSDMuxDevice
-from .udev import USBPowerPort
+from typing import TYPE_CHECKING
+
+from ..factory import target_factory
 from .common import Resource, ResourceManager, ManagedResource
-from .ykushpowerport import YKUSHPowerPort
-from .xenamanager import XenaManager
+
+# the resource modules are only imported when they are used
+target_factory.reg_lazy(globals(), {
+    'SerialPort': '.base',
+    'EthernetInterface': '.base',
+    'EthernetPort': '.base',
+    'SNMPEthernetPort': '.ethernetport',
+    'RawSerialPort': '.serialport',
+    'NetworkSerialPort': '.serialport',
+    'ModbusTCPCoil': '.modbus',
+    'NetworkService': '.networkservice',
+    'OneWirePIO': '.onewireport',
+    'NetworkPowerPort': '.power',
+    'RemotePlace': '.remote',
+    'NetworkAndroidFastboot': '.remote',
+    'NetworkIMXUSBLoader': '.remote',
+    'NetworkMXSUSBLoader': '.remote',
+    'NetworkAlteraUSBBlaster': '.remote',
+    'NetworkSigrokUSBDevice': '.remote',
+    'NetworkUSBMassStorage': '.remote',
+    'NetworkUSBSDMuxDevice': '.remote',
+    'NetworkUSBPowerPort': '.remote',
+    'NetworkUSBVideo': '.remote',
+    'NetworkUSBTMC': '.remote',
+    'SigrokDevice': '.sigrok',
+    'USBSerialPort': '.udev',
+    'USBMassStorage': '.udev',
+    'IMXUSBLoader': '.udev',
+    'MXSUSBLoader': '.udev',
+    'AndroidFastboot': '.udev',
+    'USBEthernetInterface': '.udev',
+    'AlteraUSBBlaster': '.udev',
+    'SigrokUSBDevice': '.udev',
+    'USBSDMuxDevice': '.udev',
+    'USBPowerPort': '.udev',
+    'USBVideo': '.udev',
+    'USBTMC': '.udev',
+    'YKUSHPowerPort': '.ykushpowerport',
+    'XenaManager': '.xenamanager',
+})
+
+# explicit imports for static analysis, which does not know about the lazy
+# imports
+if TYPE_CHECKING:
+    from .base import SerialPort, EthernetInterface, EthernetPort
+    from .ethernetport import SNMPEthernetPort
+    from .serialport import RawSerialPort, NetworkSerialPort
+    from .modbus import ModbusTCPCoil
+    from .networkservice import NetworkService
+    from .onewireport import OneWirePIO
+    from .power import NetworkPowerPort
+    from .remote import (
+        RemotePlace, NetworkAndroidFastboot, NetworkIMXUSBLoader, NetworkMXSUSBLoader,
+        NetworkAlteraUSBBlaster, NetworkSigrokUSBDevice, NetworkUSBMassStorage,
+        NetworkUSBSDMuxDevice, NetworkUSBPowerPort, NetworkUSBVideo, NetworkUSBTMC
+    )
+    from .sigrok import SigrokDevice
+    from .udev import (
+        USBSerialPort, USBMassStorage, IMXUSBLoader, MXSUSBLoader, AndroidFastboot,
+        USBEthernetInterface, AlteraUSBBlaster, SigrokUSBDevice, USBSDMuxDevice,
+        USBPowerPort, USBVideo, USBTMC
+    )
+    from .ykushpowerport import YKUSHPowerPort
+    from .xenamanager import XenaManager
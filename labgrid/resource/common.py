@@ -1,3 +1,6 @@
+import logging
+from time import monotonic, sleep
+
 import attr
 
 from ..binding import BindingMixin
@@ -52,24 +55,67 @@ class NetworkResource(Resource):
     Represents a remote Resource available on another computer.
 
     This stores a command_prefix to describe how to connect to the remote
-    computer.
+    computer. The prefix reuses the multiplexed connection from the
+    sshmanager, which is referenced until the resource is deactivated.
 
     Args:
         host (str): remote host the resource is available on
     """
     host = attr.ib(validator=attr.validators.instance_of(str))
+    # time to use plain ssh before retrying a failed shared connection
+    connect_retry_interval = 60.0
+
+    def __attrs_post_init__(self):
+        super().__attrs_post_init__()
+        self._connection = None
+        self._connect_failed = None
 
     @property
     def command_prefix(self):
+        from ..driver.exception import ExecutionError
+        from ..util.ssh import sshmanager
+
+        if self._connection is not None and self._connection.isconnected():
+            return sshmanager.get_prefix(self.host)
+        if self._connect_failed is not None and \
+                monotonic() - self._connect_failed < self.connect_retry_interval:
+            return self._get_plain_prefix()
+        try:
+            self._connection = sshmanager.open(self.host)
+        except ExecutionError as e:
+            self._connect_failed = monotonic()
+            logging.getLogger("{}".format(self)).warning(
+                "Could not open shared SSH connection to %s, using plain ssh: %s",
+                self.host, e)
+            return self._get_plain_prefix()
+        self._connect_failed = None
+        # the connection was just opened, so no handshake was saved
+        return self._connection.get_prefix()
+
+    def _get_plain_prefix(self):
         return ['ssh', '-x',
                 '-o', 'ConnectTimeout=5',
                 '-o', 'PasswordAuthentication=no',
                 self.host, '--']
 
+    def on_deactivate(self):
+        super().on_deactivate()
+        self._release_connection()
+
+    def _release_connection(self):
+        from ..util.ssh import sshmanager
+
+        connection, self._connection = self._connection, None
+        # connections closed by sshmanager.close_all() hold no reference
+        if connection is not None and connection.isconnected():
+            sshmanager.close(self.host)
+
 
 @attr.s(cmp=False)
 class ResourceManager:
     instances = {}
+    #: maximum time wait() sleeps if the manager is not notified about changes
+    poll_interval = 0.5
 
     @classmethod
     def get(cls):
@@ -92,6 +138,23 @@ class ResourceManager:
     def poll(self):
         pass
 
+    def wait(self, timeout):
+        """
+        Wait until the managed resources may have changed.
+
+        Managers which are notified about changes return as soon as one
+        arrives. This default implementation is not notified and only sleeps
+        for up to poll_interval seconds.
+
+        Args:
+            timeout (float): maximum time to wait in seconds
+
+        Returns:
+            bool: True if poll() needs to be called to process changes
+        """
+        sleep(min(timeout, self.poll_interval))
+        return True
+
 
 @attr.s(cmp=False)
 class ManagedResource(Resource):
@@ -184,6 +184,7 @@ class EthernetPortManager(ResourceManager):
         super().__attrs_post_init__()
         self.logger = logging.getLogger("{}".format(self))
         self.loop = None
+        self.updated = None
         self.poll_tasks = []
         self.switches = {}
         self.neighbors = {}
@@ -242,6 +243,7 @@ class EthernetPortManager(ResourceManager):
                 try:
                     await asyncio.sleep(1.0)
                     await handler(self)
+                    self.updated.set()
                 except asyncio.CancelledError:
                     break
                 except Exception:  # pylint: disable=broad-except
@@ -249,9 +251,29 @@ class EthernetPortManager(ResourceManager):
                     traceback.print_exc()
 
         self.loop = asyncio.get_event_loop()
+        self.updated = asyncio.Event()
         self.poll_tasks.append(self.loop.create_task(poll(self, poll_neighbour)))
         self.poll_tasks.append(self.loop.create_task(poll(self, poll_switches)))
 
+    def wait(self, timeout):
+        """Run the event loop until the neighbor table or a switch was
+        polled
+
+        Args:
+            timeout (float): maximum time to wait in seconds
+
+        Returns:
+            bool: True if new information is available
+        """
+        import asyncio
+        if self.loop is None or self.loop.is_running():
+            return super().wait(timeout)
+        try:
+            self.loop.run_until_complete(asyncio.wait_for(self.updated.wait(), timeout))
+        except asyncio.TimeoutError:
+            return False
+        return True
+
     @staticmethod
     def _get_neigh():
         """Internal function to retrieve the neighbors on the test machine
@@ -293,6 +315,7 @@ class EthernetPortManager(ResourceManager):
         import asyncio
         if not self.loop.is_running():
             self.loop.run_until_complete(asyncio.sleep(0.0))
+        self.updated.clear()
         for resource in self.resources:
             switch = self.switches.get(resource.switch)
             if not switch:
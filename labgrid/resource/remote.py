@@ -1,5 +1,8 @@
+import asyncio
 import logging
 import os
+import threading
+
 import attr
 
 from ..factory import target_factory
@@ -8,6 +11,15 @@ from .common import NetworkResource, ManagedResource, ResourceManager
 
 @attr.s(cmp=False)
 class RemotePlaceManager(ResourceManager):
+    """
+    The RemotePlaceManager runs the coordinator session in an event loop on a
+    background thread. Changed resource entries reported by the coordinator
+    are marked dirty as they arrive and only those are applied to the
+    resources by the next poll().
+
+    The session is filtered, so it only receives the changes for the places
+    used by the resources added to this manager.
+    """
     def __attrs_post_init__(self):
         super().__attrs_post_init__()
         self.logger = logging.getLogger("{}".format(self))
@@ -16,20 +28,70 @@ class RemotePlaceManager(ResourceManager):
         self.loop = None
         self.session = None
         self.ready = None
+        self.thread = None
         self.unmanaged_resources = []
+        self._entry_resources = {}
+        self._changed = threading.Condition()
+        self._pending = False
+        self._dirty = set()
 
     def _start(self):
         if self.session:
             return
 
         from ..remote.client import start_session
+        loop = asyncio.new_event_loop()
         try:
-            self.session = start_session(self.url, self.realm, {'env': self.env})
+            self.session = start_session(
+                self.url, self.realm, {'env': self.env, 'filtered': True}, loop=loop
+            )
         except ConnectionRefusedError as e:
             raise ConnectionRefusedError("Could not connect to coordinator {}".format(self.url)) \
                 from e
 
-        self.loop = self.session.loop
+        self.loop = loop
+        self.session.listeners.append(self._on_session_changed)
+        self.thread = threading.Thread(
+            target=self.loop.run_forever, name="RemotePlaceManager", daemon=True
+        )
+        self.thread.start()
+
+    def _on_session_changed(self, entries=()):
+        """Called from the event loop thread when the coordinator reports
+        changes, entries are the changed ResourceEntries (if any)"""
+        with self._changed:
+            self._dirty.update(entry for entry in entries if entry in self._entry_resources)
+            self._pending = True
+            self._changed.notify_all()
+
+    def _call_in_loop(self, func, *args):
+        """Run func in the session's event loop and return its result"""
+        if self.thread is None:
+            return func(*args)
+
+        async def call():
+            return func(*args)
+
+        return asyncio.run_coroutine_threadsafe(call(), self.loop).result()
+
+    def wait(self, timeout):
+        """
+        Wait until the coordinator reports changes which have not been
+        applied by poll() yet.
+
+        Args:
+            timeout (float): maximum time to wait in seconds
+
+        Returns:
+            bool: True if changes are pending
+        """
+        if self.thread is None:
+            # the event loop only runs in poll()
+            return True
+        with self._changed:
+            if not self._pending:
+                self._changed.wait(timeout)
+            return self._pending
 
     def on_resource_added(self, resource):
         if not isinstance(resource, RemotePlace):
@@ -48,8 +110,14 @@ class RemotePlaceManager(ResourceManager):
                 'crossbar_realm',
                 os.environ.get("LG_CROSSBAR_REALM", "realm1"))
             self._start()
-        place = self.session.get_place(remote_place.name)
-        resource_entries = self.session.get_target_resources(place)
+        place = self._call_in_loop(self.session.get_place, remote_place.name)
+        if self.thread is not None:
+            asyncio.run_coroutine_threadsafe(
+                self.session.watch_place(place.name), self.loop
+            ).result()
+            # the place may have been replaced by changes fetched while watching
+            place = self._call_in_loop(self.session.get_place, place.name)
+        resource_entries = self._call_in_loop(self.session.get_target_resources, place)
         expanded = []
         for resource_name, resource_entry in resource_entries.items():
             new = target_factory.make_resource(
@@ -58,6 +126,8 @@ class RemotePlaceManager(ResourceManager):
             new.avail = resource_entry.avail
             new.extra = resource_entry.extra
             new._remote_entry = resource_entry
+            with self._changed:
+                self._entry_resources.setdefault(resource_entry, []).append(new)
             if not isinstance(new, ManagedResource):
                 self.unmanaged_resources.append(new)
             expanded.append(new)
@@ -65,30 +135,49 @@ class RemotePlaceManager(ResourceManager):
         remote_place.avail = True
 
     def poll(self):
-        import asyncio
-        if not self.loop.is_running():
-            self.loop.run_until_complete(asyncio.sleep(0.1))
-        for resource in self.resources + self.unmanaged_resources:
-            if isinstance(resource, RemotePlace):
-                continue
-            attrs = resource._remote_entry.args.copy()
-            attrs['avail'] = resource._remote_entry.avail
-            # TODO allow the resource to do the update itself?
-            changes = []
-            fields = attr.fields(resource.__class__)
-            for k, v_new in attrs.items():
-                # check for attr converters
-                attrib = getattr(fields, k)
-                if attrib.converter:
-                    v_new = attrib.converter(v_new)
-                v_old = getattr(resource, k)
+        if self.thread is None:
+            # the session was prepared by labgrid-client and is driven by the
+            # event loop in this thread
+            if not self.loop.is_running():
+                self.loop.run_until_complete(asyncio.sleep(0.1))
+        with self._changed:
+            self._pending = False
+            dirty, self._dirty = self._dirty, set()
+        for entry in dirty:
+            for resource in self._entry_resources[entry]:
+                self._apply_entry(resource, entry)
+
+    def _apply_entry(self, resource, entry):
+        """Update the resource's attributes which differ from the entry"""
+        attrs = entry.args
+        attrs['avail'] = entry.avail
+        # TODO allow the resource to do the update itself?
+        changes = []
+        converters = _get_converters(resource.__class__)
+        for k, v_new in attrs.items():
+            converter = converters[k]
+            if converter:
+                v_new = converter(v_new)
+            v_old = getattr(resource, k)
+            if v_old != v_new:
                 setattr(resource, k, v_new)
-                if v_old != v_new:
-                    changes.append((k, v_old, v_new))
-            if changes:
-                self.logger.debug("changed attributes for %s:", resource)
-                for k, v_old, v_new in changes:
-                    self.logger.debug("  %s: %s -> %s", k, v_old, v_new)
+                changes.append((k, v_old, v_new))
+        if changes:
+            self.logger.debug("changed attributes for %s:", resource)
+            for k, v_old, v_new in changes:
+                self.logger.debug("  %s: %s -> %s", k, v_old, v_new)
+
+
+_converters = {}
+
+
+def _get_converters(cls):
+    """Return a dict mapping the attribute names of cls to their converters"""
+    converters = _converters.get(cls)
+    if converters is None:
+        converters = {field.name: field.converter for field in attr.fields(cls)}
+        _converters[cls] = converters
+    return converters
 
 
 @target_factory.reg_resource
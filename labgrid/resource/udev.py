@@ -2,6 +2,7 @@
 from functools import partial
 import logging
 import os
+import select
 import warnings
 import attr
 import pyudev
@@ -35,6 +36,11 @@ class UdevManager(ResourceManager):
                 if resource.try_match(device):
                     break
 
+    def wait(self, timeout):
+        """Wait until the udev monitor has received an event"""
+        readable, _, _ = select.select([self._monitor], [], [], timeout)
+        return bool(readable)
+
 
 @attr.s(cmp=False)
 class USBResource(ManagedResource):
@@ -1,21 +1,39 @@
 import warnings
 import inspect
+import threading
 from functools import wraps
 from time import monotonic
 
 
-# TODO: collect events from all Steps and combine when possible, only flush
-# after some time
 class Steps:
+    """
+    Keeps track of the active steps and delivers their events to the
+    subscribers.
+
+    Events of stream steps (such as console reads and writes) are buffered
+    and consecutive events from the same resource are merged. The buffer is
+    flushed when it contains buffer_size events, buffer_time seconds after
+    the first event was buffered, before any other event is delivered and on
+    flush(). Other events are delivered immediately.
+
+    The time based flush runs in a timer thread, so the events of a console
+    which went quiet are not held back until the next event.
+    """
+    buffer_size = 64
+    buffer_time = 0.1
+
     def __init__(self):
         self._stack = []
         self._subscribers = []
+        self._buffer = []
+        self._lock = threading.RLock()
+        self._timer = None
 
     def get_current(self):
         return self._stack[-1] if self._stack else None
 
-    def get_new(self, title, tag, source):
-        step = Step(title, level=len(self._stack) + 1, tag=tag, source=source)
+    def get_new(self, title, tag, source, stream=False):
+        step = Step(title, level=len(self._stack) + 1, tag=tag, source=source, stream=stream)
         return step
 
     def push(self, step):
@@ -33,10 +51,35 @@ class Steps:
 
     def unsubscribe(self, callback):
         assert callback in self._subscribers
+        self.flush()
         self._subscribers.remove(callback)
 
     def notify(self, event):
-        # TODO: buffer and try to merge consecutive events
+        with self._lock:
+            if event.stream:
+                if not self._buffer or not self._buffer[-1].merge(event):
+                    self._buffer.append(event)
+                if len(self._buffer) >= self.buffer_size:
+                    self.flush()
+                elif self._timer is None:
+                    self._timer = threading.Timer(self.buffer_time, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return
+            self.flush()
+            self._deliver(event)
+
+    def flush(self):
+        """Deliver all buffered events"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            buffer, self._buffer = self._buffer, []
+            for event in buffer:
+                self._deliver(event)
+
+    def _deliver(self, event):
         for subscriber in self._subscribers:
             try:
                 subscriber(event)
@@ -71,7 +114,9 @@ class StepEvent:
         self.stream = None
 
     def merge(self, other):
-        if not self.stream and not other.stream:
+        """Append the data of a later stream event from the same resource to
+        this event and invalidate the other event"""
+        if not self.stream or not other.stream:
             return False
         if self.ts > other.ts:
             return False
@@ -79,7 +124,7 @@ class StepEvent:
             return False
         if self.data.keys() != other.data.keys():
             return False
-        for k, v in other.data:
+        for k, v in other.data.items():
             self.data[k] += v
         other._invalidate()
         return True
@@ -91,11 +136,12 @@ class StepEvent:
 
 # TODO: allow attaching log information, using a Resource as meta-data
 class Step:
-    def __init__(self, title, level, tag, source):
+    def __init__(self, title, level, tag, source, stream=False):
         self.title = title
         self.level = level
         self.source = source
         self.tag = tag
+        self.stream = stream
         self.args = None
         self.result = None
         self._start_ts = None
@@ -157,6 +203,8 @@ class Step:
         assert self._start_ts is None
         self._start_ts = monotonic()
         steps.push(self)
+        if self.stream:
+            return
         self._notify(StepEvent(self, {
             'state': 'start',
             'args': self.args,
@@ -170,6 +218,15 @@ class Step:
         assert self._start_ts is not None
         assert self._stop_ts is None
         self._stop_ts = monotonic()
+        if self.stream:
+            # a single event with the streamed data, which can be merged
+            data = dict(self.args or {})
+            if self.result is not None:
+                data['result'] = self.result
+            if data:
+                self._notify(StepEvent(self, data, resource=self.source, stream=True))
+            steps.pop(self)
+            return
         # TODO: report duration
         self._notify(StepEvent(self, {
             'state': 'stop',
@@ -182,25 +239,77 @@ class Step:
             warnings.warn("__del__ called before {} was done".format(step))
 
 
-def step(*, title=None, args=[], result=False, tag=None):  # pylint: disable=unused-argument
+def _get_argument_getter(signature, name):
+    """
+    Return a function which extracts the value of the named argument from
+    the positional and keyword arguments of a call, including defaults.
+
+    This replaces signature.bind_partial() and apply_defaults() for the
+    common parameter kinds. None is returned for variable arguments.
+    """
+    param = signature.parameters.get(name)
+    if param is None:
+        return lambda _args, _kwargs: None
+    if param.kind in (param.VAR_POSITIONAL, param.VAR_KEYWORD):
+        return None
+    index = None
+    if param.kind in (param.POSITIONAL_ONLY, param.POSITIONAL_OR_KEYWORD):
+        index = list(signature.parameters).index(name)
+    default = None if param.default is param.empty else param.default
+
+    def getter(_args, _kwargs):
+        if index is not None and index < len(_args):
+            return _args[index]
+        return _kwargs.get(name, default)
+
+    return getter
+
+
+def step(*, title=None, args=[], result=False, tag=None, stream=False):  # pylint: disable=unused-argument
+    """
+    Decorator to run the function as a step.
+
+    Args:
+        title (str): title of the step, defaults to the function name
+        args (list): names of the arguments to record in the step
+        result (bool): record the return value in the step
+        tag (str): tag for filtering in the reporters
+        stream (bool): only report the recorded arguments and result in a
+            single event when the step stops, which may be merged with the
+            events of consecutive calls (for reads and writes)
+    """
     def decorator(func):
         # resolve default title
         nonlocal title
         title = title or func.__name__
 
         signature = inspect.signature(func)
+        pass_step = 'step' in signature.parameters
+
+        # extract the arguments at decoration time, fall back to binding the
+        # signature for each call if that's not possible
+        getters = {name: _get_argument_getter(signature, name) for name in ['self'] + args}
+        if None in getters.values():
+            def get_arguments(_args, _kwargs):
+                bound = signature.bind_partial(*_args, **_kwargs)
+                bound.apply_defaults()
+                return bound.arguments
+        else:
+            def get_arguments(_args, _kwargs):
+                return {name: getter(_args, _kwargs) for name, getter in getters.items()}
 
         @wraps(func)
         def wrapper(*_args, **_kwargs):
-            bound = signature.bind_partial(*_args, **_kwargs)
-            bound.apply_defaults()
-            source = bound.arguments.get('self')
-            step = steps.get_new(title, tag, source)
+            # without subscribers, nobody sees the step unless it's passed on
+            if not steps._subscribers and not pass_step:  # pylint: disable=protected-access
+                return func(*_args, **_kwargs)
+            arguments = get_arguments(_args, _kwargs)
+            step = steps.get_new(title, tag, arguments.get('self'), stream)
             # optionally pass the step object
-            if 'step' in signature.parameters:
+            if pass_step:
                 _kwargs['step'] = step
             if args:
-                step.args = {k: bound.arguments[k] for k in args}
+                step.args = {k: arguments[k] for k in args}
             step.start()
             try:
                 _result = func(*_args, **_kwargs)
@@ -1,5 +1,10 @@
+from ..factory import target_factory
 from .common import Strategy, StrategyError
-from .bareboxstrategy import BareboxStrategy
-from .shellstrategy import ShellStrategy
-from .ubootstrategy import UBootStrategy
 from .graphstrategy import *  # pylint: disable=wildcard-import
+
+# the strategy modules are only imported when they are used
+target_factory.reg_lazy(globals(), {
+    'BareboxStrategy': '.bareboxstrategy',
+    'ShellStrategy': '.shellstrategy',
+    'UBootStrategy': '.ubootstrategy',
+})
@@ -1,14 +1,15 @@
 import abc
 import logging
-from time import monotonic, sleep
+from time import monotonic
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 
 import attr
 
 from .binding import BindingError, BindingState
 from .driver import Driver
 from .exceptions import NoSupplierFoundError, NoDriverFoundError, NoResourceFoundError
-from .resource import Resource
+from .resource import Resource, ResourceManager
 from .strategy import Strategy
 from .util import Timeout
 
@@ -17,6 +18,7 @@ from .util import Timeout
 class Target:
     name = attr.ib(validator=attr.validators.instance_of(str))
     env = attr.ib(default=None)
+    parallel_activation = attr.ib(default=False, validator=attr.validators.instance_of(bool))
 
     def __attrs_post_init__(self):
         self.log = logging.getLogger("target({})".format(self.name))
@@ -29,6 +31,10 @@ class Target:
         # https://github.com/python-attrs/attrs/issues/106
         self._binding_map = {}
         self._lookup_table = {}
+        # bound resources and drivers by each class in their MRO
+        self._resource_index = {}
+        self._driver_index = {}
+        self._priorities = {}
 
     def interact(self, msg):
         if self.env:
@@ -79,13 +85,13 @@ class Target:
             timeout = Timeout(timeout)
 
         while waiting and not timeout.expired:
-            waiting = set(r for r in waiting if r.avail != avail)
             managers = set(r.get_managed_parent().manager for r in waiting)
             for m in managers:
                 m.poll()
-            if not any(r for r in waiting if r.avail == avail):
-                # sleep if no progress
-                sleep(0.5)
+            progress = any(r.avail == avail for r in waiting)
+            waiting = set(r for r in waiting if r.avail != avail)
+            if waiting and not progress:
+                self._wait_for_managers(managers, timeout.remaining)
 
         if waiting:
             raise NoResourceFoundError(
@@ -96,6 +102,20 @@ class Target:
 
         self.update_resources()
 
+    @staticmethod
+    def _wait_for_managers(managers, timeout):
+        """Wait until one of the managers reports changes"""
+        if len(managers) == 1:
+            manager, = managers
+            manager.wait(timeout)
+            return
+        # there is no common wait primitive, so wait for each one in turn
+        # with a timeout short enough to not delay changes of the others
+        timeout = min(timeout, ResourceManager.poll_interval) / len(managers)
+        for manager in managers:
+            if manager.wait(timeout):
+                return
+
     def get_resource(self, cls, *, name=None, wait_avail=True):
         """
         Helper function to get a resource of the target.
@@ -112,9 +132,7 @@ class Target:
         if isinstance(cls, str):
             cls = self._class_from_string(cls)
 
-        for res in self.resources:
-            if not isinstance(res, cls):
-                continue
+        for res in self._lookup(self._resource_index, self.resources, cls):
             if name and res.name != name:
                 other_names.append(res.name)
                 continue
@@ -145,9 +163,7 @@ class Target:
         if isinstance(cls, str):
             cls = self._class_from_string(cls)
 
-        for drv in self.drivers:
-            if not isinstance(drv, cls):
-                continue
+        for drv in self._lookup(self._driver_index, self.drivers, cls):
             if name and drv.name != name:
                 other_names.append(drv.name)
                 continue
@@ -171,7 +187,7 @@ class Target:
             prio_last = -255
             prio_found = []
             for drv in found:
-                prio = drv.get_priority(cls)
+                prio = self._get_priority(drv, cls)
                 if prio > prio_last:
                     prio_found = []
                     prio_found.append(drv)
@@ -190,6 +206,27 @@ class Target:
             self.activate(found[0])
         return found[0]
 
+    @staticmethod
+    def _lookup(index, bindables, cls):
+        """Return the bindables which are instances of cls in binding order"""
+        if isinstance(cls, type):
+            return index.get(cls, ())
+        return [b for b in bindables if isinstance(b, cls)]
+
+    @staticmethod
+    def _add_to_index(index, bindable):
+        for cls in bindable.__class__.__mro__:
+            index.setdefault(cls, []).append(bindable)
+
+    def _get_priority(self, driver, cls):
+        """Return the (cached) priority of the driver for cls"""
+        key = (driver.__class__, cls)
+        try:
+            return self._priorities[key]
+        except KeyError:
+            prio = self._priorities[key] = driver.get_priority(cls)
+            return prio
+
     def get_active_driver(self, cls, *, name=None):
         """
         Helper function to get the active driver of the target.
@@ -263,6 +300,7 @@ class Target:
 
         # update state
         self.resources.append(resource)
+        self._add_to_index(self._resource_index, resource)
         # update lookup table
         self._lookup_table[resource.__class__.__name__] = resource.__class__
         resource.target = self
@@ -357,6 +395,7 @@ class Target:
 
         # update relationship in both directions
         self.drivers.append(client)
+        self._add_to_index(self._driver_index, client)
         # update lookup table
         cls = client.__class__
         self._lookup_table[cls.__name__] = cls
@@ -400,6 +439,10 @@ class Target:
         # consistency check
         assert client in self.resources or client in self.drivers
 
+        if self.parallel_activation:
+            self._activate_parallel(client)
+            return
+
         # wait until resources are available
         resources = [resource for resource in client.suppliers if isinstance(resource, Resource)]
         self.await_resources(resources)
@@ -414,6 +457,83 @@ class Target:
         client.on_activate()
         client.state = BindingState.active
 
+    def _activate_parallel(self, client):
+        """
+        Activate the client and its inactive suppliers, running the
+        on_activate() calls of independent suppliers concurrently.
+
+        Each bindable is activated after all of its suppliers. The
+        resolve_conflicts() calls run in this thread before the client is
+        activated, and bindables sharing a supplier are never activated at
+        the same time.
+        """
+        # inactive bindables in dependency order
+        pending = []
+
+        def collect(bindable):
+            if bindable in pending or bindable.state is BindingState.active:
+                return
+            if bindable.state is not BindingState.bound:
+                raise BindingError(
+                    "{} is not in state {}".format(bindable, BindingState.bound)
+                )
+            for supplier in bindable.suppliers:
+                collect(supplier)
+            pending.append(bindable)
+
+        collect(client)
+
+        # wait until resources are available
+        self.await_resources({
+            supplier for bindable in pending for supplier in bindable.suppliers
+            if isinstance(supplier, Resource)
+        })
+
+        done = set()
+        while pending:
+            ready = []
+            used = set()
+            for bindable in pending:
+                if any(supplier.state is not BindingState.active and supplier not in done
+                       for supplier in bindable.suppliers):
+                    continue
+                if used & bindable.suppliers:
+                    continue
+                used |= bindable.suppliers
+                ready.append(bindable)
+            for bindable in ready:
+                pending.remove(bindable)
+                for supplier in bindable.suppliers:
+                    supplier.resolve_conflicts(bindable)
+            self._run_parallel(ready, 'on_activate', BindingState.active)
+            done.update(ready)
+
+    @staticmethod
+    def _run_parallel(bindables, method, state):
+        """
+        Call the method of all bindables concurrently and set the state of
+        those which succeeded. The first exception is raised after all calls
+        have finished.
+        """
+        if len(bindables) == 1:
+            bindable, = bindables
+            getattr(bindable, method)()
+            bindable.state = state
+            return
+        with ThreadPoolExecutor(max_workers=len(bindables)) as executor:
+            futures = [
+                (bindable, executor.submit(getattr(bindable, method)))
+                for bindable in bindables
+            ]
+        error = None
+        for bindable, future in futures:
+            if future.exception() is not None:
+                error = error or future.exception()
+                continue
+            bindable.state = state
+        if error is not None:
+            raise error
+
     def deactivate(self, client):
         """
         Recursively deactivate the client's clients and itself.
@@ -443,9 +563,32 @@ class Target:
 
     def deactivate_all_drivers(self):
         """Deactivates all drivers in reversed order they were activated"""
+        if self.parallel_activation:
+            self._deactivate_parallel(list(reversed(self.drivers)))
+            return
         for drv in reversed(self.drivers):
             self.deactivate(drv)
 
+    def _deactivate_parallel(self, bindables):
+        """
+        Deactivate the bindables, running the on_deactivate() calls of
+        bindables without active clients concurrently.
+        """
+        pending = [bindable for bindable in bindables if bindable.state is BindingState.active]
+        while pending:
+            ready = [
+                bindable for bindable in pending
+                if not any(c.state is BindingState.active for c in bindable.clients)
+            ]
+            if not ready:
+                # the remaining clients are not part of bindables
+                for bindable in pending:
+                    self.deactivate(bindable)
+                return
+            for bindable in ready:
+                pending.remove(bindable)
+            self._run_parallel(ready, 'on_deactivate', BindingState.bound)
+
     def cleanup(self):
         """Clean up conntected drivers and resources in reversed order"""
         self.deactivate_all_drivers()
@@ -0,0 +1,125 @@
+import json
+
+from .step import steps
+
+
+class TraceReporter:
+    """TraceReporter - Reporter that writes the steps as a trace
+
+    The trace uses the Chrome trace event format, which can be loaded into
+    Perfetto (https://ui.perfetto.dev) or chrome://tracing. Each target is
+    shown as a process with one thread per driver or resource.
+
+    Args:
+        path (str): path of the trace file
+    """
+    instance = None
+
+    @classmethod
+    def start(cls, path):
+        """starts the TraceReporter"""
+        assert cls.instance is None
+        cls.instance = cls(path)
+
+    @classmethod
+    def stop(cls):
+        """stops the TraceReporter"""
+        assert cls.instance is not None
+        steps.unsubscribe(cls.instance.notify)
+        cls.instance._stop()
+        cls.instance = None
+
+    def __init__(self, path):
+        self._tracks = {}
+        self._processes = {}
+        self._first = True
+        self._file = open(path, mode='w')
+        self._file.write('[\n')
+        steps.subscribe(self.notify)
+
+    def _stop(self):
+        self._file.write('\n]\n')
+        self._file.close()
+
+    def _write(self, event):
+        if not self._first:
+            self._file.write(',\n')
+        self._first = False
+        self._file.write(json.dumps(event, default=repr))
+
+    def _get_track(self, source):
+        """Returns the (pid, tid) tuple for the source of a step, writing the
+        metadata events for new processes and threads"""
+        try:
+            return self._tracks[source]
+        except KeyError:
+            pass
+
+        target = getattr(source, 'target', None)
+        process = target.name if target is not None else 'labgrid'
+        pid = self._processes.get(process)
+        if pid is None:
+            pid = self._processes[process] = len(self._processes) + 1
+            self._write({
+                'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0,
+                'args': {'name': process},
+            })
+
+        if source is None:
+            thread = 'steps'
+        elif getattr(source, 'name', None):
+            thread = '{} {}'.format(source.__class__.__name__, source.name)
+        else:
+            thread = source.__class__.__name__
+        tid = len(self._tracks) + 1
+        self._write({
+            'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+            'args': {'name': thread},
+        })
+
+        track = self._tracks[source] = (pid, tid)
+        return track
+
+    @staticmethod
+    def _format_args(data):
+        """Returns the values of data as shortened JSON compatible values"""
+        args = {}
+        for k, v in data.items():
+            if v is None:
+                continue
+            if not isinstance(v, (int, float, bool, str)):
+                v = repr(v)
+            if isinstance(v, str) and len(v) > 200:
+                v = v[:200] + '...'
+            args[k] = v
+        return args
+
+    def notify(self, event):
+        """This is the callback function for steps"""
+        step = event.step
+        pid, tid = self._get_track(step.source)
+        trace_event = {
+            'name': step.title,
+            'cat': step.tag or 'step',
+            'ts': event.ts * 1e6,
+            'pid': pid,
+            'tid': tid,
+        }
+        if event.stream:
+            trace_event['ph'] = 'i'
+            trace_event['s'] = 't'
+            trace_event['args'] = {
+                k: len(v) if isinstance(v, (bytes, str)) else repr(v)
+                for k, v in event.data.items()
+            }
+        elif event.data.get('state') == 'start':
+            trace_event['ph'] = 'B'
+            trace_event['args'] = self._format_args(event.data.get('args') or {})
+        elif event.data.get('state') == 'stop':
+            trace_event['ph'] = 'E'
+            trace_event['args'] = self._format_args({'result': event.data.get('result')})
+        else:
+            trace_event['ph'] = 'i'
+            trace_event['s'] = 't'
+            trace_event['args'] = self._format_args(event.data)
+        self._write(trace_event)
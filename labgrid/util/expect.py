@@ -1,4 +1,8 @@
+import re
+import time
+
 import pexpect
+from pexpect import EOF, TIMEOUT
 
 
 class PtxExpect(pexpect.spawn):
@@ -6,21 +10,45 @@ class PtxExpect(pexpect.spawn):
 
     This class provides pexpect functionality for the ConsoleProtocol classes.
     driver: ConsoleProtocol object to be passed in
+
+    The driver's read returns at least one byte and everything else which is
+    already available, so pexpect receives the console output in large chunks
+    instead of byte by byte.
+
+    Instead of searching the whole output since the last match after every
+    read like pexpect, expect only searches the new data and the preceding
+    lookbehind bytes, so a match may start at most lookbehind bytes before
+    the data received by the last read. The output is collected in a list of
+    chunks and only joined for the before attribute once a pattern matched.
+    The lookbehind can be changed per call with the searchwindowsize argument,
+    None searches all data like pexpect.
     """
+    # upper bound for a single read, the drivers decide how much is available
+    chunk_size = 4096
+    lookbehind = 4096
+    # maximum number of compiled pattern lists to keep
+    pattern_cache_size = 64
 
-    def __init__(self, driver, logfile=None, timeout=30, cwd=None):
+    def __init__(self, driver, logfile=None, timeout=30, cwd=None, lookbehind=None):
         "Initializes a pexpect spawn instanse with required configuration"
         self.driver = driver
         self.logfile = logfile
         self.linesep = b"\n"
+        if lookbehind is not None:
+            self.lookbehind = lookbehind
+        self._chunks = []
+        self._patterns = {}
         pexpect.spawn.__init__(
             self,
             None,
             timeout=timeout,
-            maxread=1,
+            maxread=self.chunk_size,
             cwd=cwd,
             logfile=self.logfile,
         )
+        # the driver read blocks until data arrives, so there is no need to
+        # sleep after each read to let more data accumulate
+        self.delayafterread = None
 
     def send(self, s):
         "Write to underlying transport, return number of bytes written"
@@ -30,9 +58,145 @@ class PtxExpect(pexpect.spawn):
         b = s
         return self.driver.write(b)
 
+    def sendcontrol(self, char):
+        """Send a control character like Ctrl-C, pexpect's implementation
+        requires a pty process"""
+        char = char.lower()
+        if 'a' <= char <= 'z':
+            byte = ord(char) - ord('a') + 1
+        else:
+            byte = {
+                '@': 0, '`': 0, '[': 27, '{': 27, '\\': 28, '|': 28,
+                ']': 29, '}': 29, '^': 30, '~': 30, '_': 31, '?': 127,
+            }.get(char)
+            if byte is None:
+                return 0
+        return self.send(bytes([byte]))
+
     def read_nonblocking(self, size=1, timeout=-1):
-        "Pexpects needs a nonblocking read function, simply use pyserial with a timeout of 0"
+        """Pexpect needs a nonblocking read function, simply use the driver's read with a timeout
+
+        pexpect passes maxread as size, which is an upper bound here. For the
+        driver, size is the minimum amount to wait for, so only one byte is
+        requested and the driver returns all data which is already available.
+        """
         assert timeout is not None
         if timeout == -1:
             timeout = self.timeout
-        return self.driver.read(size=size, timeout=timeout)
+        return self.driver.read(size=1, timeout=timeout)
+
+    def append(self, data):
+        "Add data to the output which has not been matched yet"
+        if data:
+            self._chunks.append(data)
+
+    def compile_pattern_list(self, patterns):
+        """Compile the patterns like pexpect, but cache the result so that
+        repeated expect calls with the same patterns don't recompile them"""
+        key = (tuple(patterns) if isinstance(patterns, list) else patterns, self.ignorecase)
+        try:
+            compiled = self._patterns.get(key)
+        except TypeError:  # unhashable patterns are passed on to pexpect
+            return super().compile_pattern_list(patterns)
+        if compiled is None:
+            if len(self._patterns) >= self.pattern_cache_size:
+                self._patterns.clear()
+            compiled = self._patterns[key] = super().compile_pattern_list(patterns)
+        return list(compiled)
+
+    def expect_exact(self, pattern_list, timeout=-1, searchwindowsize=-1, async_=False, **kw):
+        "Like expect, but matches the strings literally"
+        if isinstance(pattern_list, self.allowed_string_types) or pattern_list in (TIMEOUT, EOF):
+            pattern_list = [pattern_list]
+        compiled = [
+            p if p in (TIMEOUT, EOF) else re.compile(re.escape(self._coerce_expect_string(p)))
+            for p in pattern_list
+        ]
+        return self.expect_list(compiled, timeout, searchwindowsize, async_, **kw)
+
+    def expect_list(self, pattern_list, timeout=-1, searchwindowsize=-1, async_=False, **kw):
+        """Wait until one of the compiled patterns matches the console output
+        and return its index, see pexpect.spawn.expect_list
+
+        searchwindowsize is the lookbehind for this call, -1 uses the default
+        lookbehind and None searches all output since the last match.
+        """
+        if async_ or kw:
+            raise TypeError("unsupported arguments for PtxExpect.expect_list")
+        if timeout == -1:
+            timeout = self.timeout
+        lookbehind = self.lookbehind if searchwindowsize == -1 else searchwindowsize
+        regexes = [(i, p) for i, p in enumerate(pattern_list) if p not in (TIMEOUT, EOF)]
+
+        if timeout is not None:
+            end_time = time.monotonic() + timeout
+        # offset of the search window in the output since the last match
+        offset = 0
+        window = b''.join(self._chunks)
+        self._chunks = [window] if window else []
+        try:
+            found = self._search(regexes, window)
+            while found is None:
+                if timeout is not None and timeout < 0:
+                    raise TIMEOUT("Timeout exceeded")
+                incoming = self.read_nonblocking(self.maxread, timeout)
+                if incoming:
+                    self._chunks.append(incoming)
+                    if lookbehind is not None and len(window) > lookbehind:
+                        excess = len(window) - lookbehind
+                        offset += excess
+                        window = window[excess:]
+                    window += incoming
+                    found = self._search(regexes, window)
+                if timeout is not None:
+                    timeout = end_time - time.monotonic()
+        except TIMEOUT as e:
+            return self._expect_failed(pattern_list, TIMEOUT, e)
+        except EOF as e:
+            return self._expect_failed(pattern_list, EOF, e)
+        except:
+            self._expect_failed(pattern_list, None, None)
+            raise
+
+        index, match = found
+        output = b''.join(self._chunks)
+        rest = output[offset + match.end():]
+        self.before = output[:offset + match.start()]
+        self.after = match.group(0)
+        self.match = match
+        self.match_index = index
+        self._chunks = [rest] if rest else []
+        return index
+
+    @staticmethod
+    def _search(regexes, window):
+        """Return the (index, match) tuple of the pattern matching first in
+        the window or None"""
+        found = None
+        first = None
+        for index, regex in regexes:
+            match = regex.search(window)
+            if match is None:
+                continue
+            if first is None or match.start() < first:
+                found = (index, match)
+                first = match.start()
+        return found
+
+    def _expect_failed(self, pattern_list, reason, exc):
+        """Set the results for a failed expect, return the index of reason in
+        the pattern list or raise exc if it is not expected"""
+        self.before = b''.join(self._chunks)
+        self._chunks = [self.before] if self.before and reason is not EOF else []
+        self.after = reason
+        if reason is not None and reason in pattern_list:
+            self.match = reason
+            self.match_index = pattern_list.index(reason)
+            return self.match_index
+        self.match = None
+        self.match_index = None
+        if exc is not None:
+            raise reason("{}\nwaiting for: {}".format(exc, [
+                getattr(p, 'pattern', p) for p in pattern_list
+            ])) from None
+        return None
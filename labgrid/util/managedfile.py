@@ -49,7 +49,7 @@ class ManagedFile:
         """
         if isinstance(self.resource, NetworkResource):
             host = self.resource.host
-            conn = sshmanager.open(host)
+            conn = sshmanager.get(host)
 
             if self._on_nfs(conn):
                 return # nothing to do
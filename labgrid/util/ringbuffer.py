@@ -0,0 +1,108 @@
+import threading
+
+
+class RingBuffer:
+    """
+    Bounded buffer keeping the latest bytes written to it.
+
+    The data is stored once and read through independent cursors, each of which
+    tracks its own position. Cursors which fall behind by more than the buffer
+    size skip the overwritten data and count it as lost.
+    """
+    def __init__(self, size=64*1024):
+        if size <= 0:
+            raise ValueError("size must be positive")
+        self.size = size
+        self._data = bytearray(size)
+        self._end = 0  # total number of bytes written
+        self._closed = False
+        self._error = None
+        self._cond = threading.Condition()
+
+    @property
+    def end(self):
+        """Total number of bytes written to the buffer"""
+        return self._end
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def write(self, data):
+        """Append data, overwriting the oldest bytes if the buffer is full"""
+        if not data:
+            return
+        with self._cond:
+            if len(data) > self.size:
+                self._end += len(data) - self.size
+                data = data[-self.size:]
+            start = self._end % self.size
+            first = min(len(data), self.size - start)
+            self._data[start:start+first] = data[:first]
+            self._data[:len(data)-first] = data[first:]
+            self._end += len(data)
+            self._cond.notify_all()
+
+    def close(self, error=None):
+        """Close the buffer, waiting readers get the remaining data and then
+        the error (if any) or empty bytes"""
+        with self._cond:
+            self._closed = True
+            self._error = error
+            self._cond.notify_all()
+
+    def cursor(self, backlog=False):
+        """Return a new cursor positioned at the end of the buffer or at the
+        oldest available byte if backlog is True"""
+        with self._cond:
+            pos = max(0, self._end - self.size) if backlog else self._end
+        return RingBufferCursor(self, pos)
+
+    def _read(self, cursor, size, min_size, timeout):
+        min_size = min(min_size, self.size)
+        with self._cond:
+            self._cond.wait_for(
+                lambda: self._end - cursor.pos >= min_size or self._closed, timeout
+            )
+            oldest = max(0, self._end - self.size)
+            if cursor.pos < oldest:
+                cursor.lost += oldest - cursor.pos
+                cursor.pos = oldest
+            count = min(size, self._end - cursor.pos)
+            if not count and self._closed and self._error is not None:
+                raise self._error
+            start = cursor.pos % self.size
+            first = min(count, self.size - start)
+            data = bytes(self._data[start:start+first]) + bytes(self._data[:count-first])
+            cursor.pos += count
+            return data
+
+
+class RingBufferCursor:
+    """Read position in a RingBuffer, created by RingBuffer.cursor()"""
+    def __init__(self, ring, pos):
+        self.ring = ring
+        self.pos = pos
+        self.lost = 0
+
+    @property
+    def available(self):
+        """Number of bytes which can be read without waiting"""
+        return min(self.ring.end - self.pos, self.ring.size)
+
+    def read(self, size=-1, min_size=1, timeout=None):
+        """
+        Wait until min_size bytes are available and return up to size bytes.
+
+        Args:
+            size (int): maximum number of bytes to return, -1 for all
+            min_size (int): number of bytes to wait for
+            timeout (float): maximum time to wait, None waits forever
+
+        Returns:
+            bytes: the data, which is shorter than min_size on timeout or if
+            the buffer was closed
+        """
+        if size < 0:
+            size = self.ring.size
+        return self.ring._read(self, size, min_size, timeout)  # pylint: disable=protected-access
@@ -0,0 +1,55 @@
+import math
+
+
+class DurationSketch:
+    """
+    Streaming histogram of durations with bounded memory.
+
+    The durations are counted in logarithmic buckets, so quantiles have a
+    relative error of at most `accuracy`. If more than `max_buckets` buckets
+    are in use, the lowest buckets are collapsed, which only reduces the
+    accuracy of the lowest quantiles.
+    """
+    def __init__(self, accuracy=0.01, max_buckets=1024):
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.max_buckets = max_buckets
+        self.buckets = {}
+        self.zero = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        if value <= 0.0:
+            self.zero += 1
+            return
+        key = math.ceil(math.log(value) / self.log_gamma)
+        self.buckets[key] = self.buckets.get(key, 0) + 1
+        if len(self.buckets) > self.max_buckets:
+            keys = sorted(self.buckets)
+            self.buckets[keys[1]] += self.buckets.pop(keys[0])
+
+    def quantile(self, q):
+        """Return the approximate q-quantile (0 <= q <= 1)"""
+        if not self.count:
+            return None
+        if q <= 0.0:
+            return self.min
+        if q >= 1.0:
+            return self.max
+        rank = q * (self.count - 1)
+        seen = self.zero
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if rank < seen:
+                value = 2 * self.gamma ** key / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
@@ -26,6 +26,10 @@ class SSHConnectionManager:
         init=False,
         validator=attr.validators.optional(attr.validators.instance_of(dict))
     )
+    _refcounts = attr.ib(default=attr.Factory(dict), init=False)
+    # hosts whose connection was created by open()
+    _opened = attr.ib(default=attr.Factory(set), init=False)
+    _handshakes_saved = attr.ib(default=attr.Factory(dict), init=False)
 
     def __attrs_post_init__(self):
         self.logger = logging.getLogger("{}".format(self))
@@ -38,7 +42,9 @@ class SSHConnectionManager:
 
         Returns:
             :obj:`SSHConnection`: the SSHConnection for the host"""
-        host = socket.getfqdn(host)
+        return self._get(socket.getfqdn(host))
+
+    def _get(self, host):
         instance = self._connections.get(host)
         if instance is None:
             # pylint: disable=unsupported-assignment-operation
@@ -71,15 +77,77 @@ class SSHConnectionManager:
     def remove_by_name(self, name):
         # pylint: disable=unsupported-assignment-operation
         del self._connections[name]
+        self._refcounts.pop(name, None)
+        self._opened.discard(name)
 
     def open(self, host):
-        return self.get(host)
+        """Retrieve or create a connection to a given host and take a
+        reference on it, which must be released with close()
+
+        Arguments:
+            host (str): host to open the connection for
+
+        Returns:
+            :obj:`SSHConnection`: the SSHConnection for the host"""
+        host = socket.getfqdn(host)
+        created = host not in self._connections
+        con = self._get(host)
+        if created:
+            self._opened.add(host)
+        self._refcounts[host] = self._refcounts.get(host, 0) + 1
+        return con
 
     def close(self, host):
-        con = self.get(host)
+        """Release a reference taken with open(). When the last reference is
+        released, the connection is closed if it was created by open() and
+        has no port forwards. Connections used through get() are kept until
+        close_all().
+
+        Arguments:
+            host (str): host to close the connection for
+        """
+        host = socket.getfqdn(host)
+        count = self._refcounts.get(host, 0) - 1
+        if count > 0:
+            self._refcounts[host] = count
+            return
+        self._refcounts.pop(host, None)
+        con = self._connections.get(host)
+        if con is None or host not in self._opened:
+            return
+        if con._forwards:  # pylint: disable=protected-access
+            # the forwards requested by others still need the connection
+            return
+        self._opened.discard(host)
         con.disconnect()
         self.remove_connection(con)
 
+    def get_prefix(self, host):
+        """Retrieve a command prefix which runs commands on the host over the
+        multiplexed connection
+
+        Arguments:
+            host (str): host to retrieve the prefix for
+
+        Returns:
+            List[str]: the command prefix for the host"""
+        host = socket.getfqdn(host)
+        existing = self._connections.get(host)
+        reused = existing is not None and existing.isconnected()
+        con = self._get(host)
+        if reused:
+            # pylint: disable=unsupported-assignment-operation
+            self._handshakes_saved[con.host] = self._handshakes_saved.get(con.host, 0) + 1
+        return con.get_prefix()
+
+    def get_stats(self):
+        """Retrieve the number of SSH handshakes saved by reusing an already
+        connected multiplexed connection for command prefixes
+
+        Returns:
+            Dict[str, int]: saved handshakes per host"""
+        return self._handshakes_saved.copy()
+
     def request_forward(self, host, dest, port):
         con = self.get(host)
         return con.add_port_forward(dest, port)
@@ -149,6 +217,15 @@ class SSHConnection:
         args += self._get_ssh_control_args()
         return args
 
+    def get_prefix(self):
+        """Return a command prefix which runs commands over this connection
+
+        Returns:
+            List[str]: the ssh command prefix, terminated by '--'"""
+        return ["ssh"] + self._get_ssh_args() + [
+            "-o", "ConnectTimeout=5", self.host, "--"
+        ]
+
     def _open_connection(self):
         """Internal function which appends the control socket and checks if the
         connection is already open"""
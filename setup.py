@@ -19,6 +19,7 @@ setup(
         'snmp': ['pysnmp', 'pysnmp-mibs'],
         'modbus': ['pyModbusTCP'],
         'graph': ['graphviz'],
+        'zstd': ['zstandard'],
     },
     setup_requires=['pytest-runner', 'setuptools_scm'],
     tests_require=['pytest-mock', ],
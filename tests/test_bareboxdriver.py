@@ -35,3 +35,27 @@ class TestBareboxDriver:
             res = d.run_check("test")
         res = d.run("test")
         assert res == (['error'], [], 1)
+
+    def test_barebox_run_iter(self, target_with_fakeconsole, mocker):
+        t = target_with_fakeconsole
+        d = BareboxDriver(t, "barebox", prompt='barebox:/ ')
+        d.on_activate = mocker.MagicMock()
+        d = t.get_driver(BareboxDriver)
+        d._status = 1
+        mocker.patch('labgrid.driver.bareboxdriver.gen_marker', return_value='ABCDEFGHIJ')
+        console = t.get_driver('FakeConsoleDriver')
+        # the fake console returns the last item first
+        output = [b'ABCDEFGHIJ\r\n', b'one\r\ntw', b'o\r\nthree\r\n', b'ABCDEFGHIJ 1\r\n',
+                  b'barebox:/ ']
+        console.rxq = list(reversed(output))
+
+        lines = d.run_iter("test")
+        assert next(lines) == 'one'
+        assert console.txq[-1].startswith(b'echo -o /cmd test;')
+        # the remaining output is discarded when the iteration is stopped
+        lines.close()
+        assert lines.exitcode == 1
+        assert console.rxq == []
+
+        console.rxq = list(reversed(output))
+        assert list(d.run_iter("test")) == ['one', 'two', 'three']
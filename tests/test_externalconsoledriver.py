@@ -16,3 +16,15 @@ class TestExternalConsoleDriver:
         time.sleep(0.1)
         assert d.read(1024) == data
         d.close()
+
+    def test_expect_chunked(self, target):
+        d = ExternalConsoleDriver(target, 'console', cmd='cat')
+        target.activate(d)
+        d.write(b"first line\nprompt> second line\nprompt> ")
+        index, before, _, after = d.expect([b"prompt> "], timeout=5.0)
+        assert index == 0
+        assert before == b"first line\n"
+        assert after == b"prompt> "
+        _, before, _, _ = d.expect([b"prompt> "], timeout=5.0)
+        assert before == b"second line\n"
+        d.close()
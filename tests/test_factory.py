@@ -1,4 +1,7 @@
 from collections import OrderedDict
+import subprocess
+import sys
+import textwrap
 
 import pytest
 
@@ -156,3 +159,22 @@ class TestTargetFactory:
             target_factory.make_driver(
                 None, 'UnknownDriver', None, {})
         assert "unknown driver class" in excinfo.value.msg
+
+    @pytest.mark.skipif(sys.version_info < (3, 7),
+                        reason="modules are imported eagerly without PEP 562")
+    def test_lazy_import(self):
+        code = textwrap.dedent("""
+            import sys
+            from labgrid import target_factory
+            assert 'labgrid.driver.qemudriver' not in sys.modules
+            assert 'labgrid.resource.udev' not in sys.modules
+            t = target_factory.make_target('dummy', {
+                'resources': {'RawSerialPort': {'port': 'foo'}},
+                'drivers': {'SerialDriver': {}},
+            })
+            assert 'labgrid.driver.serialdriver' in sys.modules
+            assert 'labgrid.driver.qemudriver' not in sys.modules
+            from labgrid.driver import QEMUDriver
+            assert 'labgrid.driver.qemudriver' in sys.modules
+        """)
+        subprocess.check_call([sys.executable, '-c', code])
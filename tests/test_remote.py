@@ -18,3 +18,345 @@ def test_exporter_help():
         spawn.close()
         assert spawn.exitstatus == 0
         assert spawn.signalstatus is None
+
+def test_remoteplacemanager_wait():
+    import threading
+    from labgrid.resource.remote import RemotePlaceManager
+
+    manager = RemotePlaceManager()
+    manager.thread = threading.current_thread()
+    assert not manager.wait(0.01)
+
+    threading.Timer(0.05, manager._on_session_changed).start()
+    assert manager.wait(5.0)
+
+    manager.poll()
+    assert not manager.wait(0.01)
+
+def test_start_session_own_loop():
+    import asyncio
+    from labgrid.remote.client import start_session
+
+    # the session of a RemotePlaceManager runs in a new loop, which is not
+    # the loop of the calling thread
+    loop = asyncio.new_event_loop()
+    extra = {'filtered': True}
+    connections = []
+
+    async def create_connection(factory, host, port):
+        connections.append((host, port))
+        await extra['connected'](None)
+
+    loop.create_connection = create_connection
+    try:
+        start_session('ws://127.0.0.1:20408/ws', 'realm1', extra, loop=loop)
+    finally:
+        loop.close()
+    assert connections == [('127.0.0.1', 20408)]
+    assert extra['loop'] is loop
+
+def test_remoteplacemanager_dirty_entries(target):
+    import threading
+    from labgrid.remote.common import ResourceEntry
+    from labgrid.resource.remote import RemotePlaceManager, NetworkUSBVideo
+
+    params = {
+        'host': 'localhost', 'busnum': 0, 'devnum': 1, 'path': '0:1',
+        'vendor_id': 0, 'model_id': 0,
+    }
+    entry = ResourceEntry({'cls': 'NetworkUSBVideo', 'params': params, 'avail': True})
+    resource = NetworkUSBVideo(target, name=None, **entry.args)
+
+    manager = RemotePlaceManager()
+    manager.thread = threading.current_thread()
+    manager._entry_resources[entry] = [resource]
+
+    manager.poll()
+    assert resource.avail is False
+
+    entry.data = {'cls': 'NetworkUSBVideo', 'params': dict(params, devnum=2), 'avail': True}
+    manager._on_session_changed([ResourceEntry({'cls': 'NetworkUSBVideo', 'params': params})])
+    manager.poll()
+    assert resource.devnum == 1
+
+    manager._on_session_changed([entry])
+    manager.poll()
+    assert resource.devnum == 2
+    assert resource.avail is True
+
+def test_coordinator_poll_exporters_concurrently():
+    import asyncio
+    from labgrid.remote.coordinator import CoordinatorComponent, ExporterSession, StateJournal
+
+    loop = asyncio.new_event_loop()
+    coordinator = CoordinatorComponent()
+    coordinator.save_scheduled = False
+    coordinator.journal = StateJournal()
+    coordinator.sessions = {}
+    for i in range(4):
+        session = ExporterSession(coordinator, i, 'exporter/e{}'.format(i))
+        coordinator.sessions[session.key] = session
+
+    async def version():
+        await asyncio.sleep(0.2)
+        return "1.0"
+
+    coordinator.call = lambda *args: loop.create_task(version())
+
+    start = loop.time()
+    loop.run_until_complete(coordinator._poll_step())
+    assert loop.time() - start < 0.6
+
+    stats = loop.run_until_complete(coordinator.get_exporter_stats())
+    loop.close()
+    assert sorted(stats) == ['e0', 'e1', 'e2', 'e3']
+    assert stats['e0']['version'] == "1.0"
+    assert stats['e0']['rtt'] >= 0.2
+
+def test_coordinator_state_journal(tmpdir):
+    from labgrid.remote.coordinator import StateJournal
+
+    paths = {
+        'places_path': str(tmpdir.join('places.yaml')),
+        'resources_path': str(tmpdir.join('resources.yaml')),
+        'journal_path': str(tmpdir.join('places.journal')),
+    }
+    journal = StateJournal(**paths)
+    assert journal.load() == {}
+    journal.start()
+    journal.append('a', {'comment': 'first'})
+    journal.append('b', {'comment': 'second'})
+    journal.snapshot({}, {'a': {'comment': 'first'}, 'b': {'comment': 'second'}})
+    journal.append('a', {'comment': 'changed'})
+    journal.append('b', {})
+    journal.sync()
+    assert journal.get_stats()['journal_entries'] == 2
+    assert journal.get_stats()['journal_size'] > 0
+    assert journal.get_stats()['save_latency'] is not None
+    journal.stop()
+
+    journal = StateJournal(**paths)
+    assert journal.load() == {'a': {'comment': 'changed'}}
+    assert journal.entries == 2
+
+def test_place_index():
+    from itertools import product
+    from labgrid.remote.common import Place, PlaceIndex, ResourceMatch
+
+    places = [
+        Place('a', matches=[ResourceMatch('e1', '*', '*')]),
+        Place('b', matches=[ResourceMatch('*', 'g2', 'NetworkSerialPort'),
+                            ResourceMatch('e*', 'g[12]', '*', name='r1')]),
+        Place('c', matches=[ResourceMatch('*', '*', '*Port')]),
+        Place('d', matches=[]),
+    ]
+    index = PlaceIndex()
+    for place in places:
+        index.update(place)
+
+    def check():
+        for resource_path in product(['e1', 'e2', 'x'], ['g1', 'g2'],
+                                     ['NetworkSerialPort', 'USBPowerPort', 'NetworkService'],
+                                     ['r1', 'r2']):
+            expected = {
+                place.name: place.getmatch(resource_path) for place in places
+                if place.hasmatch(resource_path)
+            }
+            found = {
+                place.name: match for place, match in index.get_matches(resource_path)
+            }
+            assert found == expected
+
+    check()
+
+    places[0].matches.append(ResourceMatch('x', 'g1', '*'))
+    index.update(places[0])
+    check()
+
+    index.remove('b')
+    del places[1]
+    check()
+
+def test_coordinator_set_resources_coalesced():
+    import asyncio
+    from collections import deque, OrderedDict
+    from labgrid.remote.coordinator import CoordinatorComponent, ExporterSession
+    from labgrid.remote.common import PlaceIndex
+
+    class Details:
+        caller = 1
+
+    loop = asyncio.new_event_loop()
+    coordinator = CoordinatorComponent()
+    coordinator.places = {}
+    coordinator.place_index = PlaceIndex()
+    coordinator.save_scheduled = False
+    coordinator.resource_changes = OrderedDict()
+    coordinator.resource_changes_handle = None
+    coordinator.legacy_subscription = None
+    coordinator.state_version = 0
+    coordinator.change_log = deque()
+    coordinator.sessions = {1: ExporterSession(coordinator, 1, 'exporter/e1')}
+    published = []
+    coordinator.publish = lambda topic, *args: published.append((topic, args))
+
+    resource = {'cls': 'NetworkSerialPort', 'params': {'host': 'h', 'port': 1}, 'avail': True}
+    changes = [['g1', 'r{}'.format(i), resource] for i in range(10)]
+    loop.run_until_complete(coordinator.set_resources(changes, details=Details()))
+    loop.run_until_complete(coordinator.set_resource('g1', 'r0', {}, details=Details()))
+    assert published == []
+
+    loop.run_until_complete(asyncio.sleep(0.2))
+    assert len(published) == 1
+    topic, (grouped,) = published[0]
+    assert topic == 'org.labgrid.coordinator.resources_changed'
+    assert len(grouped) == 10
+    assert grouped[-1] == ['e1', 'g1', 'r0', {}]
+    assert coordinator.save_scheduled
+
+    # older clients receive the changes one by one while they are subscribed
+    loop.run_until_complete(coordinator.on_subscription_create(
+        2, {'id': 7, 'uri': 'org.labgrid.coordinator.resource_changed'}
+    ))
+    published.clear()
+    loop.run_until_complete(coordinator.set_resources(changes[:2], details=Details()))
+    coordinator.publish_resource_changes()
+    assert [topic for topic, _ in published] == [
+        'org.labgrid.coordinator.resources_changed',
+        'org.labgrid.coordinator.resource_changed',
+        'org.labgrid.coordinator.resource_changed',
+    ]
+    single = [list(args) for _, args in published[1:]]
+    assert single == published[0][1][0]
+    loop.run_until_complete(coordinator.on_subscription_delete(2, 7))
+    published.clear()
+    loop.run_until_complete(coordinator.set_resource('g1', 'r1', {}, details=Details()))
+    coordinator.publish_resource_changes()
+    assert [topic for topic, _ in published] == ['org.labgrid.coordinator.resources_changed']
+    loop.close()
+
+def test_client_sync_state_cache(tmpdir, monkeypatch):
+    import asyncio
+    import json
+    import os
+    from collections import deque, OrderedDict
+    from autobahn.wamp.types import ComponentConfig
+    from labgrid.remote.client import ClientSession
+    from labgrid.remote.common import PlaceIndex
+    from labgrid.remote.coordinator import CoordinatorComponent, StateJournal
+
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmpdir))
+    loop = asyncio.new_event_loop()
+
+    coordinator = CoordinatorComponent()
+    coordinator.sessions = {}
+    coordinator.places = {}
+    coordinator.place_index = PlaceIndex()
+    coordinator.journal = StateJournal(journal_path=str(tmpdir.join('places.journal')))
+    coordinator.resource_changes = OrderedDict()
+    coordinator.resource_changes_handle = None
+    coordinator.state_id = 'test'
+    coordinator.state_version = 0
+    coordinator.change_log = deque(maxlen=4)
+    coordinator.publish = lambda topic, *args: None
+
+    calls = []
+
+    def sync():
+        client = ClientSession(ComponentConfig('realm1', {'url': 'ws://test'}))
+        client.resources = {}
+        client.places = {}
+        client.place_index = PlaceIndex()
+        client.monitor = False
+        client.listeners = []
+
+        async def call(procedure, *args):
+            procedure = procedure.rsplit('.', 1)[1]
+            calls.append(procedure)
+            return await getattr(coordinator, procedure)(*args)
+
+        client.call = call
+        loop.run_until_complete(client.sync_state())
+        return client
+
+    loop.run_until_complete(coordinator.add_place('p1'))
+    client = sync()
+    assert calls == ['get_state']
+    assert list(client.places) == ['p1']
+
+    del calls[:]
+    loop.run_until_complete(coordinator.add_place('p2'))
+    loop.run_until_complete(coordinator.set_place_comment('p1', 'comment'))
+    client = sync()
+    assert calls == ['get_changes']
+    assert sorted(client.places) == ['p1', 'p2']
+    assert client.places['p1'].comment == 'comment'
+
+    del calls[:]
+    for i in range(5):
+        loop.run_until_complete(coordinator.add_place('p{}'.format(i + 3)))
+    loop.run_until_complete(coordinator.del_place('p2'))
+    client = sync()
+    assert calls == ['get_changes', 'get_state']
+    assert sorted(client.places) == ['p1', 'p3', 'p4', 'p5', 'p6', 'p7']
+
+    # a cache in an unknown format is ignored
+    cache_path = client._get_state_cache_path()
+    with open(cache_path, 'w') as f:
+        json.dump({'id': 'test', 'version': 0}, f)
+    del calls[:]
+    client = sync()
+    assert calls == ['get_state']
+    assert sorted(client.places) == ['p1', 'p3', 'p4', 'p5', 'p6', 'p7']
+    assert [p.basename for p in tmpdir.join('labgrid').listdir()] == [os.path.basename(cache_path)]
+    loop.close()
+
+def test_coordinator_place_topics():
+    import asyncio
+    from collections import deque, OrderedDict
+    from labgrid.remote.coordinator import CoordinatorComponent, ExporterSession, StateJournal
+    from labgrid.remote.common import Place, PlaceIndex, ResourceMatch, get_place_topic
+
+    class Details:
+        caller = 1
+
+    loop = asyncio.new_event_loop()
+    coordinator = CoordinatorComponent()
+    coordinator.places = {
+        'idle': Place('idle', matches=[ResourceMatch('e1', '*', '*')]),
+        'used': Place('used', matches=[ResourceMatch('e1', 'g1', '*')], acquired='host/user'),
+    }
+    coordinator.place_index = PlaceIndex()
+    for place in coordinator.places.values():
+        coordinator.place_index.update(place)
+    coordinator.save_scheduled = False
+    coordinator.journal = StateJournal()
+    coordinator.resource_changes = OrderedDict()
+    coordinator.resource_changes_handle = None
+    coordinator.legacy_subscription = None
+    coordinator.state_version = 0
+    coordinator.change_log = deque()
+    coordinator.sessions = {1: ExporterSession(coordinator, 1, 'exporter/e1')}
+    published = []
+    coordinator.publish = lambda topic, *args: published.append((topic, args))
+
+    resource = {'cls': 'NetworkSerialPort', 'params': {'host': 'h', 'port': 1}, 'avail': True}
+    changes = [['g1', 'r1', resource], ['g2', 'r2', resource]]
+    loop.run_until_complete(coordinator.set_resources(changes, details=Details()))
+    coordinator.publish_resource_changes()
+    loop.close()
+
+    topics = {}
+    for topic, args in published:
+        topics.setdefault(topic, []).append(args)
+    assert sorted(topics) == [
+        'org.labgrid.coordinator.place.used.changed',
+        'org.labgrid.coordinator.place.used.resources_changed',
+        'org.labgrid.coordinator.place_changed',
+        'org.labgrid.coordinator.resources_changed',
+    ]
+    assert sum(len(changes) for changes, in topics['org.labgrid.coordinator.resources_changed']) == 2
+    place_changes, = topics['org.labgrid.coordinator.place.used.resources_changed']
+    assert [change[:3] for change in place_changes[0]] == [['e1', 'g1', 'r1']]
+    assert get_place_topic('in valid', 'changed') is None
+    assert get_place_topic('a.b', 'changed') is None
@@ -2,6 +2,7 @@ import pytest
 import stat
 import os
 from labgrid.consoleloggingreporter import ConsoleLoggingReporter
+from labgrid.step import steps
 
 @pytest.fixture(scope='function')
 def consolelogger(tmpdir):
@@ -15,6 +16,8 @@ def test_consoleloggingreporter_output_with_name(consolelogger, serial_driver, t
     serial_driver.serial.in_waiting = 4
     serial_driver.serial.read = return_test
     serial_driver.read()
+    steps.flush()
+    steps.flush()
     assert tmpdir.join("console_Test_serial").readlines()[-1] == 'test'
 
 def test_consoleloggingreporter_output_without_name(consolelogger, serial_driver_no_name, tmpdir):
@@ -23,6 +26,7 @@ def test_consoleloggingreporter_output_without_name(consolelogger, serial_driver
     serial_driver_no_name.serial.in_waiting = 4
     serial_driver_no_name.serial.read = return_test
     serial_driver_no_name.read()
+    steps.flush()
     assert tmpdir.join("console_Test").readlines()[-1] == 'test'
 
 def test_consoleloggingreporter_dir_not_writeable(consolelogger, serial_driver, tmpdir):
@@ -32,3 +36,79 @@ def test_consoleloggingreporter_dir_not_writeable(consolelogger, serial_driver,
     serial_driver.serial.in_waiting = 4
     serial_driver.serial.read = return_test
     serial_driver.read()
+    steps.flush()
+
+def test_consoleloggingreporter_multiplexer(consolelogger, target_with_fakeconsole, tmpdir):
+    t = target_with_fakeconsole
+    console = t.get_driver('FakeConsoleDriver')
+    console.enable_multiplexer(size=1024)
+    console.rxq.insert(0, b'first line\nprompt> ')
+    console.expect('prompt> ', timeout=1.0)
+    # never consumed by expect, handed back in disable_multiplexer()
+    console.rxq.insert(0, b'second line\n')
+    assert console.watch().read(min_size=31, timeout=1.0).endswith(b'second line\n')
+    console.disable_multiplexer()
+    steps.flush()
+    log = tmpdir.join("console_{}_{}".format(t.name, console.name)).read_binary()
+    assert log.endswith(b'first line\nprompt> second line\n')
+
+def test_tracereporter(serial_driver, tmpdir):
+    import json
+    from labgrid.tracereporter import TraceReporter
+
+    def return_test(self, size=1, timeout=0.0):
+        return b"test"
+    serial_driver.serial.in_waiting = 4
+    serial_driver.serial.read = return_test
+
+    trace = tmpdir.join("trace.json")
+    TraceReporter.start(str(trace))
+    try:
+        serial_driver.read()
+        serial_driver.expect('test')
+    finally:
+        TraceReporter.stop()
+
+    events = json.loads(trace.read())
+    names = {e['args']['name'] for e in events if e['ph'] == 'M'}
+    assert names == {'Test', 'SerialDriver serial'}
+    phases = [(e['ph'], e['name']) for e in events if e['ph'] != 'M']
+    assert phases[0] == ('i', 'read')
+    assert ('B', 'expect') in phases
+    assert phases[-1] == ('E', 'expect')
+    assert {e['pid'] for e in events} == {1}
+
+def test_duration_sketch():
+    import random
+    from labgrid.util.sketch import DurationSketch
+
+    sketch = DurationSketch()
+    values = [random.lognormvariate(0, 2) for _ in range(10000)] + [0.0] * 10
+    for value in values:
+        sketch.add(value)
+    values.sort()
+    assert sketch.count == len(values)
+    assert len(sketch.buckets) <= sketch.max_buckets
+    for q in (0.5, 0.9, 0.99):
+        exact = values[int(q * (len(values) - 1))]
+        assert sketch.quantile(q) == pytest.approx(exact, rel=0.03)
+    assert sketch.quantile(0.0) == 0.0
+    assert sketch.quantile(1.0) == values[-1]
+
+def test_stepstatsreporter(serial_driver, tmpdir):
+    from labgrid.pytestplugin.statsreporter import StepStatsReporter
+
+    reporter = StepStatsReporter(json_path=str(tmpdir.join('stats.json')))
+    try:
+        serial_driver.serial.read = lambda self, size=1, timeout=0.0: b"test"
+        serial_driver.serial.in_waiting = 4
+        for _ in range(3):
+            serial_driver.expect('test')
+    finally:
+        reporter.pytest_unconfigure()
+
+    stats = reporter.get_stats()
+    assert [(s['title'], s['source'], s['target'], s['count']) for s in stats] == [
+        ('expect', 'SerialDriver', 'Test', 3),
+    ]
+    assert stats[0]['p50'] <= stats[0]['max']
@@ -19,3 +19,34 @@ def test_hash_set(target):
     k = set()
     k.add(resource1)
     assert resource1 in k
+
+def test_await_resources_wakeup(target):
+    import threading
+    import time
+    import attr
+    from labgrid.resource import ResourceManager
+
+    @attr.s(cmp=False)
+    class EventManager(ResourceManager):
+        def __attrs_post_init__(self):
+            super().__attrs_post_init__()
+            self.event = threading.Event()
+
+        def poll(self):
+            if self.event.is_set():
+                for resource in self.resources:
+                    resource.avail = True
+
+        def wait(self, timeout):
+            return self.event.wait(timeout)
+
+    @attr.s(cmp=False)
+    class EventResource(ManagedResource):
+        manager_cls = EventManager
+
+    resource = EventResource(target, "event")
+    threading.Timer(0.05, resource.manager.event.set).start()
+    start = time.monotonic()
+    target.await_resources([resource], timeout=5.0)
+    assert resource.avail
+    assert time.monotonic() - start < 0.4
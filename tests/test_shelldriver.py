@@ -45,3 +45,184 @@ class TestShellDriver:
         assert res == ['success']
         res = d.run("test")
         assert res == (['success'], [], 0)
+
+    def test_run_many(self, target_with_fakeconsole, mocker):
+        import re
+
+        t = target_with_fakeconsole
+        d = ShellDriver(t, "shell", prompt='dummy', login_prompt='dummy', username='dummy')
+        d.on_activate = mocker.MagicMock()
+        d = t.get_driver('ShellDriver')
+        d._check_prompt = mocker.MagicMock()
+        console = t.get_driver('FakeConsoleDriver')
+        lines = []
+        console.sendline = lines.append
+
+        def expect(pattern, timeout):
+            markers = re.findall(r"MARKER='(\w+)''(\w+)'", lines[-1])
+            markers = [first + second for first, second in markers]
+            if pattern == markers[0]:
+                return 0, b'', None, markers[0].encode()
+            output = b'one\r\n'
+            for marker in markers[1:]:
+                output += '{} 1\r\n{}two\r\n'.format(markers[0], marker).encode()
+            match = re.match(pattern.encode(), '{} 0\r\ndummy'.format(markers[-1]).encode())
+            return 0, output, match, match.group(0)
+
+        console.expect = expect
+        assert d.run_many(["a", "b"]) == [(['one'], [], 1), (['two'], [], 0)]
+        assert d._check_prompt.call_count == 1
+        assert lines[-1].count('run') == 2
+
+        # the last command ended at the prompt, so it is not checked again
+        assert d.run("a") == (['one'], [], 0)
+        assert d._check_prompt.call_count == 1
+
+    def test_stream_transfer(self, target, tmpdir):
+        import shutil
+        from labgrid.driver import ExternalConsoleDriver
+
+        if not shutil.which('script'):
+            pytest.skip("script not found")
+        prompt = 'TEST> '
+        console = ExternalConsoleDriver(
+            target, 'console', cmd='script -qfc "env PS1=\'{}\' sh -i" /dev/null'.format(prompt)
+        )
+        d = ShellDriver(target, "shell", prompt=prompt, login_prompt='login: ', username='root')
+        d.stream_block_size = 1000
+        target.activate(console)
+        console.sendline('')
+        console.expect(prompt, timeout=10)
+        target.activate(d)
+        try:
+            remote = str(tmpdir.join('remote'))
+            data = bytes(range(256)) * 10
+            d.put_bytes(data, remote)
+            assert tmpdir.join('remote').read_binary() == data
+            assert d.get_bytes(remote) == data
+            d.put_bytes(b'', remote)
+            assert d.get_bytes(remote) == b''
+            # a lost byte only causes the block to be sent again
+            write = console.write
+            lost = []
+
+            def lossy_write(data):
+                if not lost and len(data) > 100 and not data.endswith(b'\n'):
+                    lost.append(data)
+                    data = data[:-1]
+                return write(data)
+
+            d.stream_timeout = 1.0
+            console.write = lossy_write
+            d.put_bytes(data, remote)
+            console.write = write
+            assert lost
+            assert tmpdir.join('remote').read_binary() == data
+            assert tmpdir.listdir(lambda p: p.basename.startswith('remote.')) == []
+            # errors on the target are reported instead of a CRC mismatch
+            d._get_stream_codec = lambda tool: 'gzip'
+            d._stream_compress = lambda codec, data: data
+            with pytest.raises(ExecutionError, match='decoding failed'):
+                d.put_bytes(data, remote)
+        finally:
+            target.deactivate_all_drivers()
+
+    def test_run_iter(self, target):
+        import shutil
+        from labgrid.driver import ExternalConsoleDriver
+
+        if not shutil.which('script'):
+            pytest.skip("script not found")
+        prompt = 'TEST> '
+        console = ExternalConsoleDriver(
+            target, 'console', cmd='script -qfc "env PS1=\'{}\' sh -i" /dev/null'.format(prompt)
+        )
+        d = ShellDriver(target, "shell", prompt=prompt, login_prompt='login: ', username='root')
+        target.activate(console)
+        console.sendline('')
+        console.expect(prompt, timeout=10)
+        target.activate(d)
+        try:
+            lines = d.run_iter("seq 3; printf partial; exit 3")
+            assert list(lines) == ['1', '2', '3', 'partial']
+            assert lines.exitcode == 3
+            assert not lines.stopped
+
+            lines = d.run_iter("seq 1000000", stop=lambda line: line == '5')
+            assert list(lines) == ['1', '2', '3', '4', '5']
+            assert lines.stopped
+
+            # the shell is usable after the interrupted command
+            assert d.run("echo ok") == (['ok'], [], 0)
+
+            with d.run_iter("echo a; echo b") as lines:
+                assert next(lines) == 'a'
+            assert d.run_check("echo ok") == ['ok']
+        finally:
+            target.deactivate_all_drivers()
+
+    def test_put_sync(self, target_with_fakeconsole, mocker, tmpdir, monkeypatch):
+        import os
+        import shutil
+        import subprocess
+
+        t = target_with_fakeconsole
+        d = ShellDriver(t, "shell", prompt='dummy', login_prompt='dummy', username='dummy')
+        d.on_activate = mocker.MagicMock()
+        d = t.get_driver('ShellDriver')
+
+        commands = []
+
+        def run(cmd, timeout=None):
+            commands.append('stat' if 'stat ' in cmd else 'hash')
+            proc = subprocess.run(['sh', '-c', cmd], stdout=subprocess.PIPE,
+                                  stderr=subprocess.DEVNULL)
+            return proc.stdout.decode().splitlines(), [], proc.returncode
+
+        d._run = run
+        d._put = mocker.MagicMock(side_effect=shutil.copy)
+        local = tmpdir.join('image')
+        local.write_binary(b'first')
+        remote = tmpdir.mkdir('remote')
+
+        d.put(str(local), str(remote), sync=True)
+        assert d._put.call_count == 1
+        assert remote.join('image').read_binary() == b'first'
+
+        # the uploaded file is known, later syncs only stat it
+        del commands[:]
+        d.put(str(local), str(remote), sync=True)
+        d.put(str(local), str(remote), sync=True)
+        assert d._put.call_count == 1
+        assert commands == ['stat', 'stat']
+
+        # the hashes are kept by absolute path, relative paths may differ
+        monkeypatch.chdir(str(remote))
+        del commands[:]
+        d.put(str(local), '', sync=True)
+        assert commands == ['stat']
+        monkeypatch.chdir(str(tmpdir))
+        d.put(str(local), 'remote/image', sync=True)
+        assert commands == ['stat', 'stat']
+        assert d._put.call_count == 1
+
+        # changes within the same second can't be detected with whole
+        # seconds, so the file is always hashed
+        os.utime(str(remote.join('image')), (1000000000, 1000000000))
+        del commands[:]
+        d.put(str(local), str(remote), sync=True)
+        d.put(str(local), str(remote), sync=True)
+        assert commands == ['stat', 'hash', 'stat', 'hash']
+        assert d._put.call_count == 1
+
+        remote.join('image').write_binary(b'changed')
+        d.put(str(local), str(remote), sync=True)
+        assert d._put.call_count == 2
+        assert remote.join('image').read_binary() == b'first'
+
+        t.deactivate(d)
+        t.activate(d)
+        del commands[:]
+        d.put(str(local), str(remote), sync=True)
+        assert d._put.call_count == 2
+        assert commands == ['stat', 'hash']
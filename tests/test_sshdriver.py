@@ -52,3 +52,64 @@ class TestSSHDriver:
             res = s.run_check("test")
         res = s.run("test")
         assert res == (['error'], [], 1)
+
+    def test_run_iter(self, ssh_driver_mocked_and_activated, mocker):
+        s = ssh_driver_mocked_and_activated
+        # run the commands locally instead of via ssh
+        mocker.stopall()
+        s._get_ssh_command = lambda cmd: ['sh', '-c', cmd]
+
+        lines = s.run_iter("echo a; echo b; printf c; exit 2")
+        assert list(lines) == ['a', 'b', 'c']
+        assert lines.exitcode == 2
+
+        lines = s.run_iter("yes", stop=lambda line: True)
+        assert list(lines) == ['y']
+        assert lines.stopped
+        assert lines.exitcode != 0
+
+    def test_run_persistent(self, target, mocker):
+        import time
+
+        NetworkService(target, "service", "1.2.3.4", "root")
+        call = mocker.patch('subprocess.call')
+        call.return_value = 0
+        s = SSHDriver(target, "ssh", persistent=True, slots=2)
+        target.activate(s)
+        mocker.stopall()
+        # run the sessions locally instead of via ssh
+        s._get_ssh_command = lambda cmd: ['sh', '-c', cmd]
+        s._cleanup_own_master = lambda: None
+
+        assert s.run("echo a; echo b >&2; exit 3") == (['a'], ['b'], 3)
+        assert s.run("cd /; printf 'x\\n'") == (['x'], [], 0)
+        assert s.run("pwd")[0] != ['/']
+        assert s.run("read line; echo $?") == (['1'], [], 0)
+        assert s.run("'")[2] != 0
+        assert s.run_check("echo $((1+2))") == ['3']
+
+        # the timeout is ignored, like without persistent sessions
+        assert s.run("sleep 0.2; echo ok", timeout=0.1) == (['ok'], [], 0)
+
+        start = time.monotonic()
+        results = s.run_many(["sleep 0.5; echo {}".format(i) for i in range(4)])
+        assert [r[0] for r in results] == [['0'], ['1'], ['2'], ['3']]
+        assert time.monotonic() - start < 1.5
+
+        target.deactivate(s)
+        assert s._sessions is None
+
+        # a session which is in use while the driver is deactivated is
+        # closed when the command has finished
+        from concurrent.futures import ThreadPoolExecutor
+        from labgrid.driver.sshsession import SSHSession
+        s._check_master = lambda: None
+        target.activate(s)
+        mocker.patch.object(SSHSession, 'close', autospec=True, side_effect=SSHSession.close)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            result = executor.submit(s.run, "echo started >&2; sleep 0.5; echo done")
+            while s._sessions.qsize() == 2:
+                time.sleep(0.01)
+            target.deactivate(s)
+            assert result.result(timeout=5) == (['done'], ['started'], 0)
+        assert SSHSession.close.call_count == 1
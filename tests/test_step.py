@@ -148,3 +148,81 @@ def test_subscriber_error():
     with pytest.warns(UserWarning):
         step = step_event_skip()
     steps.unsubscribe(callback)
+
+class B:
+    @step(args=['foo', 'bar'])
+    def method_no_step(self, foo, bar='default'):
+        return steps.get_current()
+
+def test_fast_path():
+    b = B()
+    assert b.method_no_step('foo') is None
+
+    events = []
+    steps.subscribe(events.append)
+    try:
+        current = b.method_no_step('foo')
+        b.method_no_step(foo='foo', bar='bar')
+    finally:
+        steps.unsubscribe(events.append)
+
+    assert current.source is b
+    start_events = [e for e in events if e.data.get('state') == 'start']
+    assert [e.data['args'] for e in start_events] == [
+        {'foo': 'foo', 'bar': 'default'},
+        {'foo': 'foo', 'bar': 'bar'},
+    ]
+
+class Stream:
+    @step(result=True, stream=True)
+    def read(self, data):
+        return data
+
+    @step(args=['data'], stream=True)
+    def write(self, data):
+        pass
+
+def test_stream_events():
+    a = Stream()
+    b = Stream()
+    events = []
+    steps.subscribe(events.append)
+    try:
+        a.read(b'a')
+        a.read(b'b')
+        a.write(b'c')
+        b.write(b'd')
+        b.write(b'e')
+        assert events == []
+        step_a()
+        events_before_flush = len(events)
+        a.read(b'f')
+        steps.flush()
+    finally:
+        steps.unsubscribe(events.append)
+
+    assert [(e.resource, e.data) for e in events if e.stream] == [
+        (a, {'result': b'ab'}),
+        (a, {'data': b'c'}),
+        (b, {'data': b'de'}),
+        (a, {'result': b'f'}),
+    ]
+    # the buffered events are delivered before those of other steps
+    assert [e.stream for e in events[:events_before_flush]] == [True] * 3 + [False] * 2
+
+def test_stream_events_timeout(monkeypatch):
+    monkeypatch.setattr(steps, 'buffer_time', 0.05)
+    a = Stream()
+    events = []
+    steps.subscribe(events.append)
+    try:
+        a.read(b'a')
+        a.read(b'b')
+        # delivered without further events or an explicit flush
+        for _ in range(100):
+            if events:
+                break
+            sleep(0.01)
+        assert [e.data for e in events] == [{'result': b'ab'}]
+    finally:
+        steps.unsubscribe(events.append)
@@ -342,3 +342,84 @@ def test_get_by_default_priority(target):
     with pytest.raises(NoDriverFoundError) as e_info:
         target.get_driver(AProtocol)
     assert "multiple drivers matching" in str(e_info.value)
+
+def test_get_driver_index(target):
+    class AProtocol(abc.ABC):
+        pass
+
+    class BProtocol(abc.ABC):
+        pass
+
+    @attr.s
+    class A(Driver, AProtocol):
+        pass
+
+    @attr.s
+    class B(Driver, BProtocol):
+        priorities = {BProtocol: 10}
+
+    a = A(target, "a")
+    assert target.get_driver(AProtocol) is a
+    with pytest.raises(NoDriverFoundError):
+        target.get_driver(BProtocol)
+
+    # drivers bound later are found as well
+    b1 = B(target, "b1")
+    b2 = A(target, "b2")
+    assert target.get_driver(BProtocol) is b1
+    assert target.get_driver(Driver, name="b2") is b2
+    with pytest.raises(NoDriverFoundError) as e_info:
+        target.get_driver(AProtocol)
+    assert "multiple drivers matching" in str(e_info.value)
+    assert target[AProtocol, "b2"] is b2
+
+def test_parallel_activation():
+    import time
+    from labgrid.binding import BindingState
+
+    target = Target('parallel', parallel_activation=True)
+    events = []
+
+    class AProtocol(abc.ABC):
+        pass
+
+    @attr.s(cmp=False)
+    class A(Driver, AProtocol):
+        def on_activate(self):
+            time.sleep(0.2)
+            events.append(('activate', self.name))
+
+        def on_deactivate(self):
+            time.sleep(0.2)
+            events.append(('deactivate', self.name))
+
+    @attr.s(cmp=False)
+    class B(Driver):
+        bindings = {"a1": AProtocol, "a2": AProtocol}
+
+        def on_activate(self):
+            events.append(('activate', self.name))
+
+        def on_deactivate(self):
+            events.append(('deactivate', self.name))
+
+    a1 = A(target, "a1")
+    a2 = A(target, "a2")
+    target.set_binding_map({"a1": "a1", "a2": "a2"})
+    b = B(target, "b")
+
+    start = time.monotonic()
+    target.activate(b)
+    assert time.monotonic() - start < 0.35
+    assert b.state is BindingState.active
+    assert a1.state is BindingState.active
+    assert a2.state is BindingState.active
+    assert events[-1] == ('activate', 'b')
+
+    del events[:]
+    start = time.monotonic()
+    target.deactivate_all_drivers()
+    assert time.monotonic() - start < 0.35
+    assert events[0] == ('deactivate', 'b')
+    assert a1.state is BindingState.bound
+    assert a2.state is BindingState.bound
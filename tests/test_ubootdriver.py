@@ -0,0 +1,45 @@
+import pytest
+
+from labgrid.driver import UBootDriver, ExecutionError
+
+
+class TestUBootDriver:
+    def test_uboot_run_iter(self, target_with_fakeconsole, mocker):
+        t = target_with_fakeconsole
+        d = UBootDriver(t, "uboot", prompt='=> ')
+        d.on_activate = mocker.MagicMock()
+        d = t.get_driver(UBootDriver)
+        d._status = 1
+        mocker.patch('labgrid.driver.ubootdriver.gen_marker', return_value='ABCDEFGHIJ')
+        console = t.get_driver('FakeConsoleDriver')
+        # the fake console returns the last item first
+        output = [b'ABCDEFGHIJ\r\n', b'one\r\ntw', b'o\r\nthree\r\n', b'1\r\n', b'ABCDEFGHIJ\r\n',
+                  b'=> ']
+        console.rxq = list(reversed(output))
+
+        lines = d.run_iter("test")
+        assert next(lines) == 'one'
+        assert console.txq[-1].startswith(b"echo 'ABCD''EFGHIJ'; test;")
+        # the remaining output is discarded when the iteration is stopped
+        lines.close()
+        assert lines.exitcode == 1
+        assert console.rxq == []
+
+        console.rxq = list(reversed(output))
+        lines = d.run_iter("test")
+        assert list(lines) == ['one', 'two', 'three']
+        assert lines.exitcode == 1
+
+    def test_uboot_run_iter_timeout(self, target_with_fakeconsole, mocker):
+        t = target_with_fakeconsole
+        d = UBootDriver(t, "uboot", prompt='=> ')
+        d.on_activate = mocker.MagicMock()
+        d = t.get_driver(UBootDriver)
+        d._status = 1
+        mocker.patch('labgrid.driver.ubootdriver.gen_marker', return_value='ABCDEFGHIJ')
+        console = t.get_driver('FakeConsoleDriver')
+        console.rxq = [b'one\r\n', b'ABCDEFGHIJ\r\n']
+
+        lines = d.run_iter("test", timeout=0.1)
+        with pytest.raises(ExecutionError):
+            list(lines)
@@ -308,3 +308,173 @@ Test
 
     assert hash == mf.get_hash()
     assert str(t) == mf.get_remote_path()
+
+@pytest.fixture
+def fake_ssh_connect(mocker):
+    def open_connection(self):
+        self._connected = True
+
+    def disconnect(self):
+        self._connected = False
+
+    mocker.patch.object(SSHConnection, '_open_connection', open_connection)
+    mocker.patch.object(SSHConnection, '_check_keepalive', return_value=True)
+    mocker.patch.object(SSHConnection, '_disconnect', disconnect)
+
+def test_sshmanager_refcount(sshmanager_fix, fake_ssh_connect):
+    con = sshmanager_fix.open("localhost")
+    assert sshmanager_fix.open("localhost") is con
+
+    sshmanager_fix.close("localhost")
+    assert con.isconnected()
+    assert con.host in sshmanager_fix._connections
+
+    sshmanager_fix.close("localhost")
+    assert not con.isconnected()
+    assert con.host not in sshmanager_fix._connections
+
+def test_sshmanager_close_shared(sshmanager_fix, fake_ssh_connect):
+    # connections used through get() (such as by the proxy) are kept
+    con = sshmanager_fix.get("localhost")
+    assert sshmanager_fix.open("localhost") is con
+    sshmanager_fix.close("localhost")
+    assert con.isconnected()
+    sshmanager_fix.close_all()
+
+    # as are connections with port forwards
+    con = sshmanager_fix.open("localhost")
+    con._forwards[('localhost', 3000)] = 4000
+    sshmanager_fix.close("localhost")
+    assert con.isconnected()
+    assert sshmanager_fix.get("localhost") is con
+    con._forwards.clear()
+    sshmanager_fix.close_all()
+
+def test_networkresource_command_prefix(target, sshmanager_fix, fake_ssh_connect):
+    res = NetworkResource(target, "test", "localhost")
+    prefix = res.command_prefix
+    assert prefix[0] == 'ssh'
+    assert prefix[-1] == '--'
+    con = sshmanager_fix.get("localhost")
+    assert prefix == con.get_prefix()
+
+    # only the reuse of the open connection saves a handshake
+    assert con.host not in sshmanager_fix.get_stats()
+    res.command_prefix
+    res.command_prefix
+    assert sshmanager_fix.get_stats()[con.host] == 2
+
+    target.activate(res)
+    target.deactivate(res)
+    assert not con.isconnected()
+
+def test_networkresource_command_prefix_failed(target, sshmanager_fix, mocker):
+    from labgrid.driver.exception import ExecutionError
+
+    res = NetworkResource(target, "test", "localhost")
+    open_ = mocker.patch.object(sshmanager_fix, 'open', side_effect=ExecutionError("failed"))
+    assert res.command_prefix[0] == 'ssh'
+    assert res.command_prefix[-1] == '--'
+    # the failed connection is not retried on every access
+    assert open_.call_count == 1
+
+    res._connect_failed -= res.connect_retry_interval
+    res.command_prefix
+    assert open_.call_count == 2
+
+def test_ptxexpect_incremental(target_with_fakeconsole):
+    import pexpect
+
+    t = target_with_fakeconsole
+    console = t.get_driver('FakeConsoleDriver')
+    console._expect.lookbehind = 16
+    # the FakeConsoleDriver returns the chunks from the end of the list
+    console.rxq = [b'prompt$ ', b'0\r\nsecond', b'END ', b'x' * 100, b'START', b'first\r\n']
+
+    index, before, match, after = console.expect([r'never', r'(first|second)\s+'], timeout=1.0)
+    assert (index, before, after) == (1, b'', b'first\r\n')
+    assert match.group(1) == b'first'
+
+    # the pattern spans more than the lookbehind, so it is not found
+    index, before, _, after = console.expect(
+        [r'START(.*)END', pexpect.TIMEOUT], timeout=0.1)
+    assert index == 1
+    assert after is pexpect.TIMEOUT
+    assert before == b'START' + b'x' * 100 + b'END 0\r\nsecondprompt$ '
+
+    # the data is kept after a timeout and searched completely again
+    index, _, match, _ = console.expect(r'START(.*)END', timeout=1.0, lookbehind=None)
+    assert len(match.group(1)) == 100
+    _, before, _, _ = console.expect('prompt\\$ ', timeout=1.0)
+    assert before == b' 0\r\nsecond'
+    with pytest.raises(pexpect.TIMEOUT):
+        console.expect('prompt', timeout=0.1)
+    assert console._expect.compile_pattern_list('prompt') == \
+        console._expect.compile_pattern_list(['prompt'])
+
+def test_ringbuffer():
+    from labgrid.util.ringbuffer import RingBuffer
+
+    ring = RingBuffer(8)
+    first = ring.cursor()
+    ring.write(b'abcdef')
+    second = ring.cursor(backlog=True)
+    assert first.read(size=4) == b'abcd'
+    ring.write(b'ghijk')
+    assert first.available == 7
+    assert first.read() == b'efghijk'
+    assert second.read(timeout=0) == b'defghijk'
+    assert second.lost == 3
+    assert second.read(timeout=0.01) == b''
+    assert second.read(min_size=2, timeout=0.01) == b''
+    ring.close(EOFError())
+    with pytest.raises(EOFError):
+        second.read()
+
+def test_console_multiplexer(target_with_fakeconsole):
+    from labgrid.binding import StateError
+
+    t = target_with_fakeconsole
+    console = t.get_driver('FakeConsoleDriver')
+    with pytest.raises(StateError):
+        console.watch()
+    console.enable_multiplexer(size=1024)
+    try:
+        console.rxq.insert(0, b'first line\nprompt> ')
+        _, before, _, _ = console.expect('prompt> ', timeout=1.0)
+        assert before == b'first line\n'
+        # the watcher sees the same data without taking it away from expect
+        watcher = console.watch()
+        assert watcher.read(timeout=1.0) == b'first line\nprompt> '
+        console.rxq.insert(0, b'second line\nprompt> ')
+        assert watcher.read(min_size=20, timeout=1.0) == b'second line\nprompt> '
+    finally:
+        console.disable_multiplexer()
+    _, before, _, _ = console.expect('prompt> ', timeout=1.0)
+    assert before == b'second line\n'
+
+def test_console_multiplexer_error(target_with_fakeconsole, caplog, monkeypatch):
+    t = target_with_fakeconsole
+    console = t.get_driver('FakeConsoleDriver')
+    chunks = [b'last line\nprompt> ']
+
+    def _read(*_, **__):
+        if chunks:
+            return chunks.pop()
+        raise OSError("device disconnected")
+
+    monkeypatch.setattr(console, '_read', _read)
+    console.enable_multiplexer(size=1024)
+    console._multiplexer._thread.join(timeout=1.0)
+    assert "device disconnected" in caplog.text
+    # the data received before the error is kept for expect
+    console.disable_multiplexer()
+    monkeypatch.undo()
+    _, before, _, _ = console.expect('prompt> ', timeout=1.0)
+    assert before == b'last line\n'
+
+def test_posix_cksum():
+    from labgrid.util.cksum import posix_cksum
+
+    assert posix_cksum(b'') == 4294967295
+    assert posix_cksum(b'abc') == 1219131554